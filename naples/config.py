@@ -39,6 +39,12 @@ class BaseConfig(BaseSettings):
     AWS_S3_BUCKET_NAME: str = "naples-gateway"
     AWS_REGION: str | None
     AWS_S3_BUCKET_URL: str
+    # uploads running at the same time, per process
+    S3_UPLOAD_WORKERS: int = 8
+    # parts of one multipart upload sent in parallel
+    S3_MULTIPART_CONCURRENCY: int = 4
+    S3_MULTIPART_CHUNK_SIZE_MB: int = 8
+    S3_MAX_POOL_CONNECTIONS: int = 32
     # TODO: Add more AWS configurations
     # DEFAULT_IMAGE_URL: str
 
@@ -46,6 +52,15 @@ class BaseConfig(BaseSettings):
 
     WEB_SERVICE_NAME: str = "naples-gw-front-app-1"
     CERT_RESOLVER: str = "myresolver"
+    # one service shared by the routers of all stores instead of a service per store
+    TRAEFIK_COMPACT_CONFIG: bool = False
+    TRAEFIK_SERVICE_NAME: str = "stores"
+    # compact config: stores on subdomains of MAIN_DOMAIN use one *.MAIN_DOMAIN certificate (DNS challenge resolver)
+    TRAEFIK_WILDCARD_CERT: bool = False
+    # compact config with the wildcard certificate: Host() rules of subdomain stores per router
+    TRAEFIK_HOSTS_PER_ROUTER: int = 1
+    # generated config is keyed by the store urls version, the ttl only frees memory
+    TRAEFIK_CONFIG_CACHE_TTL: int = 3600
 
     # mail configuration (gmail service)
     MAIL_USERNAME: str
@@ -83,6 +98,20 @@ class BaseConfig(BaseSettings):
     GODADDY_IP_ADDRESS: str
     RECORD_TYPE: str = "A"
     GO_DADDY_TTL: int = 600
+    GODADDY_TIMEOUT: float = 10
+    GODADDY_POOL_SIZE: int = 10
+    # seconds the records of the domain are checked locally before they are downloaded again
+    GODADDY_RECORDS_CACHE_TTL: int = 300
+
+    # store subdomain records added by the dns worker (python -m naples.dns_worker)
+    DNS_WORKER_POLL_INTERVAL: float = 2.0
+    DNS_WORKER_BATCH_SIZE: int = 50
+    DNS_MAX_ATTEMPTS: int = 10
+    # seconds before the first retry, doubled for every next one
+    DNS_RETRY_DELAY: int = 30
+    DNS_MAX_RETRY_DELAY: int = 3600
+    # a claimed job is run again after this if its worker died while running it
+    DNS_JOB_TIMEOUT: int = 300
 
     DAYS_BEFORE_UPDATE: int = 3
 
@@ -91,9 +120,56 @@ class BaseConfig(BaseSettings):
     MAX_ITEMS_TRIALING: int = 6
     MAX_ACTIVE_ITEMS_TRIALING: int = 3
 
-    # file_report_path
-    REPORTS_DIR: str = "reports/"
+    # stores report, downloaded as this file
     STORES_REPORT_FILE: str = "stores_report.csv"
+    # rows fetched from the cursor and sent to the client at once
+    STORES_REPORT_BATCH_SIZE: int = 500
+
+    # connections of each database pool, the sync one and the async one of the storefront routes
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # statements slower than this are logged with their SQL
+    SQL_SLOW_QUERY_MS: int = 200
+
+    # storefront store resolution cache
+    STORE_CACHE_SIZE: int = 1024
+    STORE_CACHE_TTL: int = 30
+
+    # storefront filter facets by content version of the store
+    FACETS_CACHE_SIZE: int = 1024
+    FACETS_CACHE_TTL: int = 3600
+
+    # storefront map search
+    MAP_MARKERS_LIMIT: int = 2000
+    MAP_MAX_RADIUS_KM: float = 500
+
+    # Cache-Control max-age of the storefront GETs, they are revalidated by ETag after it
+    STOREFRONT_CACHE_MAX_AGE: int = 0
+
+    # storefront responses shared by the workers: memory:// or redis://[:password@]host[:port][/db]
+    RESPONSE_CACHE_URL: str = "memory://"
+    RESPONSE_CACHE_TTL: int = 300
+    RESPONSE_CACHE_SIZE: int = 4096
+    # seconds a request waits for another one rendering the same response
+    RESPONSE_CACHE_LOCK_TIMEOUT: int = 5
+
+    # email outbox drained by the email worker (python -m naples.email_worker)
+    EMAIL_WORKER_POLL_INTERVAL: float = 1.0
+    EMAIL_WORKER_BATCH_SIZE: int = 50
+    EMAIL_WORKER_CONCURRENCY: int = 8
+    # sends per second, the MaxSendRate of the SES account
+    EMAIL_MAX_SEND_RATE: float = 14
+    # email worker processes running, they share the send rate of the account
+    EMAIL_WORKERS: int = 1
+    EMAIL_MAX_ATTEMPTS: int = 8
+    # seconds before the first retry, doubled for every next one
+    EMAIL_RETRY_DELAY: int = 30
+    EMAIL_MAX_RETRY_DELAY: int = 3600
+    # a claimed email is sent again after this if its worker died while sending it
+    EMAIL_SEND_TIMEOUT: int = 300
+    # days before the end of a trial or a canceled subscription its owner is reminded
+    SUBSCRIPTION_EXPIRY_REMINDER_DAYS: int = 3
 
     model_config = SettingsConfigDict(
         extra="allow",
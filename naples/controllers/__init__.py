@@ -1,2 +1,34 @@
 # ruff: noqa: F401
-from .file import create_file, delete_file, get_file_type
+from .booked_date import filter_items_by_availability, get_available_item_ids, is_item_available, lock_item_bookings
+from .facets import get_store_facets, store_facets
+from .file import (
+    create_file,
+    create_file_async,
+    delete_file,
+    delete_uploaded_files,
+    get_file_type,
+    is_image_file,
+    upload_file_async,
+)
+from .geo import filter_locations_by_bbox, get_approximate_distance, get_distance, get_radius_bbox
+from .item import (
+    ITEM_DETAILS_PAGE_PROFILE,
+    ITEM_LIST_CARD_PROFILE,
+    get_item_details_stmt,
+    get_item_markers_stmt,
+    get_published_items_stmt,
+    get_store_items_stmt,
+    reorder_item_images,
+)
+from .pagination import paginate_by_cursor
+from .rate import update_item_prices
+from .store_version import get_store_content_version, mark_stores_changed, on_stores_changed
+from .email import (
+    RateLimiter,
+    get_worker_send_rate,
+    queue_email,
+    queue_subscription_expiry_reminders,
+    send_queued_emails,
+)
+from .traefik import STORE_URLS_VERSION, get_config_version, get_traefik_config, traefik_configs
+from .dns import queue_dns_record, queue_dns_record_deletion, run_dns_jobs
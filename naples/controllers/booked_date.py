@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from naples import models as m
+
+
+def booking_overlaps(check_in: datetime, check_out: datetime) -> sa.ColumnElement[bool]:
+    """Active bookings overlapping [check_in, check_out), answered by the (item_id, from_date, to_date) index"""
+
+    return sa.and_(
+        m.BookedDate.is_deleted.is_(False),
+        m.BookedDate.from_date < check_out,
+        m.BookedDate.to_date > check_in,
+    )
+
+
+def filter_items_by_availability(stmt: sa.Select, check_in: datetime, check_out: datetime) -> sa.Select:
+    """Keep items without any active booking overlapping [check_in, check_out)"""
+
+    overlapping_booking = sa.exists().where(m.BookedDate.item_id == m.Item.id, booking_overlaps(check_in, check_out))
+
+    return stmt.where(~overlapping_booking)
+
+
+def get_available_item_ids(db: Session, item_ids: list[int], check_in: datetime, check_out: datetime) -> set[int]:
+    """Which of the items are free between check_in and check_out, in one query"""
+
+    stmt = filter_items_by_availability(sa.select(m.Item.id).where(m.Item.id.in_(item_ids)), check_in, check_out)
+    return set(db.scalars(stmt))
+
+
+def is_item_available(db: Session, item_id: int, check_in: datetime, check_out: datetime) -> bool:
+    return item_id in get_available_item_ids(db, [item_id], check_in, check_out)
+
+
+def lock_item_bookings(db: Session, item_id: int):
+    """Lock the item row until the transaction ends, so the bookings of the item are checked and added one at a time"""
+
+    db.execute(sa.select(m.Item.id).where(m.Item.id == item_id).with_for_update())
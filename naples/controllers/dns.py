@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+import requests
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.config import config
+from naples.logger import log
+from naples.models.utils import datetime_utc
+from services.store.add_dns_record import get_subdomain_from_url
+from services.store.godaddy import GoDaddyDNSClient
+
+CFG = config()
+
+
+def queue_dns_record(db: Session, store: m.Store, subdomain: str) -> m.DNSJob:
+    """Add the record of the store subdomain once the caller commits, the store waits for it"""
+
+    job = m.DNSJob(store=store, action=s.DNSJobAction.ADD.value, subdomain=subdomain)
+    store.dns_status = s.DNSStatus.PENDING.value
+    db.add(job)
+    log(log.INFO, "DNS record [%s] queued for store [%s]", subdomain, store.url)
+    return job
+
+
+def queue_dns_record_deletion(db: Session, subdomain: str) -> m.DNSJob:
+    job = m.DNSJob(action=s.DNSJobAction.DELETE.value, subdomain=subdomain)
+    db.add(job)
+    log(log.INFO, "DNS record [%s] deletion queued", subdomain)
+    return job
+
+
+def get_dns_retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(CFG.DNS_RETRY_DELAY * 2 ** (attempts - 1), CFG.DNS_MAX_RETRY_DELAY))
+
+
+def is_retryable_dns_error(error: Exception) -> bool:
+    # rejected records (4xx) fail at once, the registrar being down or throttling is retried
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, requests.RequestException)
+
+
+def claim_dns_jobs(db: Session, limit: int) -> list[m.DNSJob]:
+    """Take the due pending jobs, other workers skip them until DNS_JOB_TIMEOUT passes"""
+
+    now = datetime_utc()
+    jobs = db.scalars(
+        sa.select(m.DNSJob)
+        .options(orm.joinedload(m.DNSJob.store))
+        .where(m.DNSJob.status == s.DNSJobStatus.PENDING.value, m.DNSJob.next_attempt_at <= now)
+        .order_by(m.DNSJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=m.DNSJob)
+    ).all()
+    for job in jobs:
+        job.next_attempt_at = now + timedelta(seconds=CFG.DNS_JOB_TIMEOUT)
+    db.commit()
+    return list(jobs)
+
+
+def get_waiting_store(job: m.DNSJob) -> m.Store | None:
+    """The store whose state follows the job, the url of the store may have changed since it was queued"""
+
+    if job.action != s.DNSJobAction.ADD.value or job.store is None:
+        return None
+    if get_subdomain_from_url(job.store.url) != job.subdomain:
+        return None
+    return job.store
+
+
+def finish_dns_job(job: m.DNSJob, error: Exception | None):
+    """Move the job and the store waiting for it to their next state"""
+
+    job.attempts += 1
+    store = get_waiting_store(job)
+    if error is None:
+        job.status = s.DNSJobStatus.DONE.value
+        job.done_at = datetime_utc()
+        job.last_error = ""
+        if store:
+            store.dns_status = s.DNSStatus.PROVISIONED.value
+        return
+
+    job.last_error = str(error)
+    if is_retryable_dns_error(error) and job.attempts < CFG.DNS_MAX_ATTEMPTS:
+        job.next_attempt_at = datetime_utc() + get_dns_retry_delay(job.attempts)
+        log(log.WARNING, "DNS job [%s] [%s] failed, retry [%d]: %s", job.action, job.subdomain, job.attempts, error)
+        return
+
+    job.status = s.DNSJobStatus.FAILED.value
+    if store:
+        store.dns_status = s.DNSStatus.FAILED.value
+    log(log.ERROR, "DNS job [%s] [%s] failed: %s", job.action, job.subdomain, error)
+
+
+def run_dns_jobs(db: Session, dns_client: GoDaddyDNSClient) -> int:
+    """Run one batch of the queue, returns the number of jobs processed.
+
+    Jobs run in the order they were queued, the consecutive additions are sent in one request.
+    """
+
+    jobs = claim_dns_jobs(db, CFG.DNS_WORKER_BATCH_SIZE)
+
+    additions: list[m.DNSJob] = []
+
+    def send_records(jobs: list[m.DNSJob]) -> Exception | None:
+        try:
+            dns_client.add_records(
+                [
+                    s.DNSRecord(
+                        type=CFG.RECORD_TYPE,
+                        name=job.subdomain,
+                        data=CFG.GODADDY_IP_ADDRESS,
+                        ttl=CFG.GO_DADDY_TTL,
+                    )
+                    for job in jobs
+                ]
+            )
+        except requests.RequestException as e:
+            return e
+        return None
+
+    def add_records():
+        error = send_records(additions)
+        if error is not None and len(additions) > 1 and not is_retryable_dns_error(error):
+            # one rejected record fails the whole request, send them one by one to fail only that one
+            log(log.WARNING, "[%d] DNS records rejected together, adding them one by one: %s", len(additions), error)
+            for job in additions:
+                finish_dns_job(job, send_records([job]))
+        else:
+            for job in additions:
+                finish_dns_job(job, error)
+        additions.clear()
+
+    for job in jobs:
+        if job.action == s.DNSJobAction.ADD.value:
+            additions.append(job)
+            continue
+
+        if additions:
+            add_records()
+        try:
+            dns_client.delete_record(job.subdomain, CFG.RECORD_TYPE)
+        except requests.RequestException as e:
+            finish_dns_job(job, e)
+        else:
+            finish_dns_job(job, None)
+
+    if additions:
+        add_records()
+
+    db.commit()
+    return len(jobs)
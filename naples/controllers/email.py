@@ -0,0 +1,197 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import sqlalchemy as sa
+from botocore.exceptions import BotoCoreError, ClientError
+from mypy_boto3_ses import SESClient
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.config import config
+from naples.email_templates import render_subscription_expiry
+from naples.logger import log
+from naples.models.utils import datetime_utc
+from naples.utils import sendEmailAmazonSES
+
+CFG = config()
+
+# SES errors worth sending again, any other one (rejected message, unverified address, ...) fails the email
+RETRYABLE_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailable",
+    "InternalFailure",
+    "RequestTimeout",
+}
+
+
+class RateLimiter:
+    """Spaces the calls of all threads to at most rate per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def get_worker_send_rate() -> float:
+    """Sends per second of one email worker, the limiter of each process keeps to its share of the account rate"""
+
+    return CFG.EMAIL_MAX_SEND_RATE / max(CFG.EMAIL_WORKERS, 1)
+
+
+def queue_email(db: Session, email_content: s.EmailAmazonSESContent) -> m.Email:
+    """Add the email to the outbox, it is sent by the worker once the caller commits"""
+
+    email = m.Email(
+        recipient_email=email_content.recipient_email,
+        sender_email=email_content.sender_email,
+        subject=email_content.mail_subject,
+        html=email_content.message,
+        text=email_content.mail_body_text,
+        charset=email_content.charset,
+    )
+    db.add(email)
+    log(log.INFO, "Email [%s] to [%s] queued", email.subject, email.recipient_email)
+    return email
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(CFG.EMAIL_RETRY_DELAY * 2 ** (attempts - 1), CFG.EMAIL_MAX_RETRY_DELAY))
+
+
+def claim_emails(db: Session, limit: int) -> list[m.Email]:
+    """Take the due pending emails, other workers skip them until EMAIL_SEND_TIMEOUT passes"""
+
+    now = datetime_utc()
+    emails = db.scalars(
+        sa.select(m.Email)
+        .where(m.Email.status == s.EmailStatus.PENDING.value, m.Email.next_attempt_at <= now)
+        .order_by(m.Email.next_attempt_at, m.Email.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    ids = []
+    for email in emails:
+        email.next_attempt_at = now + timedelta(seconds=CFG.EMAIL_SEND_TIMEOUT)
+        ids.append(email.id)
+    db.commit()
+    if not ids:
+        return []
+
+    # the commit expires the rows, load them back in one query instead of one per email
+    return list(
+        db.scalars(
+            sa.select(m.Email)
+            .where(m.Email.id.in_(ids))
+            .order_by(m.Email.next_attempt_at, m.Email.id)
+            .execution_options(populate_existing=True)
+        ).all()
+    )
+
+
+def send_email(ses_client: SESClient, email_content: s.EmailAmazonSESContent, limiter: RateLimiter) -> str:
+    limiter.wait()
+    return sendEmailAmazonSES(email_content, ses_client=ses_client)["MessageId"]
+
+
+def send_queued_emails(db: Session, ses_client: SESClient, limiter: RateLimiter) -> int:
+    """Send one batch of the outbox concurrently, returns the number of emails processed"""
+
+    emails = claim_emails(db, CFG.EMAIL_WORKER_BATCH_SIZE)
+    if not emails:
+        return 0
+
+    contents = [
+        s.EmailAmazonSESContent(
+            recipient_email=email.recipient_email,
+            sender_email=email.sender_email,
+            message=email.html,
+            charset=email.charset,
+            mail_body_text=email.text,
+            mail_subject=email.subject,
+        )
+        for email in emails
+    ]
+
+    # only the SES calls run in the threads, the session stays in this one
+    with ThreadPoolExecutor(max_workers=CFG.EMAIL_WORKER_CONCURRENCY) as executor:
+        futures = [executor.submit(send_email, ses_client, content, limiter) for content in contents]
+
+    now = datetime_utc()
+    for email, future in zip(emails, futures):
+        email.attempts += 1
+        error = future.exception()
+        if error is None:
+            email.status = s.EmailStatus.SENT.value
+            email.message_id = future.result()
+            email.sent_at = now
+            email.last_error = ""
+            continue
+
+        email.last_error = str(error)
+        retryable = isinstance(error, BotoCoreError) or (
+            isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+        )
+        if retryable and email.attempts < CFG.EMAIL_MAX_ATTEMPTS:
+            email.next_attempt_at = now + get_retry_delay(email.attempts)
+            log(log.WARNING, "Email [%s] not sent, retry [%d]: %s", email.uuid, email.attempts, error)
+        else:
+            email.status = s.EmailStatus.FAILED.value
+            log(log.ERROR, "Email [%s] to [%s] failed: %s", email.uuid, email.recipient_email, error)
+
+    db.commit()
+    return len(emails)
+
+
+def queue_subscription_expiry_reminders(db: Session, days: int) -> int:
+    """Queue a reminder to the owners of trials and canceled subscriptions ending on the day in `days` days"""
+
+    day_start = datetime_utc().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=days)
+    subscriptions = db.scalars(
+        sa.select(m.Subscription)
+        .options(orm.joinedload(m.Subscription.user))
+        .join(m.Subscription.user)
+        .where(
+            m.Subscription.end_date >= day_start,
+            m.Subscription.end_date < day_start + timedelta(days=1),
+            sa.or_(
+                m.Subscription.status == s.SubscriptionStatus.TRIALING.value,
+                sa.and_(
+                    m.Subscription.status == s.SubscriptionStatus.ACTIVE.value,
+                    m.Subscription.canceled_at.is_not(None),
+                ),
+            ),
+            m.User.is_deleted.is_(False),
+        )
+    ).all()
+
+    # one pass over the template for all of them
+    messages = render_subscription_expiry(list(subscriptions))
+    for subscription, message in zip(subscriptions, messages):
+        queue_email(
+            db,
+            s.EmailAmazonSESContent(
+                recipient_email=subscription.user.email,
+                sender_email=CFG.MAIL_DEFAULT_SENDER,
+                message=message,
+                charset=CFG.CHARSET,
+                mail_body_text=f"Your Property Roster subscription ends on {subscription.end_date:%B %d, %Y}",
+                mail_subject="Your subscription is ending soon",
+            ),
+        )
+
+    log(log.INFO, "[%d] subscription expiry reminders queued", len(subscriptions))
+    return len(subscriptions)
@@ -0,0 +1,109 @@
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.cache import TTLCache
+from naples.config import config
+
+CFG = config()
+
+# by (store id, content version), a changed store is a new key in every worker
+store_facets: TTLCache[tuple[int, int], s.ItemsFilterDataOut] = TTLCache(
+    maxsize=CFG.FACETS_CACHE_SIZE, ttl=CFG.FACETS_CACHE_TTL
+)
+
+CITY = "city"
+BEDROOMS = "bedrooms"
+BATHROOMS = "bathrooms"
+ADULTS = "adults"
+PRICE = "price"
+
+
+def get_facets_stmt(store_id: int) -> sa.CompoundSelect:
+    """All facets of the active items of the store as (facet, value, count, low, high) rows of one query"""
+
+    is_active_store_item = sa.and_(
+        m.Item.store_id == store_id,
+        m.Item.is_deleted.is_(False),
+        m.Item.stage == s.ItemStage.ACTIVE.value,
+    )
+    no_value = sa.cast(sa.null(), sa.String)
+    no_number = sa.cast(sa.null(), sa.Float)
+
+    def counts(facet: str, column: orm.QueryableAttribute) -> sa.Select:
+        return (
+            sa.select(
+                sa.literal(facet).label("facet"),
+                sa.cast(column, sa.String).label("value"),
+                sa.func.count().label("count"),
+                no_number.label("low"),
+                no_number.label("high"),
+            )
+            .select_from(m.Item)
+            .where(is_active_store_item)
+            .group_by(column)
+        )
+
+    cities = counts(CITY, m.Location.city).join(m.Location, m.Location.item_id == m.Item.id)
+    adults = sa.select(
+        sa.literal(ADULTS), no_value, sa.literal(0), no_number, sa.cast(sa.func.max(m.Item.adults), sa.Float)
+    ).where(is_active_store_item)
+    # same as Item.min_price / Item.max_price, over all items
+    prices = (
+        sa.select(
+            sa.literal(PRICE),
+            no_value,
+            sa.literal(0),
+            sa.cast(sa.func.min(m.Rate.night), sa.Float),
+            sa.cast(sa.func.max(m.Rate.month), sa.Float),
+        )
+        .join(m.Item, m.Item.id == m.Rate.item_id)
+        .where(is_active_store_item, m.Rate.is_deleted.is_(False))
+    )
+
+    return sa.union_all(
+        cities,
+        counts(BEDROOMS, m.Item.bedrooms_count),
+        counts(BATHROOMS, m.Item.bathrooms_count),
+        adults,
+        prices,
+    )
+
+
+def compute_store_facets(db: Session, store_id: int) -> s.ItemsFilterDataOut:
+    facets: dict[str, list[s.FacetCount]] = {CITY: [], BEDROOMS: [], BATHROOMS: []}
+    adults = 0
+    price_min = price_max = 0.0
+
+    for facet, value, count, low, high in db.execute(get_facets_stmt(store_id)):
+        if facet == ADULTS:
+            adults = int(high or 0)
+        elif facet == PRICE:
+            price_min, price_max = low or 0.0, high or 0.0
+        else:
+            facets[facet].append(s.FacetCount(value=value, count=count))
+
+    facets[CITY].sort(key=lambda city: city.value)
+    facets[BEDROOMS].sort(key=lambda bedrooms: int(bedrooms.value))
+    facets[BATHROOMS].sort(key=lambda bathrooms: int(bathrooms.value))
+
+    return s.ItemsFilterDataOut(
+        cities=[city.value for city in facets[CITY]],
+        adults=adults,
+        city_counts=facets[CITY],
+        bedrooms=facets[BEDROOMS],
+        bathrooms=facets[BATHROOMS],
+        price_min=price_min,
+        price_max=price_max,
+    )
+
+
+def get_store_facets(db: Session, store_id: int, version: int) -> s.ItemsFilterDataOut:
+    """Filter facets of the store at its content version"""
+
+    facets = store_facets.get((store_id, version))
+    if facets is None:
+        facets = compute_store_facets(db, store_id)
+        store_facets.set((store_id, version), facets)
+    return facets
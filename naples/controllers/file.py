@@ -1,5 +1,11 @@
 import re
+from functools import partial
+
+import anyio
 from fastapi import UploadFile, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from mypy_boto3_s3 import S3Client
 from sqlalchemy.orm import Session
@@ -15,73 +21,135 @@ S3_UPLOAD_EXTRAS = {"ACL": "public-read-write"}
 
 RE_SPECIAL_CHARACTERS = "[^a-zA-Z0-9 \n\.]"
 
+MB = 1024 * 1024
+
 
 CFG = config()
 
 
-def create_file(
+# multipart upload: parts of large files go to S3 in parallel
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=CFG.S3_MULTIPART_CHUNK_SIZE_MB * MB,
+    multipart_chunksize=CFG.S3_MULTIPART_CHUNK_SIZE_MB * MB,
+    max_concurrency=CFG.S3_MULTIPART_CONCURRENCY,
+)
+
+# uploads wait for a slot here instead of holding a thread of the default pool, which serves all sync routes
+s3_upload_limiter = anyio.CapacityLimiter(CFG.S3_UPLOAD_WORKERS)
+
+
+def upload_file(
     file: UploadFile,
-    db: Session,
     s3_client: S3Client,
     extension: str,
     store_url: str,
     file_type: s.FileType,
     content_type_override: str | None = None,
 ) -> m.File:
-    try:
-        if not file.filename:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File name is required",
-            )
-        filename_without_special_characters = re.sub(RE_SPECIAL_CHARACTERS, "", file.filename)
-        filename_without_spaces = filename_without_special_characters.replace(" ", "_")
-        file_uuid = create_uuid()
-        filename = f"{file_uuid}_{filename_without_spaces}"
-        escaped_store_url = store_url.replace(".", "_")
-        short_name = filename.split(".")[0]
-
-        key = f"stores/{escaped_store_url}/files/{short_name}" + f".{extension}"
-        log(log.INFO, "key is %s", key)
-
-        # Create a BytesIO stream from the file bytes
-
-        extras = {
-            **S3_UPLOAD_EXTRAS,
-        }
-
-        if content_type_override:
-            extras["ContentType"] = content_type_override
+    """Upload the file to S3 and return its not yet saved model"""
 
+    if not file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File name is required",
+        )
+    filename_without_special_characters = re.sub(RE_SPECIAL_CHARACTERS, "", file.filename)
+    filename_without_spaces = filename_without_special_characters.replace(" ", "_")
+    file_uuid = create_uuid()
+    filename = f"{file_uuid}_{filename_without_spaces}"
+    escaped_store_url = store_url.replace(".", "_")
+    short_name = filename.split(".")[0]
+
+    key = f"stores/{escaped_store_url}/files/{short_name}" + f".{extension}"
+    log(log.INFO, "key is %s", key)
+
+    extras = {
+        **S3_UPLOAD_EXTRAS,
+    }
+
+    if content_type_override:
+        extras["ContentType"] = content_type_override
+
+    try:
         s3_client.upload_fileobj(
-            file.file,  # Pass the BytesIO stream
+            file.file,
             CFG.AWS_S3_BUCKET_NAME,
             key,
             ExtraArgs=extras,
+            Config=S3_TRANSFER_CONFIG,
         )
-
-        file_model = m.File(
-            type=file_type.value,
-            uuid=file_uuid,
-            original_name=file.filename,
-            name=filename,
-            key=key,
-        )
-        db.add(file_model)
-        db.commit()
-        db.refresh(file_model)
-        log(log.INFO, "file [%s] was created", file_model.name)
-        return file_model
-    except ClientError as e:
+    except (ClientError, S3UploadFailedError) as e:
         log(log.ERROR, "Error uploading file to S3 - [%s]", e)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Error while uploading file to storage",
         )
+
+    return m.File(
+        type=file_type.value,
+        uuid=file_uuid,
+        original_name=file.filename,
+        name=filename,
+        key=key,
+    )
+
+
+def save_file(db: Session, file_model: m.File) -> m.File:
+    try:
+        db.add(file_model)
+        db.commit()
+        db.refresh(file_model)
     except SQLAlchemyError as e:
         log(log.INFO, "file [%s] was not created:\n %s", file_model.name, e)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="file exists")
 
+    log(log.INFO, "file [%s] was created", file_model.name)
+    return file_model
+
+
+def create_file(
+    file: UploadFile,
+    db: Session,
+    s3_client: S3Client,
+    extension: str,
+    store_url: str,
+    file_type: s.FileType,
+    content_type_override: str | None = None,
+) -> m.File:
+    file_model = upload_file(file, s3_client, extension, store_url, file_type, content_type_override)
+    return save_file(db, file_model)
+
+
+async def upload_file_async(
+    file: UploadFile,
+    s3_client: S3Client,
+    extension: str,
+    store_url: str,
+    file_type: s.FileType,
+    content_type_override: str | None = None,
+) -> m.File:
+    """upload_file in the bounded S3 upload pool, off the event loop"""
+
+    return await anyio.to_thread.run_sync(
+        partial(upload_file, file, s3_client, extension, store_url, file_type, content_type_override),
+        limiter=s3_upload_limiter,
+    )
+
+
+async def create_file_async(
+    file: UploadFile,
+    db: Session,
+    s3_client: S3Client,
+    extension: str,
+    store_url: str,
+    file_type: s.FileType,
+    content_type_override: str | None = None,
+) -> m.File:
+    """create_file for async routes"""
+
+    file_model = await upload_file_async(file, s3_client, extension, store_url, file_type, content_type_override)
+    return await run_in_threadpool(save_file, db, file_model)
+
 
 def delete_file(
     db: Session,
@@ -104,6 +172,22 @@ def delete_file(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="file exists")
 
 
+def delete_uploaded_files(s3_client: S3Client, keys: list[str]):
+    """Remove the objects of files that were uploaded but not saved, with one request"""
+
+    if not keys:
+        return
+    try:
+        s3_client.delete_objects(
+            Bucket=CFG.AWS_S3_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+    except ClientError as e:
+        log(log.ERROR, "Error deleting [%d] unsaved files from S3 - [%s]", len(keys), e)
+        return
+    log(log.INFO, "[%d] unsaved files deleted from S3", len(keys))
+
+
 def is_image_file(extension: str) -> bool:
     return extension.lower() in ("jpg", "jpeg", "png", "gif", "webp", "avif")
 
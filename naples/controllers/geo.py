@@ -0,0 +1,126 @@
+import math
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# ~5m cells
+GEOHASH_PRECISION = 9
+# prefixes in one bounding box query
+GEOHASH_MAX_CELLS = 32
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash: list[str] = []
+    bits = 0
+    bit_count = 0
+    is_lng = True
+    while len(geohash) < precision:
+        value, value_range = (longitude, lng_range) if is_lng else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        is_lng = not is_lng
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = bit_count = 0
+    return "".join(geohash)
+
+
+def get_geohash_cell_size(precision: int) -> tuple[float, float]:
+    """Height and width of the geohash cells in degrees"""
+
+    bits = precision * 5
+    return 180 / 2 ** (bits // 2), 360 / 2 ** (bits - bits // 2)
+
+
+def get_geohash_prefixes(south: float, west: float, north: float, east: float) -> list[str]:
+    """The geohash cells covering the box, as long as possible but not more than GEOHASH_MAX_CELLS"""
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = get_geohash_cell_size(precision)
+        rows = range(int((south + 90) // height), min(int((north + 90) // height), round(180 / height) - 1) + 1)
+        cols = range(int((west + 180) // width), min(int((east + 180) // width), round(360 / width) - 1) + 1)
+        if len(rows) * len(cols) <= GEOHASH_MAX_CELLS:
+            return sorted(
+                {
+                    encode_geohash(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+                    for row in rows
+                    for col in cols
+                }
+            )
+    # the box is too big to narrow down
+    return [""]
+
+
+def filter_locations_by_bbox(stmt: sa.Select, south: float, west: float, north: float, east: float) -> sa.Select:
+    """Keep locations inside the box, a box crossing the antimeridian has west > east"""
+
+    boxes = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+    conditions = []
+    for box_west, box_east in boxes:
+        prefixes = get_geohash_prefixes(south, box_west, north, box_east)
+        conditions.append(
+            sa.and_(
+                # the geohash index narrows the scan down to a few cells, then the exact bounds are checked
+                sa.or_(*[m.Location.geohash.startswith(prefix, autoescape=True) for prefix in prefixes]),
+                m.Location.latitude.between(south, north),
+                m.Location.longitude.between(box_west, box_east),
+            )
+        )
+    return stmt.where(sa.or_(*conditions))
+
+
+def get_radius_bbox(latitude: float, longitude: float, radius: float) -> tuple[float, float, float, float]:
+    """South, west, north and east of the box around the circle, radius in km"""
+
+    lat_delta = radius / KM_PER_DEGREE
+    south, north = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    cos_lat = min(math.cos(math.radians(south)), math.cos(math.radians(north)))
+    if cos_lat <= 0 or radius / (KM_PER_DEGREE * cos_lat) >= 180:
+        # the circle reaches a pole
+        return south, -180.0, north, 180.0
+
+    lng_delta = radius / (KM_PER_DEGREE * cos_lat)
+    west = (longitude - lng_delta + 540) % 360 - 180
+    east = (longitude + lng_delta + 540) % 360 - 180
+    return south, west, north, east
+
+
+def get_distance(latitude: float, longitude: float, to_latitude: float, to_longitude: float) -> float:
+    """Great-circle distance in km"""
+
+    lat1, lng1, lat2, lng2 = map(math.radians, (latitude, longitude, to_latitude, to_longitude))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def get_approximate_distance(latitude: float, longitude: float) -> sa.ColumnElement[float]:
+    """Squared flat distance of the location to the point in degrees, for ordering nearby locations in SQL"""
+
+    lng_delta = m.Location.longitude - longitude
+    # the shorter way, across the antimeridian if needed
+    lng_delta = sa.case((lng_delta > 180, lng_delta - 360), (lng_delta < -180, lng_delta + 360), else_=lng_delta)
+    x = lng_delta * math.cos(math.radians(latitude))
+    y = m.Location.latitude - latitude
+    return x * x + y * y
+
+
+@sa.event.listens_for(Session, "before_flush")
+def update_locations_geohash(session: Session, flush_context: orm.UOWTransaction, instances):
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, m.Location):
+            obj.geohash = encode_geohash(obj.latitude or 0.0, obj.longitude or 0.0)
@@ -0,0 +1,213 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.config import config
+
+from .booked_date import filter_items_by_availability
+from .search import FULL_TEXT_SEARCH, filter_items_by_search, order_items_by_search_rank
+from .store_version import mark_stores_changed
+
+CFG = config()
+
+
+# Loading profiles: the relationships each item schema reads, loaded with a fixed number of queries
+# instead of one lazy SELECT per relationship per row
+
+# s.ItemOut (list card)
+ITEM_LIST_CARD_PROFILE = (
+    orm.selectinload(m.Item.location),
+    orm.joinedload(m.Item._main_media),
+    orm.selectinload(m.Item._images),
+    orm.selectinload(m.Item._booked_dates),
+)
+
+# s.ItemDetailsOut (details page)
+ITEM_DETAILS_PAGE_PROFILE = ITEM_LIST_CARD_PROFILE + (
+    orm.joinedload(m.Item.store).joinedload(m.Store._logo),
+    orm.joinedload(m.Item.realtor).joinedload(m.Member.avatar),
+    orm.selectinload(m.Item._fees),
+    orm.selectinload(m.Item._rates),
+    orm.selectinload(m.Item._floor_plans).options(
+        orm.joinedload(m.FloorPlan._image),
+        orm.selectinload(m.FloorPlan._markers).selectinload(m.FloorPlanMarker._images),
+    ),
+    orm.selectinload(m.Item._documents),
+    orm.selectinload(m.Item._videos),
+    orm.selectinload(m.Item._links),
+    orm.selectinload(m.Item._amenities),
+)
+
+
+def filter_items_by_rental_length(stmt: sa.Select, rent_length: list[s.RentalLength]) -> sa.Select:
+    """Keep items that support at least one of the requested rental lengths"""
+
+    conditions = []
+    if s.RentalLength.NIGHTLY in rent_length:
+        conditions.append(m.Item.nightly.is_(True))
+    if s.RentalLength.MONTHLY in rent_length:
+        conditions.append(m.Item.monthly.is_(True))
+    if s.RentalLength.ANNUAL in rent_length:
+        conditions.append(m.Item.annual.is_(True))
+
+    if conditions:
+        stmt = stmt.where(sa.or_(*conditions))
+
+    return stmt
+
+
+def get_published_items_stmt(
+    store_id: int,
+    rent_length: list[s.RentalLength] = [],
+    city: str | None = None,
+    adults: int = 0,
+    check_in: datetime | None = None,
+    check_out: datetime | None = None,
+    name: str | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    sort: s.ItemSort | None = None,
+    q: str | None = None,
+) -> sa.Select:
+    """Build the query for the active items of the store, with all storefront filters applied in SQL"""
+
+    stmt = sa.select(m.Item).where(
+        m.Item.is_deleted.is_(False),
+        m.Item.store_id == store_id,
+        m.Item.stage == s.ItemStage.ACTIVE.value,
+    )
+
+    if adults:
+        stmt = stmt.where(m.Item.adults >= adults)
+
+    if rent_length:
+        stmt = filter_items_by_rental_length(stmt, rent_length)
+
+    if name:
+        stmt = stmt.where(m.Item.name.ilike(f"%{name}%"))
+
+    if city is not None:
+        stmt = stmt.join(m.Location, m.Location.item_id == m.Item.id).where(m.Location.city == city)
+
+    if check_in and check_out:
+        stmt = filter_items_by_availability(stmt, check_in, check_out)
+
+    if q:
+        stmt = filter_items_by_search(stmt, q)
+
+    # by the lowest night price
+    if price_min is not None:
+        stmt = stmt.where(m.Item.min_price >= price_min)
+    if price_max is not None:
+        stmt = stmt.where(m.Item.min_price <= price_max)
+
+    stmt = stmt.options(*ITEM_LIST_CARD_PROFILE)
+
+    if sort == s.ItemSort.PRICE_ASC:
+        return stmt.order_by(m.Item.min_price, m.Item.id)
+    if sort == s.ItemSort.PRICE_DESC:
+        return stmt.order_by(m.Item.min_price.desc(), m.Item.id)
+    if q and FULL_TEXT_SEARCH:
+        return order_items_by_search_rank(stmt, q)
+
+    return stmt.order_by(m.Item.created_at, m.Item.id)
+
+
+def get_store_items_stmt(store_id: int, name: str | None = None, q: str | None = None) -> sa.Select:
+    """Build the query for all not deleted items of the store"""
+
+    stmt = sa.select(m.Item).where(
+        m.Item.is_deleted.is_(False),
+        m.Item.store_id == store_id,
+    )
+
+    if name:
+        stmt = stmt.where(m.Item.name.ilike(f"%{name}%"))
+
+    if q:
+        stmt = filter_items_by_search(stmt, q)
+
+    stmt = stmt.options(*ITEM_LIST_CARD_PROFILE)
+
+    if q and FULL_TEXT_SEARCH:
+        return order_items_by_search_rank(stmt, q)
+
+    return stmt.order_by(m.Item.created_at, m.Item.id)
+
+
+def get_item_image_url_column() -> sa.ColumnElement[str]:
+    """Item.image_url in SQL: the main media if it is an image, else the first image"""
+
+    main_image_key = (
+        sa.select(m.File.key)
+        .where(
+            m.File.id == m.Item.main_media_id,
+            m.File.type == s.FileType.IMAGE.value,
+            m.File.is_deleted.is_(False),
+        )
+        .scalar_subquery()
+    )
+    first_image_key = (
+        sa.select(m.File.key)
+        .join(m.items_images, m.items_images.c.file_id == m.File.id)
+        .where(m.items_images.c.item_id == m.Item.id, m.File.is_deleted.is_(False))
+        .order_by(m.items_images.c.position.asc().nulls_last(), m.items_images.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    image_key = sa.func.coalesce(main_image_key, first_image_key)
+    return sa.func.coalesce(sa.literal(CFG.AWS_S3_BUCKET_URL) + image_key, "")
+
+
+def get_item_markers_stmt(store_id: int) -> sa.Select:
+    """Build the column-only query for the map markers of the active items of the store"""
+
+    return (
+        sa.select(
+            m.Item.uuid,
+            m.Location.latitude,
+            m.Location.longitude,
+            m.Item.min_price,
+            get_item_image_url_column().label("image_url"),
+        )
+        .join(m.Location, m.Location.item_id == m.Item.id)
+        .where(
+            m.Item.is_deleted.is_(False),
+            m.Item.store_id == store_id,
+            m.Item.stage == s.ItemStage.ACTIVE.value,
+        )
+    )
+
+
+def get_item_details_stmt(store_id: int, item_uuid: str) -> sa.Select:
+    """Build the query for a single item of the store, loaded for the details page"""
+
+    return (
+        sa.select(m.Item)
+        .where(m.Item.uuid == item_uuid, m.Item.store_id == store_id)
+        .options(*ITEM_DETAILS_PAGE_PROFILE)
+    )
+
+
+def reorder_item_images(db: Session, item: m.Item, images_urls: list[str]):
+    """Store the order of the item images with a single UPDATE, images missing from the list go last"""
+
+    keys = [url.replace(CFG.AWS_S3_BUCKET_URL, "") for url in images_urls]
+    rows = db.execute(
+        sa.select(m.File.key, m.File.id)
+        .join(m.items_images, m.items_images.c.file_id == m.File.id)
+        .where(m.items_images.c.item_id == item.id, m.File.key.in_(keys))
+    ).all()
+    file_ids: dict[str, int] = {key: file_id for key, file_id in rows}
+    positions = {file_ids[key]: position for position, key in enumerate(keys) if key in file_ids}
+
+    db.execute(
+        sa.update(m.items_images)
+        .where(m.items_images.c.item_id == item.id)
+        .values(position=sa.case(positions, value=m.items_images.c.file_id, else_=None) if positions else None)
+    )
+    # the ORM does not see the new order, the storefront of the store is changed here
+    mark_stores_changed(db, {item.store_id})
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+import sqlalchemy as sa
+from fastapi import HTTPException, status
+from fastapi_pagination.bases import AbstractPage
+from fastapi_pagination import create_page
+from fastapi_pagination.cursor import CursorParams
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from naples.logger import log
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_keyset_cursor(created_at: datetime, id: int) -> str:
+    return f"{created_at.isoformat()}{CURSOR_SEPARATOR}{id}"
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = cursor.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        log(log.ERROR, "Invalid cursor [%s]", cursor)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor value")
+
+
+def paginate_by_cursor(
+    db: Session,
+    stmt: sa.Select,
+    params: CursorParams,
+    created_at: InstrumentedAttribute[datetime],
+    id: InstrumentedAttribute[int],
+    transformer: Callable[[Sequence[Any]], Sequence[Any]],
+    descending: bool = False,
+) -> AbstractPage:
+    """Keyset pagination on (created_at, id): every page is an index range scan, however deep it is"""
+
+    raw_params = params.to_raw_params()
+
+    if raw_params.cursor:
+        cursor_created_at, cursor_id = decode_keyset_cursor(str(raw_params.cursor))
+        if descending:
+            stmt = stmt.where(
+                sa.or_(created_at < cursor_created_at, sa.and_(created_at == cursor_created_at, id < cursor_id))
+            )
+        else:
+            stmt = stmt.where(
+                sa.or_(created_at > cursor_created_at, sa.and_(created_at == cursor_created_at, id > cursor_id))
+            )
+
+    order_by = (created_at.desc(), id.desc()) if descending else (created_at.asc(), id.asc())
+    # one extra row tells whether there is a next page without a COUNT query
+    stmt = stmt.order_by(None).order_by(*order_by).limit(raw_params.size + 1)
+
+    rows = db.execute(stmt.add_columns(created_at, id)).all()
+    has_next = len(rows) > raw_params.size
+    rows = rows[: raw_params.size]
+
+    next_cursor = None
+    if has_next:
+        _, last_created_at, last_id = rows[-1]
+        next_cursor = encode_keyset_cursor(last_created_at, last_id)
+
+    return create_page(
+        transformer([row[0] for row in rows]),
+        params=params,
+        current=raw_params.cursor,
+        next_=next_cursor,
+    )
@@ -0,0 +1,19 @@
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from naples import models as m
+
+
+def update_item_prices(db: Session, item_id: int):
+    """Recompute the price summary of the item from its active rates, in one UPDATE"""
+
+    active_rates = sa.and_(m.Rate.item_id == item_id, m.Rate.is_deleted.is_(False))
+
+    db.execute(
+        sa.update(m.Item)
+        .where(m.Item.id == item_id)
+        .values(
+            min_price=sa.select(sa.func.coalesce(sa.func.min(m.Rate.night), 0)).where(active_rates).scalar_subquery(),
+            max_price=sa.select(sa.func.coalesce(sa.func.max(m.Rate.month), 0)).where(active_rates).scalar_subquery(),
+        )
+    )
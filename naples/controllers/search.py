@@ -0,0 +1,84 @@
+import re
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m
+from naples.database import db
+
+# Postgres answers the search from the GIN index on to_tsvector('simple', items.search_text)
+# (see migration cc0f41c2e64a), other databases fall back to LIKE
+FULL_TEXT_SEARCH = db.get_engine().dialect.name == "postgresql"
+
+SEARCH_TEXT_VECTOR = sa.func.to_tsvector(sa.literal_column("'simple'::regconfig"), m.Item.search_text)
+
+RE_SEARCH_TERM = re.compile(r"\w+")
+
+
+def get_search_terms(q: str) -> list[str]:
+    return RE_SEARCH_TERM.findall(q.lower())
+
+
+def get_search_query(terms: list[str]) -> sa.ColumnElement:
+    # every term has to match, as a word prefix
+    return sa.func.to_tsquery(sa.literal_column("'simple'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+
+
+def filter_items_by_search(stmt: sa.Select, q: str) -> sa.Select:
+    """Keep items matching every word of q by name, description, address, city or amenities"""
+
+    terms = get_search_terms(q)
+    if not terms:
+        return stmt
+
+    if FULL_TEXT_SEARCH:
+        return stmt.where(SEARCH_TEXT_VECTOR.op("@@")(get_search_query(terms)))
+
+    return stmt.where(*[m.Item.search_text.contains(term, autoescape=True) for term in terms])
+
+
+def order_items_by_search_rank(stmt: sa.Select, q: str) -> sa.Select:
+    """Best matches first, postgres only"""
+
+    terms = get_search_terms(q)
+    if not terms:
+        return stmt.order_by(m.Item.created_at, m.Item.id)
+
+    return stmt.order_by(sa.func.ts_rank(SEARCH_TEXT_VECTOR, get_search_query(terms)).desc(), m.Item.id)
+
+
+def build_item_search_text(item: m.Item, location: m.Location | None) -> str:
+    parts = [item.name, item.description]
+    if location:
+        parts += [location.address, location.city, location.state]
+    parts += item.amenities
+    return " ".join(part for part in parts if part).lower()
+
+
+@sa.event.listens_for(Session, "before_flush")
+def update_items_search_text(session: Session, flush_context: orm.UOWTransaction, instances):
+    locations: dict[int, m.Location] = {}
+    items: dict[int, m.Item] = {}
+
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, m.Item) and not obj.is_deleted:
+            items[id(obj)] = obj
+        elif isinstance(obj, m.Location) and obj.item_id:
+            # a new location may not be linked to its item object yet
+            item = session.get(m.Item, obj.item_id)
+            if item:
+                items[id(item)] = item
+                locations[id(item)] = obj
+        elif isinstance(obj, m.Amenity):
+            amenity_items = session.scalars(
+                sa.select(m.Item)
+                .join(m.amenities_items, m.amenities_items.c.item_id == m.Item.id)
+                .where(m.amenities_items.c.amenity_id == obj.id, m.Item.is_deleted.is_(False))
+            )
+            for item in amenity_items:
+                items[id(item)] = item
+
+    for key, item in items.items():
+        location = locations[key] if key in locations else item.location
+        item.search_text = build_item_search_text(item, location)
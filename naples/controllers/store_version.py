@@ -0,0 +1,190 @@
+from datetime import datetime
+from typing import Callable
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import Session
+
+from naples import models as m
+from naples.models.utils import datetime_utc
+from naples.response_cache import get_store_tag, response_cache
+
+# storefront content hanging off an item
+ITEM_CONTENT_MODELS = (m.Location, m.Rate, m.Fee, m.BookedDate, m.FloorPlan)
+
+# ids of the stores changed by the transaction, in session.info until it ends
+CHANGED_STORE_IDS = "content_changed_store_ids"
+
+StoresChangedCallback = Callable[[set[int]], None]
+stores_changed_callbacks: list[StoresChangedCallback] = []
+
+
+def get_store_content_version(db: Session, store_id: int) -> tuple[int, datetime | None]:
+    """Current content version of the store and its time, read from the database to be the same in all workers"""
+
+    row = db.execute(
+        sa.select(m.Store.content_version, m.Store.content_updated_at).where(m.Store.id == store_id)
+    ).one_or_none()
+    return (row.content_version, row.content_updated_at) if row else (0, None)
+
+
+def get_files_store_ids_stmt(file_ids: set[int]) -> sa.CompoundSelect:
+    """Stores showing any of the files: as item media, floor plans, logos, covers or member avatars"""
+
+    item_files = [m.items_images, m.items_videos, m.items_documents]
+    marker_items = (
+        sa.select(m.Item.store_id)
+        .join(m.FloorPlan, m.FloorPlan.item_id == m.Item.id)
+        .join(m.FloorPlanMarker, m.FloorPlanMarker.floor_plan_id == m.FloorPlan.id)
+        .join(
+            m.floor_plan_markers_images,
+            m.floor_plan_markers_images.c.floor_plan_marker_id == m.FloorPlanMarker.id,
+        )
+        .where(m.floor_plan_markers_images.c.file_id.in_(file_ids))
+    )
+    return sa.union(
+        *[
+            sa.select(m.Item.store_id).join(table, table.c.item_id == m.Item.id).where(table.c.file_id.in_(file_ids))
+            for table in item_files
+        ],
+        sa.select(m.Item.store_id).where(m.Item.main_media_id.in_(file_ids)),
+        sa.select(m.Item.store_id)
+        .join(m.FloorPlan, m.FloorPlan.item_id == m.Item.id)
+        .where(m.FloorPlan.image_id.in_(file_ids)),
+        marker_items,
+        sa.select(m.Store.id).where(
+            sa.or_(
+                m.Store.main_media_id.in_(file_ids),
+                m.Store.logo_id.in_(file_ids),
+                m.Store.about_us_main_media_id.in_(file_ids),
+            )
+        ),
+        sa.select(m.Member.store_id).where(m.Member.avatar_id.in_(file_ids)),
+    )
+
+
+def on_stores_changed(callback: StoresChangedCallback) -> StoresChangedCallback:
+    """Call back with the ids of the changed stores once the transaction changing them is committed"""
+
+    stores_changed_callbacks.append(callback)
+    return callback
+
+
+def mark_stores_changed(session: Session, store_ids: set[int]):
+    """Bump the content version of the stores, for the writes the ORM does not track (Core statements)"""
+
+    if not store_ids:
+        return
+    session.info.setdefault(CHANGED_STORE_IDS, set()).update(store_ids)
+    session.connection().execute(
+        sa.update(m.Store)
+        .where(m.Store.id.in_(store_ids))
+        .values(content_version=m.Store.content_version + 1, content_updated_at=datetime_utc())
+    )
+
+
+def get_store_ids_stmt(model: type, whereclause: sa.ColumnElement | None) -> sa.Select | None:
+    """Stores of the rows of the model matching the clause, none if the model does not change a storefront"""
+
+    def rows(column) -> sa.Select:
+        stmt = sa.select(column)
+        return stmt.where(whereclause) if whereclause is not None else stmt
+
+    if model is m.Store:
+        return rows(m.Store.id)
+    if model is m.Item:
+        return rows(m.Item.store_id)
+    if model is m.Member:
+        return rows(m.Member.store_id)
+    if model is m.User:
+        return sa.select(m.Store.id).where(m.Store.user_id.in_(rows(m.User.id)))
+    if model is m.Subscription:
+        return sa.select(m.Store.id).where(m.Store.user_id.in_(rows(m.Subscription.user_id)))
+    if model in ITEM_CONTENT_MODELS:
+        return sa.select(m.Item.store_id).where(m.Item.id.in_(rows(getattr(model, "item_id"))))
+    return None
+
+
+def get_flushed_store_ids(session: Session) -> set[int]:
+    """Stores whose storefront shows any of the objects of the flush"""
+
+    store_ids: set[int] = set()
+    user_ids: set[int] = set()
+    item_ids: set[int] = set()
+    floor_plan_ids: set[int] = set()
+    file_ids: set[int] = set()
+    link_ids: set[int] = set()
+    amenity_ids: set[int] = set()
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, m.Store):
+            store_ids.add(obj.id)
+        elif isinstance(obj, (m.Item, m.Member)):
+            store_ids.add(obj.store_id)
+        elif isinstance(obj, m.User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, m.Subscription):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, ITEM_CONTENT_MODELS):
+            item_ids.add(obj.item_id)
+        elif isinstance(obj, m.FloorPlanMarker):
+            floor_plan_ids.add(obj.floor_plan_id)
+        elif isinstance(obj, m.File):
+            file_ids.add(obj.id)
+        elif isinstance(obj, m.Link):
+            link_ids.add(obj.id)
+        elif isinstance(obj, m.Amenity):
+            amenity_ids.add(obj.id)
+
+    conn = session.connection()
+    if user_ids:
+        store_ids.update(conn.scalars(sa.select(m.Store.id).where(m.Store.user_id.in_(user_ids))))
+    if floor_plan_ids:
+        item_ids.update(conn.scalars(sa.select(m.FloorPlan.item_id).where(m.FloorPlan.id.in_(floor_plan_ids))))
+    if link_ids:
+        item_ids.update(conn.scalars(sa.select(m.items_links.c.item_id).where(m.items_links.c.link_id.in_(link_ids))))
+    if amenity_ids:
+        item_ids.update(
+            conn.scalars(sa.select(m.amenities_items.c.item_id).where(m.amenities_items.c.amenity_id.in_(amenity_ids)))
+        )
+    if item_ids:
+        store_ids.update(conn.scalars(sa.select(m.Item.store_id).where(m.Item.id.in_(item_ids))))
+    if file_ids:
+        store_ids.update(conn.scalars(get_files_store_ids_stmt(file_ids)))
+    return store_ids
+
+
+# the one place the changes of the stores are collected, the caches subscribe with on_stores_changed
+@sa.event.listens_for(Session, "after_flush")
+def collect_flushed_store_changes(session: Session, flush_context: orm.UOWTransaction):
+    mark_stores_changed(session, get_flushed_store_ids(session))
+
+
+@sa.event.listens_for(Session, "do_orm_execute")
+def collect_bulk_store_changes(orm_execute_state: orm.ORMExecuteState):
+    mapper = orm_execute_state.bind_mapper
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete) or mapper is None:
+        return
+    # the rows are selected before the statement changes or deletes them
+    stmt = get_store_ids_stmt(mapper.class_, getattr(orm_execute_state.statement, "whereclause", None))
+    if stmt is not None:
+        session = orm_execute_state.session
+        mark_stores_changed(session, set(session.connection().scalars(stmt)))
+
+
+@sa.event.listens_for(Session, "after_commit")
+def notify_stores_changed(session: Session):
+    store_ids = session.info.pop(CHANGED_STORE_IDS, set())
+    if store_ids:
+        for callback in stores_changed_callbacks:
+            callback(store_ids)
+
+
+@sa.event.listens_for(Session, "after_rollback")
+def forget_store_changes(session: Session):
+    session.info.pop(CHANGED_STORE_IDS, None)
+
+
+@on_stores_changed
+def invalidate_store_responses(store_ids: set[int]):
+    response_cache.invalidate_tags([get_store_tag(store_id) for store_id in store_ids])
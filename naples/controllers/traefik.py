@@ -0,0 +1,164 @@
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.cache import TTLCache
+from naples.config import config
+from naples.logger import log
+from naples.models.utils import datetime_utc
+from services.store.add_dns_record import get_subdomain_from_url
+
+CFG = config()
+
+STORE_URLS_VERSION = "store_urls"
+
+# serialized dynamic configs by store urls version, a new version is a new key
+traefik_configs: TTLCache[int, bytes] = TTLCache(maxsize=4, ttl=CFG.TRAEFIK_CONFIG_CACHE_TTL)
+
+
+def get_config_version(db: Session, name: str) -> int:
+    return db.scalar(sa.select(m.ConfigVersion.version).where(m.ConfigVersion.name == name)) or 0
+
+
+def get_store_routers(stores: list[s.TraefikStoreData], service: str | None = None) -> dict[str, s.TraefikRoute]:
+    """A router per store, to the shared service or else to the service of the store"""
+
+    return {
+        store.subdomain: s.TraefikRoute(
+            rule=f"Host(`{store.store_url}`)",
+            service=service or store.subdomain,
+            tls=s.TraefikTLS(certResolver=CFG.CERT_RESOLVER),
+        )
+        for store in stores
+    }
+
+
+def is_wildcard_host(url: str) -> bool:
+    subdomain = url.removesuffix(f".{CFG.MAIN_DOMAIN}")
+    return url == CFG.MAIN_DOMAIN or (subdomain != url and "." not in subdomain)
+
+
+def get_wildcard_routers(stores: list[s.TraefikStoreData], service: str) -> dict[str, s.TraefikRoute]:
+    """Subdomain stores batched by TRAEFIK_HOSTS_PER_ROUTER, all of them under one *.MAIN_DOMAIN certificate"""
+
+    tls = s.TraefikTLS(
+        certResolver=CFG.CERT_RESOLVER,
+        domains=[s.TraefikDomain(main=CFG.MAIN_DOMAIN, sans=[f"*.{CFG.MAIN_DOMAIN}"])],
+    )
+    size = max(CFG.TRAEFIK_HOSTS_PER_ROUTER, 1)
+    return {
+        f"{service}-{index // size}": s.TraefikRoute(
+            rule=" || ".join(f"Host(`{store.store_url}`)" for store in stores[index : index + size]),
+            service=service,
+            tls=tls,
+        )
+        for index in range(0, len(stores), size)
+    }
+
+
+def build_traefik_config(db: Session) -> s.TraefikData | None:
+    """Routers and services of the urls of the provisioned stores, None if there are none"""
+
+    # a store is routed once the record of its subdomain exists
+    stores = db.execute(
+        sa.select(m.Store.uuid, m.Store.url)
+        .where(m.Store.dns_status == s.DNSStatus.PROVISIONED.value)
+        .order_by(m.Store.id)
+    ).all()
+    if not stores:
+        return None
+
+    data_stores = [
+        s.TraefikStoreData(
+            uuid=store.uuid,
+            subdomain=get_subdomain_from_url(store.url) or store.uuid,
+            store_url=store.url,
+        )
+        for store in stores
+        if store.url
+    ]
+
+    load_balancer = s.TraefikLoadBalancer(servers=[s.TraefikServer(url=f"http://{CFG.WEB_SERVICE_NAME}")])
+
+    if not CFG.TRAEFIK_COMPACT_CONFIG:
+        return s.TraefikData(
+            http=s.TraefikHttp(
+                routers=get_store_routers(data_stores),
+                services={store.subdomain: s.TraefikService(loadBalancer=load_balancer) for store in data_stores},
+            )
+        )
+
+    # one service for all stores, the routers only differ by their rules
+    service = CFG.TRAEFIK_SERVICE_NAME
+    if CFG.TRAEFIK_WILDCARD_CERT:
+        # custom domains still get a router and a certificate of their own
+        subdomain_stores = [store for store in data_stores if is_wildcard_host(store.store_url)]
+        domain_stores = [store for store in data_stores if not is_wildcard_host(store.store_url)]
+        routers = get_wildcard_routers(subdomain_stores, service) | get_store_routers(domain_stores, service)
+    else:
+        routers = get_store_routers(data_stores, service)
+
+    return s.TraefikData(
+        http=s.TraefikHttp(routers=routers, services={service: s.TraefikService(loadBalancer=load_balancer)})
+    )
+
+
+def get_traefik_config(db: Session, version: int) -> bytes | None:
+    """Dynamic config of the version, built once per worker"""
+
+    config_json = traefik_configs.get(version)
+    if config_json is None:
+        traefik_data = build_traefik_config(db)
+        if traefik_data is None:
+            return None
+        config_json = traefik_data.model_dump_json(exclude_none=True).encode()
+        traefik_configs.set(version, config_json)
+    return config_json
+
+
+# names of the config versions changed by the transaction, in session.info until it ends
+CHANGED_CONFIG_VERSIONS = "changed_config_versions"
+
+
+def bump_config_version(session: Session, name: str):
+    """Bump the version in a short transaction of its own, the row is not locked while a request runs"""
+
+    # the engine of a session bound to a connection as well
+    with session.get_bind(m.ConfigVersion).engine.begin() as connection:
+        connection.execute(
+            sa.update(m.ConfigVersion)
+            .where(m.ConfigVersion.name == name)
+            .values(version=m.ConfigVersion.version + 1, updated_at=datetime_utc())
+        )
+
+
+@sa.event.listens_for(Session, "after_flush")
+def mark_store_urls_changed(session: Session, flush_context: orm.UOWTransaction):
+    changed = any(isinstance(obj, m.Store) for obj in (*session.new, *session.deleted)) or any(
+        isinstance(obj, m.Store)
+        and (
+            orm.attributes.get_history(obj, "url").has_changes()
+            or orm.attributes.get_history(obj, "dns_status").has_changes()
+        )
+        for obj in session.dirty
+    )
+    if changed:
+        session.info.setdefault(CHANGED_CONFIG_VERSIONS, set()).add(STORE_URLS_VERSION)
+
+
+@sa.event.listens_for(Session, "after_commit")
+def bump_changed_config_versions(session: Session):
+    # bumped once the changes are visible, a config built from the old rows stays under the old version
+    for name in session.info.pop(CHANGED_CONFIG_VERSIONS, set()):
+        try:
+            bump_config_version(session, name)
+        except SQLAlchemyError as e:
+            # the changes are committed already, the cached configs are rebuilt after TRAEFIK_CONFIG_CACHE_TTL
+            log(log.ERROR, "Config version [%s] not bumped: %s", name, e)
+
+
+@sa.event.listens_for(Session, "after_rollback")
+def forget_config_changes(session: Session):
+    session.info.pop(CHANGED_CONFIG_VERSIONS, None)
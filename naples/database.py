@@ -1,16 +1,59 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+import sqlalchemy as sa
 from alchemical import Alchemical
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
 from .config import config
+from .sql_metrics import instrument_engine
 
 CFG = config()
 
 
 db = Alchemical()
-db.initialize(url=CFG.ALCHEMICAL_DATABASE_URL)
+db.initialize(
+    url=CFG.ALCHEMICAL_DATABASE_URL,
+    engine_options={"pool_size": CFG.DB_POOL_SIZE, "max_overflow": CFG.DB_MAX_OVERFLOW},
+)
+instrument_engine(db.get_engine())
+
+
+def get_async_database_url(url: str) -> sa.URL:
+    """The same database through its async driver: asyncpg for postgres, aiosqlite for sqlite"""
+
+    database_url = sa.make_url(url)
+    backend = database_url.get_backend_name()
+    if backend == "postgresql":
+        return database_url.set(drivername="postgresql+asyncpg")
+    if backend == "sqlite":
+        return database_url.set(drivername="sqlite+aiosqlite")
+    raise ValueError(f"No async driver for [{backend}]")
+
+
+async_database_url = get_async_database_url(CFG.ALCHEMICAL_DATABASE_URL)
+# aiosqlite opens a connection per checkout, there is no pool to size
+async_engine = create_async_engine(
+    async_database_url,
+    **(
+        {}
+        if async_database_url.get_backend_name() == "sqlite"
+        else {"pool_size": CFG.DB_POOL_SIZE, "max_overflow": CFG.DB_MAX_OVERFLOW}
+    ),
+)
+instrument_engine(async_engine.sync_engine)
+async_session = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def get_db() -> Generator[Session, None, None]:
     with db.Session() as session:
         yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session of the async routes, the one connection of the request.
+
+    ORM objects must be used (lazy loads, validation into schemas) inside run_sync.
+    """
+
+    async with async_session() as session:
+        yield session
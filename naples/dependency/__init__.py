@@ -1,6 +1,6 @@
 # ruff: noqa: F401
 from .user import get_current_user
-from .store import get_current_store
+from .store import get_current_store, get_current_store_snapshot, store_snapshots
 from .s3_client import get_s3_connect
 from .item import get_item
 from .realtor import get_realtor
@@ -9,3 +9,5 @@ from .ses_client import get_ses_client
 from .get_user_subscribe import get_user_subscribe
 from .admin import get_admin
 from .get_user_admin import get_user_admin
+from .http_cache import check_conditional_request, check_store_etag, get_content_etag, get_store_version
+from .response_cache import use_response_cache
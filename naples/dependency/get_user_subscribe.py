@@ -1,27 +1,25 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from naples import models as m, schemas as s
-from naples.database import get_db
+from naples import schemas as s
 
-from .store import get_current_store
+from .store import get_current_store_snapshot
 from naples.logger import log
 
 
-def get_user_subscribe(store: m.Store = Depends(get_current_store), db: Session = Depends(get_db)) -> m.Subscription:
-    """Get the current subscription for authorized user.
-    Should be used for endpoints related to subscription management by clients."""
+def get_user_subscribe(store: s.StoreSnapshot = Depends(get_current_store_snapshot)) -> s.StoreSnapshot:
+    """Check the subscription of the store owner.
+    Should be used for storefront endpoints, which are available only for stores with an active subscription."""
 
     if store.is_protected:
         log(log.INFO, "Store {%s} is protected", store.uuid)
-        return store.user.subscription
+        return store
 
-    if not store.user.subscription:
-        log(log.INFO, "User {%s} does not have a subscription", store.user.uuid)
+    if not store.has_subscription:
+        log(log.INFO, "User of store {%s} does not have a subscription", store.uuid)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User does not have a subscription")
 
-    if store.status.value == s.StoreStatus.INACTIVE.value and store.user.role != s.UserRole.ADMIN.value:
+    if store.status == s.StoreStatus.INACTIVE and not store.is_admin:
         log(log.INFO, "Store {%s} is inactive", store.uuid)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Subscription is expired")
 
-    return store.user.subscription
+    return store
@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from naples import controllers as c, schemas as s
+from naples.config import config
+from naples.database import get_async_db
+from naples.logger import log
+
+from .get_user_subscribe import get_user_subscribe
+
+CFG = config()
+
+
+def get_cache_control() -> str:
+    return f"public, max-age={CFG.STOREFRONT_CACHE_MAX_AGE}, must-revalidate"
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def check_conditional_request(request: Request, response: Response, etag: str, last_modified: datetime | None = None):
+    """Answer 304 if the client already has this version, otherwise add the validators to the response"""
+
+    headers = {"ETag": etag, "Cache-Control": get_cache_control()}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        log(log.DEBUG, "Not modified [%s] %s", request.url.path, etag)
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+
+
+async def get_store_version(
+    store: s.StoreSnapshot = Depends(get_user_subscribe),
+    db: AsyncSession = Depends(get_async_db),
+) -> tuple[int, datetime | None]:
+    """Content version of the store, read once per request on the session of the route"""
+
+    return await db.run_sync(c.get_store_content_version, store.id)
+
+
+async def check_store_etag(
+    request: Request,
+    response: Response,
+    store: s.StoreSnapshot = Depends(get_user_subscribe),
+    store_version: tuple[int, datetime | None] = Depends(get_store_version),
+) -> str:
+    """Conditional GET by the content version of the store, before the route loads anything"""
+
+    version, updated_at = store_version
+    last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+    etag = f'"{store.uuid}-{version}"'
+    check_conditional_request(request, response, etag, last_modified)
+    return etag
+
+
+def get_content_etag(content: str) -> str:
+    return f'"{hashlib.sha1(content.encode()).hexdigest()}"'
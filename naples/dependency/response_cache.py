@@ -0,0 +1,47 @@
+import time
+from urllib.parse import urlencode
+
+from fastapi import Depends, Request
+
+from naples import schemas as s
+from naples.config import config
+from naples.response_cache import CachedResponse, CachedResponseHit, get_lock_key, get_store_tag, response_cache
+
+from .get_user_subscribe import get_user_subscribe
+from .http_cache import check_store_etag
+
+CFG = config()
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_response_cache_key(request: Request, etag: str) -> str:
+    # the etag carries the store content version, so a missed invalidation can't serve old content
+    version = etag.strip('"')
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"response:{version}:{request.url.path}?{query}"
+
+
+def use_response_cache(
+    request: Request,
+    store: s.StoreSnapshot = Depends(get_user_subscribe),
+    etag: str = Depends(check_store_etag),
+):
+    """Answer from the shared response cache, or mark the response to be stored by the middleware"""
+
+    key = get_response_cache_key(request, etag)
+    cached = response_cache.get(key)
+
+    locked = False
+    if cached is None:
+        locked = response_cache.add(get_lock_key(key), CFG.RESPONSE_CACHE_LOCK_TIMEOUT)
+        # another request is rendering the same response, wait for it instead of hitting the database too
+        deadline = time.monotonic() + CFG.RESPONSE_CACHE_LOCK_TIMEOUT
+        while not locked and cached is None and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            cached = response_cache.get(key)
+
+    if cached is not None:
+        raise CachedResponseHit(CachedResponse.loads(cached))
+
+    request.state.response_cache = (key, [get_store_tag(store.id)], locked)
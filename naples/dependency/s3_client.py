@@ -1,6 +1,7 @@
 from functools import cache
 
 import boto3
+from botocore.config import Config
 from mypy_boto3_s3 import S3Client
 
 
@@ -14,5 +15,6 @@ def get_s3_connect() -> S3Client:
         aws_access_key_id=settings.AWS_ACCESS_KEY,
         aws_secret_access_key=settings.AWS_SECRET_KEY,
     )
-    s3 = session.client("s3")
+    # one client is shared by all requests, its connection pool has to fit the parallel uploads
+    s3 = session.client("s3", config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS))
     return s3
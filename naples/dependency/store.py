@@ -3,19 +3,52 @@ import validators
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
+from sqlalchemy import orm
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
-from naples.database import get_db
+from naples.cache import TTLCache
+from naples.config import config
+from naples.database import async_session, get_db
 import naples.models as m
+from naples import controllers as c
+import naples.schemas as s
 from naples.logger import log
 
+CFG = config()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+store_snapshots: TTLCache[str, s.StoreSnapshot] = TTLCache(maxsize=CFG.STORE_CACHE_SIZE, ttl=CFG.STORE_CACHE_TTL)
 
-def get_current_store(store_url: str | None, db: Session = Depends(get_db)) -> m.Store:
-    """Get the current store from the database"""
+
+def create_store_snapshot(store: m.Store) -> s.StoreSnapshot:
+    subscription = store.user.subscription
+    return s.StoreSnapshot(
+        id=store.id,
+        uuid=store.uuid,
+        url=store.url,
+        is_protected=store.is_protected,
+        is_blocked=store.user.is_blocked,
+        is_admin=store.user.role == s.UserRole.ADMIN.value,
+        has_subscription=subscription is not None,
+        status=store.status if subscription else None,
+    )
+
+
+def load_store_snapshot(db: Session, store_url: str) -> s.StoreSnapshot | None:
+    store = db.scalar(
+        sa.select(m.Store)
+        .where(
+            m.Store.url == store_url,
+        )
+        .options(orm.joinedload(m.Store.user).selectinload(m.User.subscriptions))
+    )
+    return create_store_snapshot(store) if store else None
+
+
+async def get_current_store_snapshot(store_url: str | None) -> s.StoreSnapshot:
+    """Resolve the store by url, from the cache when possible"""
 
     if store_url is None:
         log(log.INFO, "Store URL is not provided")
@@ -24,32 +57,59 @@ def get_current_store(store_url: str | None, db: Session = Depends(get_db)) -> m
             detail="Store URL is not provided",
         )
 
-    if not validators.domain(store_url):
-        log(log.INFO, "Invalid URL: %s", store_url)
+    snapshot = store_snapshots.get(store_url)
+
+    if snapshot is None:
+        if not validators.domain(store_url):
+            log(log.INFO, "Invalid URL: %s", store_url)
+
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid URL",
+            )
+
+        # a session of its own, the connection goes back to the pool before the route takes one
+        async with async_session() as db:
+            snapshot = await db.run_sync(load_store_snapshot, store_url)
 
+        if snapshot is None:
+            log(log.INFO, "Store not found: %s", store_url)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Store not found",
+            )
+
+        store_snapshots.set(store_url, snapshot)
+
+    if snapshot.is_blocked:
+        log(log.INFO, "User is blocked")
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid URL",
+            status_code=status.HTTP_423_LOCKED,
+            detail="Your account is blocked! Contact the support service",
         )
 
-    store = db.scalar(
-        sa.select(m.Store).where(
-            m.Store.url == store_url,
-        )
-    )
+    return snapshot
+
+
+def get_current_store(
+    snapshot: s.StoreSnapshot = Depends(get_current_store_snapshot), db: Session = Depends(get_db)
+) -> m.Store:
+    """Get the current store from the database"""
+
+    store = db.get(m.Store, snapshot.id)
 
     if store is None:
-        log(log.INFO, "Store not found: %s", store_url)
+        log(log.INFO, "Store not found: %s", snapshot.url)
+        store_snapshots.pop(snapshot.url)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Store not found",
         )
 
-    if store.user.is_blocked:
-        log(log.INFO, "User is blocked")
-        raise HTTPException(
-            status_code=status.HTTP_423_LOCKED,
-            detail="Your account is blocked! Contact the support service",
-        )
-
     return store
+
+
+@c.on_stores_changed
+def invalidate_store_snapshots(store_ids: set[int]):
+    # by id, the cache key is the url the store had when it was cached
+    store_snapshots.discard(lambda snapshot: snapshot.id in store_ids)
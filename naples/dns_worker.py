@@ -0,0 +1,38 @@
+"""Adds and deletes the DNS records of the store subdomains: python -m naples.dns_worker"""
+
+import signal
+import threading
+
+from naples import controllers as c
+from naples.config import config
+from naples.database import db
+from naples.logger import log
+from services.store.godaddy import godaddy_client
+
+CFG = config()
+
+
+def run_dns_worker(stop: threading.Event):
+    log(log.INFO, "DNS worker started")
+    while not stop.is_set():
+        try:
+            with db.Session() as session:
+                processed = c.run_dns_jobs(session, godaddy_client)
+        except Exception as e:
+            log(log.ERROR, "DNS worker error: %s", e)
+            processed = 0
+
+        if not processed:
+            stop.wait(CFG.DNS_WORKER_POLL_INTERVAL)
+    log(log.INFO, "DNS worker stopped")
+
+
+def main():
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    run_dns_worker(stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import html
+import re
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from naples import models as m
+from naples.config import config
+
+CFG = config()
+
+TEMPLATES_DIR = Path(__file__).parent / "templates" / "email"
+
+RE_FIELD = re.compile(r"{{\s*(\w+)\s*}}")
+
+
+class EmailTemplate:
+    """HTML template split once into its static parts and {{ field }} slots.
+
+    Fields given to the constructor are the same for every email and are merged into the static parts,
+    rendering only joins the static parts with the escaped values of the remaining fields.
+    """
+
+    def __init__(self, source: str, **static_fields: str):
+        parts = RE_FIELD.split(source)
+        texts, fields = parts[::2], parts[1::2]
+
+        self.texts: list[str] = [texts[0]]
+        self.fields: list[str] = []
+        for field, text in zip(fields, texts[1:]):
+            if field in static_fields:
+                self.texts[-1] += html.escape(static_fields[field]) + text
+            else:
+                self.fields.append(field)
+                self.texts.append(text)
+
+    @classmethod
+    def load(cls, name: str, **static_fields: str) -> "EmailTemplate":
+        return cls((TEMPLATES_DIR / name).read_text(), **static_fields)
+
+    def _render(self, values: Mapping[str, str]) -> str:
+        parts = [self.texts[0]]
+        for field, text in zip(self.fields, self.texts[1:]):
+            parts.append(values[field])
+            parts.append(text)
+        return "".join(parts)
+
+    def render(self, **fields: str) -> str:
+        return self._render({field: html.escape(str(value)) for field, value in fields.items()})
+
+    def render_many(self, recipients: Iterable[Mapping[str, str]], **shared_fields: str) -> list[str]:
+        """One email per recipient, fields shared by all of them are escaped once"""
+
+        shared = {field: html.escape(str(value)) for field, value in shared_fields.items()}
+        return [
+            self._render(shared | {field: html.escape(str(value)) for field, value in recipient.items()})
+            for recipient in recipients
+        ]
+
+
+# compiled once, when the app starts
+VERIFY_EMAIL = EmailTemplate.load(
+    "action.html",
+    title="Click the link to verify your email!",
+    text="Click the button below to verify your email address. "
+    "If you did not sign up for an account, you can safely ignore this email.",
+    button="Verify Email",
+)
+CHANGE_PASSWORD = EmailTemplate.load(
+    "action.html",
+    title="Click the link to change your password!",
+    text="Click the button below to change your password. "
+    "If you did not request a password change, you can safely ignore this email.",
+    button="Change Password",
+)
+CONTACT_REQUEST = EmailTemplate.load("contact_request.html")
+SUBSCRIPTION_EXPIRY = EmailTemplate.load("subscription_expiry.html", link=CFG.REDIRECT_URL)
+
+
+def get_token_link(token: str, router: str) -> str:
+    return f"{CFG.REDIRECT_URL}{router}?token={token}"
+
+
+def render_verify_email(token: str) -> str:
+    return VERIFY_EMAIL.render(link=get_token_link(token, CFG.REDIRECT_ROUTER_VERIFY_EMAIL))
+
+
+def render_change_password(token: str, router: str) -> str:
+    return CHANGE_PASSWORD.render(link=get_token_link(token, router))
+
+
+def render_contact_request(contact_request: m.ContactRequest | m.AdminContactRequest) -> str:
+    return CONTACT_REQUEST.render(
+        first_name=contact_request.first_name,
+        last_name=contact_request.last_name,
+        email=contact_request.email,
+        phone=contact_request.phone,
+        message=contact_request.message,
+    )
+
+
+def render_subscription_expiry(subscriptions: list[m.Subscription]) -> list[str]:
+    return SUBSCRIPTION_EXPIRY.render_many(
+        {"first_name": subscription.user.first_name, "end_date": f"{subscription.end_date:%B %d, %Y}"}
+        for subscription in subscriptions
+    )
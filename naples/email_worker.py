@@ -0,0 +1,42 @@
+"""Sends the emails of the outbox: python -m naples.email_worker"""
+
+import signal
+import threading
+
+from naples import controllers as c
+from naples.config import config
+from naples.database import db
+from naples.dependency.ses_client import get_ses_client
+from naples.logger import log
+
+CFG = config()
+
+
+def run_email_worker(stop: threading.Event):
+    ses_client = get_ses_client()
+    # one limiter for all the threads, the workers together keep to the SES send rate
+    limiter = c.RateLimiter(c.get_worker_send_rate())
+
+    log(log.INFO, "Email worker started")
+    while not stop.is_set():
+        try:
+            with db.Session() as session:
+                processed = c.send_queued_emails(session, ses_client, limiter)
+        except Exception as e:
+            log(log.ERROR, "Email worker error: %s", e)
+            processed = 0
+
+        if not processed:
+            stop.wait(CFG.EMAIL_WORKER_POLL_INTERVAL)
+    log(log.INFO, "Email worker stopped")
+
+
+def main():
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    run_email_worker(stop)
+
+
+if __name__ == "__main__":
+    main()
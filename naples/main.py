@@ -8,12 +8,17 @@ from naples.config import config
 
 from .utils import custom_generate_unique_id
 from .routes import router
+from .sql_metrics import sql_metrics_middleware
+from .response_cache import CachedResponseHit, cached_response_hit_handler, response_cache_middleware
 
 CFG = config()
 
 
 api = FastAPI(version=CFG.VERSION, generate_unique_id_function=custom_generate_unique_id)
 add_pagination(api)
+api.middleware("http")(response_cache_middleware)
+api.middleware("http")(sql_metrics_middleware)
+api.add_exception_handler(CachedResponseHit, cached_response_hit_handler)
 api.include_router(router)
 
 
@@ -2,7 +2,7 @@
 from naples.database import db
 from .user import User
 from .store import Store
-from .amenity_item import AmenityItem
+from .amenity_item import AmenityItem, amenities_items
 from .item import Item
 from .member import Member
 from .file import File
@@ -15,11 +15,11 @@ from .rate import Rate
 from .floor_plan import FloorPlan
 from .floor_plan_marker import FloorPlanMarker
 from .booked_date import BookedDate
-from .floor_plan_markers_image import FloorPlanMarkerImage
-from .item_image import ItemImage
-from .item_video import ItemVideo
-from .item_link import ItemLink
-from .item_document import ItemDocument
+from .floor_plan_markers_image import FloorPlanMarkerImage, floor_plan_markers_images
+from .item_image import ItemImage, items_images
+from .item_video import ItemVideo, items_videos
+from .item_link import ItemLink, items_links
+from .item_document import ItemDocument, items_documents
 from .contact_request import ContactRequest
 from .subscription import Subscription
 from .product import Product
@@ -28,3 +28,6 @@ from .link import Link
 from .admin_contact_request import AdminContactRequest
 from .metadata import Metadata
 from .location import Location
+from .email import Email
+from .config_version import ConfigVersion
+from .dns_job import DNSJob
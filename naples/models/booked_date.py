@@ -13,6 +13,17 @@ if TYPE_CHECKING:
 
 class BookedDate(db.Model):
     __tablename__ = "booked_dates"
+    # availability checks look up the active bookings of an item by date range
+    __table_args__ = (
+        sa.Index(
+            "ix_booked_dates_item_id_from_date_to_date",
+            "item_id",
+            "from_date",
+            "to_date",
+            postgresql_where=sa.text("NOT is_deleted"),
+            sqlite_where=sa.text("NOT is_deleted"),
+        ),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
 
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from naples.database import db
+
+from .utils import datetime_utc
+
+
+# counters of generated configs, the workers rebuild their cached copy when it moves
+class ConfigVersion(db.Model):
+    __tablename__ = "config_versions"
+
+    name: orm.Mapped[str] = orm.mapped_column(sa.String(64), primary_key=True)
+    version: orm.Mapped[int] = orm.mapped_column(default=1)
+    updated_at: orm.Mapped[datetime] = orm.mapped_column(default=datetime_utc)
+
+    def __repr__(self):
+        return f"<ConfigVersion [{self.name}]: [{self.version}]>"
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from naples.database import db
+from naples.schemas.dns import DNSJobStatus
+
+from .utils import datetime_utc
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .store import Store
+
+
+# records of the store subdomains to add or delete, run by the dns worker in the order they were queued
+class DNSJob(db.Model):
+    __tablename__ = "dns_jobs"
+    __table_args__ = (sa.Index("ix_dns_jobs_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
+
+    # the store waiting for the record, none for the deletions of the old subdomains
+    store_id: orm.Mapped[int | None] = orm.mapped_column(sa.ForeignKey("stores.id", ondelete="SET NULL"))
+    action: orm.Mapped[str] = orm.mapped_column(sa.String(16))
+    subdomain: orm.Mapped[str] = orm.mapped_column(sa.String(256))
+
+    status: orm.Mapped[str] = orm.mapped_column(sa.String(32), default=DNSJobStatus.PENDING.value)
+    attempts: orm.Mapped[int] = orm.mapped_column(default=0)
+    next_attempt_at: orm.Mapped[datetime] = orm.mapped_column(default=datetime_utc)
+    last_error: orm.Mapped[str] = orm.mapped_column(sa.Text, default="")
+
+    created_at: orm.Mapped[datetime] = orm.mapped_column(default=datetime_utc, server_default=sa.func.now())
+    done_at: orm.Mapped[datetime | None] = orm.mapped_column()
+
+    store: orm.Mapped["Store | None"] = orm.relationship()
+
+    def __repr__(self):
+        return f"<DNSJob [{self.id}]: [{self.action}] [{self.subdomain}] Status - [{self.status}]>"
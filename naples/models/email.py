@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from naples.database import db
+from naples.schemas.email import EmailStatus
+
+from .utils import create_uuid, datetime_utc
+
+
+# outbox of the emails, sent by the email worker after the transaction adding them is committed
+class Email(db.Model):
+    __tablename__ = "emails"
+    __table_args__ = (sa.Index("ix_emails_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
+    uuid: orm.Mapped[str] = orm.mapped_column(sa.String(32), default=create_uuid, unique=True)
+
+    recipient_email: orm.Mapped[str] = orm.mapped_column(sa.String(512))
+    sender_email: orm.Mapped[str] = orm.mapped_column(sa.String(512))
+    subject: orm.Mapped[str] = orm.mapped_column(sa.String(512), default="")
+    html: orm.Mapped[str] = orm.mapped_column(sa.Text, default="")
+    text: orm.Mapped[str] = orm.mapped_column(sa.Text, default="")
+    charset: orm.Mapped[str] = orm.mapped_column(sa.String(32), default="UTF-8")
+
+    status: orm.Mapped[str] = orm.mapped_column(sa.String(32), default=EmailStatus.PENDING.value)
+    attempts: orm.Mapped[int] = orm.mapped_column(default=0)
+    # a pending email is sent from this time on, moved forward by the retries and while a worker sends it
+    next_attempt_at: orm.Mapped[datetime] = orm.mapped_column(default=datetime_utc)
+    last_error: orm.Mapped[str] = orm.mapped_column(sa.Text, default="")
+    message_id: orm.Mapped[str] = orm.mapped_column(sa.String(128), default="")
+
+    created_at: orm.Mapped[datetime] = orm.mapped_column(default=datetime_utc, server_default=sa.func.now())
+    sent_at: orm.Mapped[datetime | None] = orm.mapped_column()
+
+    def __repr__(self):
+        return f"<Email [{self.uuid}]: To - [{self.recipient_email}] Status - [{self.status}]>"
@@ -5,6 +5,7 @@ from sqlalchemy import orm
 
 from naples.database import db
 from .utils import ModelMixin, create_uuid, datetime_utc
+from .item_image import items_images
 from naples import schemas as s
 from typing import TYPE_CHECKING
 
@@ -25,6 +26,8 @@ if TYPE_CHECKING:
 
 class Item(db.Model, ModelMixin):
     __tablename__ = "items"
+    # storefront price filter and sorting
+    __table_args__ = (sa.Index("ix_items_store_id_min_price", "store_id", "min_price"),)
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
 
@@ -63,6 +66,14 @@ class Item(db.Model, ModelMixin):
     monthly: orm.Mapped[bool] = orm.mapped_column(default=True, server_default=sa.true())
     annual: orm.Mapped[bool] = orm.mapped_column(default=True, server_default=sa.true())
 
+    # lowest night and highest month price of the active rates, kept up to date by the rates router
+    min_price: orm.Mapped[float] = orm.mapped_column(default=0, server_default="0")
+    max_price: orm.Mapped[float] = orm.mapped_column(default=0, server_default="0")
+
+    # lowercased name, description, address and amenities for the storefront search,
+    # kept up to date by naples.controllers.search; postgres indexes it with a GIN index
+    search_text: orm.Mapped[str] = orm.mapped_column(sa.Text, default="", server_default="")
+
     # store id should not be changed via API
     store_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey("stores.id"))
 
@@ -84,7 +95,11 @@ class Item(db.Model, ModelMixin):
 
     _main_media: orm.Mapped["File"] = orm.relationship()
 
-    _images: orm.Mapped[list["File"]] = orm.relationship(secondary="items_images")
+    _images: orm.Mapped[list["File"]] = orm.relationship(
+        secondary="items_images",
+        # new images (no position yet) go after the ordered ones, in the order they were added
+        order_by=(items_images.c.position.asc().nulls_last(), items_images.c.id),
+    )
 
     _documents: orm.Mapped[list["File"]] = orm.relationship(secondary="items_documents")
 
@@ -167,9 +182,7 @@ class Item(db.Model, ModelMixin):
 
     @property
     def images(self):
-        files_list = [i for i in self._images if not i.is_deleted]
-        files_list.sort(key=lambda file: file.updated_at)
-        return files_list
+        return [i for i in self._images if not i.is_deleted]
 
     @property
     def images_urls(self) -> list[str]:
@@ -185,7 +198,7 @@ class Item(db.Model, ModelMixin):
 
     @property
     def image_url(self) -> str:
-        if self.main_media.type == "image":
+        if self.main_media and self.main_media.type == "image":
             return self.main_media.url
         if self.images:
             return self.images[0].url
@@ -195,14 +208,6 @@ class Item(db.Model, ModelMixin):
     def logo_url(self) -> str:
         return self.store.logo_url
 
-    @property
-    def min_price(self) -> float:
-        return min([r.night for r in self.rates]) if self.rates else 0
-
-    @property
-    def max_price(self) -> float:
-        return max([r.month for r in self.rates]) if self.rates else 0
-
     @property
     def booked_dates(self) -> list["BookedDate"]:
         res = [b for b in self._booked_dates if not b.is_deleted]
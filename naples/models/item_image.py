@@ -9,6 +9,8 @@ items_images = sa.Table(
     sa.Column("id", sa.Integer, primary_key=True),
     sa.Column("file_id", sa.ForeignKey("files.id")),
     sa.Column("item_id", sa.ForeignKey("items.id")),
+    # order of the item images, NULL for images added after the last reordering
+    sa.Column("position", sa.Integer, nullable=True),
 )
 
 
@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 
 class Location(db.Model, ModelMixin):
     __tablename__ = "locations"
+    # prefix lookups of the map search, LIKE can use a pattern_ops index on postgres
+    __table_args__ = (sa.Index("ix_locations_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),)
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
 
@@ -22,6 +24,8 @@ class Location(db.Model, ModelMixin):
 
     latitude: orm.Mapped[float] = orm.mapped_column(default=0.0)
     longitude: orm.Mapped[float] = orm.mapped_column(default=0.0)
+    # of latitude and longitude, kept up to date by naples.controllers.geo
+    geohash: orm.Mapped[str] = orm.mapped_column(sa.String(12), default="", server_default="")
 
     item_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey("items.id"))
 
@@ -74,6 +74,15 @@ class Store(db.Model, ModelMixin):
 
     is_protected: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False, server_default="false")
 
+    # state of the record of the store subdomain, the store is routed once it is provisioned
+    dns_status: orm.Mapped[str] = orm.mapped_column(
+        sa.String(32), default=s.DNSStatus.PROVISIONED.value, server_default=s.DNSStatus.PROVISIONED.value
+    )
+
+    # bumped on every change of the storefront content, see naples.controllers.store_version
+    content_version: orm.Mapped[int] = orm.mapped_column(default=1, server_default="1")
+    content_updated_at: orm.Mapped[datetime | None] = orm.mapped_column(sa.DateTime, nullable=True)
+
     _main_media: orm.Mapped["File"] = orm.relationship(viewonly=True, foreign_keys=[main_media_id])
 
     _about_us_main_media: orm.Mapped["File"] = orm.relationship(viewonly=True, foreign_keys=[about_us_main_media_id])
@@ -149,22 +158,7 @@ class Store(db.Model, ModelMixin):
 
     @property
     def status(self):
-        if self.user.subscription.status == s.SubscriptionStatus.ACTIVE.value or (
-            self.user.subscription.status == s.SubscriptionStatus.TRIALING.value
-            and self.user.subscription.end_date > datetime.now()
-        ):
-            return s.StoreStatus.ACTIVE
-
-        if (
-            self.user.subscription.status == s.SubscriptionStatus.CANCELED.value
-            and self.user.subscription.end_date > datetime.now()
-        ):
-            return s.StoreStatus.ACTIVE
-        if (
-            self.user.subscription.status == s.SubscriptionStatus.CANCELED.value
-            or self.user.subscription.status != s.SubscriptionStatus.ACTIVE.value
-        ) and self.user.subscription.end_date < datetime.now():
-            return s.StoreStatus.INACTIVE
+        return get_store_status(self.user.subscription.status, self.user.subscription.end_date)
 
     def get_item_by_uuid(self, item_uuid: str):
         for item in self.items:
@@ -175,3 +169,21 @@ class Store(db.Model, ModelMixin):
 
     def __repr__(self):
         return f"<{self.id}:{self.url} >"
+
+
+def get_store_status(subscription_status: str, end_date: datetime) -> s.StoreStatus | None:
+    """Status of the store by the last subscription of its owner"""
+
+    if subscription_status == s.SubscriptionStatus.ACTIVE.value or (
+        subscription_status == s.SubscriptionStatus.TRIALING.value and end_date > datetime.now()
+    ):
+        return s.StoreStatus.ACTIVE
+
+    if subscription_status == s.SubscriptionStatus.CANCELED.value and end_date > datetime.now():
+        return s.StoreStatus.ACTIVE
+    if (
+        subscription_status == s.SubscriptionStatus.CANCELED.value
+        or subscription_status != s.SubscriptionStatus.ACTIVE.value
+    ) and end_date < datetime.now():
+        return s.StoreStatus.INACTIVE
+    return None
@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import cast
+from urllib.parse import urlparse
+
+import redis
+from fastapi import Request, Response
+from starlette.middleware.base import RequestResponseEndpoint
+
+from naples.cache import TTLCache
+from naples.config import config
+from naples.logger import log
+
+CFG = config()
+
+CACHE_HEADER = "X-Cache"
+# headers of the route response stored with the body
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def dumps(self) -> bytes:
+        return json.dumps({"headers": self.headers}).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        headers, body = data.split(b"\n", 1)
+        return cls(body=body, headers=json.loads(headers)["headers"])
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, headers=self.headers)
+        response.headers[CACHE_HEADER] = "HIT"
+        return response
+
+
+class CacheBackend(ABC):
+    """Storage of the serialized responses, shared by the uvicorn workers unless in memory"""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: int, tags: list[str]): ...
+
+    @abstractmethod
+    def invalidate_tags(self, tags: list[str]):
+        """Drop every entry stored with any of the tags"""
+
+    @abstractmethod
+    def add(self, key: str, ttl: int) -> bool:
+        """Set the key only if it is missing, used as a lock. True if the backend fails, the caller renders at once"""
+
+    @abstractmethod
+    def delete(self, key: str): ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local backend, for tests and a single worker"""
+
+    def __init__(self):
+        self._data: TTLCache[str, bytes] = TTLCache(maxsize=CFG.RESPONSE_CACHE_SIZE, ttl=CFG.RESPONSE_CACHE_TTL)
+        self._tags: dict[str, set[str]] = {}
+        self._locks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int, tags: list[str]):
+        self._data.set(key, value)
+        with self._lock:
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate_tags(self, tags: list[str]):
+        with self._lock:
+            keys = set().union(*[self._tags.pop(tag, set()) for tag in tags])
+        for key in keys:
+            self._data.pop(key)
+
+    def add(self, key: str, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._locks.get(key, 0) > now:
+                return False
+            self._locks[key] = now + ttl
+            return True
+
+    def delete(self, key: str):
+        self._data.pop(key)
+        with self._lock:
+            self._locks.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+        with self._lock:
+            self._tags.clear()
+            self._locks.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend shared by all workers, errors of the server are logged and treated as misses"""
+
+    def __init__(self, url: str, prefix: str = "naples:", client: redis.Redis | None = None):
+        self.client = client or redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return cast(bytes | None, self.client.get(self.prefix + key))
+        except redis.RedisError as e:
+            log(log.WARNING, "Response cache is not available: %s", e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl: int, tags: list[str]):
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            pipeline.sadd(tag_key, self.prefix + key)
+            pipeline.expire(tag_key, ttl)
+        try:
+            pipeline.execute()
+        except redis.RedisError as e:
+            log(log.WARNING, "Response cache is not available: %s", e)
+
+    def invalidate_tags(self, tags: list[str]):
+        try:
+            for tag in tags:
+                tag_key = f"{self.prefix}tag:{tag}"
+                keys = cast(set[bytes], self.client.smembers(tag_key))
+                self.client.delete(tag_key, *keys)
+        except redis.RedisError as e:
+            log(log.WARNING, "Response cache is not available: %s", e)
+
+    def add(self, key: str, ttl: int) -> bool:
+        try:
+            return bool(self.client.set(self.prefix + key, 1, nx=True, ex=ttl))
+        except redis.RedisError as e:
+            # taken: nobody else can be rendering into a cache that is down, so nobody is waited for
+            log(log.WARNING, "Response cache is not available: %s", e)
+            return True
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            log(log.WARNING, "Response cache is not available: %s", e)
+
+
+def create_cache_backend(url: str) -> CacheBackend:
+    """memory:// or redis://[:password@]host[:port][/db]"""
+
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryCacheBackend()
+    if scheme == "redis":
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unknown response cache backend [{url}]")
+
+
+response_cache = create_cache_backend(CFG.RESPONSE_CACHE_URL)
+
+
+def get_store_tag(store_id: int) -> str:
+    return f"store:{store_id}"
+
+
+def get_lock_key(key: str) -> str:
+    return f"lock:{key}"
+
+
+class CachedResponseHit(Exception):
+    def __init__(self, cached: CachedResponse):
+        self.cached = cached
+
+
+async def cached_response_hit_handler(request: Request, exc: Exception) -> Response:
+    assert isinstance(exc, CachedResponseHit)
+    return exc.cached.to_response()
+
+
+async def response_cache_middleware(request: Request, call_next: RequestResponseEndpoint) -> Response:
+    """Store the responses of the routes marked by the response cache dependency"""
+
+    response = await call_next(request)
+
+    entry = getattr(request.state, "response_cache", None)
+    if entry is None:
+        return response
+    key, tags, locked = entry
+
+    try:
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])  # type: ignore[attr-defined]
+        headers = {name: value for name, value in response.headers.items() if name in CACHED_HEADERS}
+        response_cache.set(key, CachedResponse(body=body, headers=headers).dumps(), CFG.RESPONSE_CACHE_TTL, tags)
+
+        response = Response(content=body, status_code=response.status_code, headers=dict(response.headers))
+        response.headers[CACHE_HEADER] = "MISS"
+        return response
+    finally:
+        if locked:
+            response_cache.delete(get_lock_key(key))
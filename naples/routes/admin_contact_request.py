@@ -1,14 +1,12 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
-from mypy_boto3_ses import SESClient
-from botocore.exceptions import ClientError
 
-from naples import schemas as s, models as m, dependency as d
+from naples import controllers as c, schemas as s, models as m, dependency as d
 from naples.logger import log
 from naples.database import get_db
 from naples.config import config
-from naples.utils import createMsgContactRequest, sendEmailAmazonSES
+from naples.email_templates import render_contact_request
 
 CFG = config()
 
@@ -24,11 +22,10 @@ admin_contact_request_router = APIRouter(prefix="/admin_contact_requests", tags=
         status.HTTP_404_NOT_FOUND: {"description": "Admin not found"},
     },
 )
-async def admin_create_contact_request(
+def admin_create_contact_request(
     contact_request: s.AdminContactRequestIn,
     admin: m.User = Depends(d.get_user_admin),
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(d.get_ses_client),
 ):
     """Create a contact request for admin"""
 
@@ -39,36 +36,28 @@ async def admin_create_contact_request(
         admin_id=admin.id,
     )
     db.add(contact_request)
-    db.commit()
-    db.refresh(contact_request)
-
-    log(log.INFO, "Contact request {%s} created for admin {%s}", contact_request.uuid, admin.uuid)
 
     # Sending email to the admin
-    mail_message = createMsgContactRequest(contact_request)
+    mail_message = render_contact_request(contact_request)
 
     # get email from metadata
     contact_email = db.scalar(sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_EMAIL.value))
     recipient_email = contact_email.value if contact_email else CFG.ADMIN_EMAIL
-    try:
-        emailContent = s.EmailAmazonSESContent(
-            recipient_email=recipient_email,
-            sender_email=CFG.MAIL_DEFAULT_SENDER,
-            message=mail_message,
-            charset=CFG.CHARSET,
-            mail_body_text="New Contact Request!",
-            mail_subject="New Admin Contact Request",
-        )
-        sendEmailAmazonSES(emailContent, ses_client=ses)
+    emailContent = s.EmailAmazonSESContent(
+        recipient_email=recipient_email,
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message=mail_message,
+        charset=CFG.CHARSET,
+        mail_body_text="New Contact Request!",
+        mail_subject="New Admin Contact Request",
+    )
+    # sent by the email worker, committed with the contact request
+    c.queue_email(db, emailContent)
 
-        log(log.INFO, "Email sent with new admin contact request to [%s]! ", recipient_email)
+    db.commit()
+    db.refresh(contact_request)
 
-    except ClientError as e:
-        log(log.ERROR, "Email not sent! [%s]", e)
-        log(log.ERROR, "Email not sent with new admin contact request to [%s]! ", recipient_email)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email not sent with new admin contact reques!"
-        )
+    log(log.INFO, "Contact request {%s} created for admin {%s}", contact_request.uuid, admin.uuid)
 
     return contact_request
 
@@ -77,7 +66,7 @@ async def admin_create_contact_request(
     "/",
     response_model=s.AdminContactRequestListOut,
 )
-async def get_admin_contact_requests(
+def get_admin_contact_requests(
     db: Session = Depends(get_db),
     admin: m.User = Depends(d.get_admin),
     search: str | None = None,
@@ -116,7 +105,7 @@ async def get_admin_contact_requests(
     },
     dependencies=[Depends(d.get_admin)],
 )
-async def update_admin_contact_request_status(
+def update_admin_contact_request_status(
     contact_request_uuid: str,
     data: s.ContactRequestUpdateIn,
     db: Session = Depends(get_db),
@@ -153,7 +142,7 @@ async def update_admin_contact_request_status(
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(d.get_admin)],
 )
-async def delete_admin_contact_request(
+def delete_admin_contact_request(
     contact_request_uuid: str,
     db: Session = Depends(get_db),
 ):
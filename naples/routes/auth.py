@@ -4,25 +4,22 @@ from fastapi import Depends, APIRouter, status, HTTPException
 from fastapi.security import HTTPBasic, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
-from botocore.exceptions import ClientError
-from mypy_boto3_ses import SESClient
 import stripe
 
-from naples.dependency import get_ses_client
 from naples.oauth2 import (
     INVALID_CREDENTIALS_EXCEPTION,
     create_access_token,
     create_access_token_exp_datetime,
     verify_access_token,
 )
+from naples import controllers as c
 from naples import models as m
 from naples import schemas as s
 from naples.logger import log
 from naples.database import get_db
 
-from naples.utils import createMsgEmail, delete_user_with_store, sendEmailAmazonSES
+from naples.email_templates import render_verify_email
 from naples.config import config
-from services.store.add_dns_record import add_godaddy_dns_record
 from services.stripe.product import get_product_by_id
 from services.stripe.subscription import save_state_subscription_from_stripe
 from services.stripe.user import create_stripe_customer
@@ -138,13 +135,11 @@ def get_token(auth_data: s.Auth, db=Depends(get_db)):
     response_model=s.User,
     responses={
         status.HTTP_409_CONFLICT: {"description": "User already exists"},
-        status.HTTP_400_BAD_REQUEST: {"description": "Email not sent!"},
     },
 )
 def sign_up(
     data: s.UserSignIn,
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(get_ses_client),
 ):
     """Signs up a user"""
 
@@ -173,6 +168,8 @@ def sign_up(
     )
 
     db.add(user_store)
+    # routed once the dns worker adds the record of the subdomain
+    c.queue_dns_record(db, user_store, new_user.uuid)
     db.commit()
 
     log(log.INFO, "Store for user [%s] created", new_user.email)
@@ -203,38 +200,21 @@ def sign_up(
 
     token = s.Token(access_token=create_access_token(new_user.id))
 
-    msg = createMsgEmail(token.access_token, CFG.REDIRECT_ROUTER_VERIFY_EMAIL)
+    msg = render_verify_email(token.access_token)
 
-    try:
-        emailContent = s.EmailAmazonSESContent(
-            recipient_email=new_user.email,
-            sender_email=CFG.MAIL_DEFAULT_SENDER,
-            message=msg,
-            charset=CFG.CHARSET,
-            mail_body_text=CFG.MAIL_BODY_TEXT,
-            mail_subject=CFG.MAIL_SUBJECT,
-        )
-        sendEmailAmazonSES(emailContent, ses_client=ses)
-
-    except ClientError as e:
-        delete_user_with_store(db, new_user)
-
-        log(log.ERROR, "Email not sent! [%s]", e)
-        log(log.INFO, "User [%s] user is not registered", new_user.email)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email not sent!")
-
-    log(log.INFO, "Verification email sent to [%s]", new_user.email)
-
-    # add dns for store url
-    try:
-        add_godaddy_dns_record(new_user.uuid)
-    except Exception as e:
-        delete_user_with_store(db, new_user)
-        log(log.ERROR, "DNS record not added! [%s]", e)
-        log(log.INFO, "User [%s] user is not registered", new_user.email)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="DNS record not added!")
+    emailContent = s.EmailAmazonSESContent(
+        recipient_email=new_user.email,
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message=msg,
+        charset=CFG.CHARSET,
+        mail_body_text=CFG.MAIL_BODY_TEXT,
+        mail_subject=CFG.MAIL_SUBJECT,
+    )
+    # sent by the email worker
+    c.queue_email(db, emailContent)
+    db.commit()
 
-    log(log.INFO, "DNS record added for store [%s]", new_user.email)
+    log(log.INFO, "Verification email queued for [%s]", new_user.email)
 
     return new_user
 
@@ -249,7 +229,6 @@ def sign_up(
 def verify_email(
     token: str,
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(get_ses_client),
 ):
     """Verifies email"""
 
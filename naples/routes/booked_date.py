@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, status, HTTPException
 
 from naples.logger import log
-from naples import schemas as s, models as m
+from naples import controllers as c, schemas as s, models as m
 from naples.database import get_db
 from naples.dependency import get_current_user_store
 
@@ -13,7 +13,7 @@ booked_date_router = APIRouter(prefix="/booked_dates", tags=["booked_dates"])
 
 
 @booked_date_router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_booked_dates(
+def create_booked_dates(
     data: s.BookedDatesBatchIn,
     store: m.Store = Depends(get_current_user_store),
     db: Session = Depends(get_db),
@@ -24,6 +24,16 @@ async def create_booked_dates(
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
+    if data.from_date >= data.to_date:
+        log(log.ERROR, "Invalid dates range [%s - %s]", data.from_date, data.to_date)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid dates range")
+
+    # a concurrent booking of the item waits here until this one is committed, then sees it
+    c.lock_item_bookings(db, item.id)
+    if not c.is_item_available(db, item.id, data.from_date, data.to_date):
+        log(log.ERROR, "Dates [%s - %s] of item {%s} are already booked", data.from_date, data.to_date, item.uuid)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Dates are already booked")
+
     booked_date = m.BookedDate(
         from_date=data.from_date,
         to_date=data.to_date,
@@ -36,7 +46,7 @@ async def create_booked_dates(
 
 
 @booked_date_router.get("/{item_uuid}", status_code=status.HTTP_200_OK, response_model=s.BookedDateListOut)
-async def get_booked_dates_for_item(item_uuid: str, store: m.Store = Depends(get_current_user_store)):
+def get_booked_dates_for_item(item_uuid: str, store: m.Store = Depends(get_current_user_store)):
     log(log.INFO, "Getting booked dates for item {%s}", item_uuid)
     item = store.get_item_by_uuid(item_uuid)
     if not item:
@@ -54,7 +64,7 @@ async def get_booked_dates_for_item(item_uuid: str, store: m.Store = Depends(get
 
 
 @booked_date_router.put("/delete", status_code=status.HTTP_204_NO_CONTENT, description="Delete a batch of booked dates")
-async def delete_booked_dates(
+def delete_booked_dates(
     data: s.BookedDateDeleteBatchIn, store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
 ):
     """
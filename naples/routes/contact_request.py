@@ -1,13 +1,12 @@
 import sqlalchemy as sa
 from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi_pagination.cursor import CursorPage, CursorParams
 from sqlalchemy.orm import Session
-from mypy_boto3_ses import SESClient
-from botocore.exceptions import ClientError
 
-from naples import schemas as s, models as m, dependency as d
+from naples import controllers as c, schemas as s, models as m, dependency as d
 from naples.logger import log
 from naples.database import get_db
-from naples.utils import createMsgContactRequest, sendEmailAmazonSES
+from naples.email_templates import render_contact_request
 from naples.config import config
 
 CFG = config()
@@ -22,11 +21,10 @@ contact_request_router = APIRouter(prefix="/contact_requests", tags=["Contact Re
     status_code=status.HTTP_201_CREATED,
     responses={status.HTTP_404_NOT_FOUND: {"description": "Item not found"}},
 )
-async def create_contact_request(
+def create_contact_request(
     contact_request: s.ContactRequestIn,
     store: m.Store = Depends(d.get_current_store),
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(d.get_ses_client),
 ):
     log(log.INFO, "Creating contact request for store {%s}", store.uuid)
     item = None
@@ -41,49 +39,37 @@ async def create_contact_request(
         item_id=item.id if item else None,
     )
     db.add(contact_request)
-    db.commit()
-    db.refresh(contact_request)
-    log(log.INFO, "Contact request {%s} created for store {%s}", contact_request.uuid, store.uuid)
 
     # Sending email to the store's owner or the item's member
-    mail_message = createMsgContactRequest(contact_request)
+    mail_message = render_contact_request(contact_request)
     recipient_email = store.email
 
     if contact_request.item_id and item:
         recipient_email = item.realtor.email
 
-    try:
-        emailContent = s.EmailAmazonSESContent(
-            recipient_email=recipient_email,
-            sender_email=CFG.MAIL_DEFAULT_SENDER,
-            message=mail_message,
-            charset=CFG.CHARSET,
-            mail_body_text="New Contact Request from Property Roster!",
-            mail_subject="New Contact Request",
-        )
-        sendEmailAmazonSES(emailContent, ses_client=ses)
+    emailContent = s.EmailAmazonSESContent(
+        recipient_email=recipient_email,
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message=mail_message,
+        charset=CFG.CHARSET,
+        mail_body_text="New Contact Request from Property Roster!",
+        mail_subject="New Contact Request",
+    )
+    # sent by the email worker, committed with the contact request
+    c.queue_email(db, emailContent)
 
-    except ClientError as e:
-        log(log.ERROR, "Email not sent! [%s]", e)
-        log(log.ERROR, "Email not sent with new contact request to [%s]! ", recipient_email)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email not sent with new contact reques!")
+    db.commit()
+    db.refresh(contact_request)
+    log(log.INFO, "Contact request {%s} created for store {%s}", contact_request.uuid, store.uuid)
 
     return contact_request
 
 
-@contact_request_router.get(
-    "/",
-    response_model=s.ContactRequestListOut,
-    responses={status.HTTP_404_NOT_FOUND: {"description": "Contact request not found"}},
-)
-async def get_contact_requests(
-    store: m.Store = Depends(d.get_current_user_store),
-    db: Session = Depends(get_db),
+def get_contact_requests_stmt(
+    store: m.Store,
     search: str | None = None,
     status: s.ContactRequestStatus | None = None,
-):
-    log(log.INFO, "Getting contact requests for store {%s}. Search: {%s}. Status: {%s}", store.uuid, search, status)
-
+) -> sa.Select:
     stmt = (
         sa.select(m.ContactRequest)
         .where(sa.and_(m.ContactRequest.store_id == store.id, m.ContactRequest.is_deleted.is_(False)))
@@ -91,10 +77,7 @@ async def get_contact_requests(
     )
 
     if search:
-        items = db.scalars(
-            sa.select(m.Item).where(m.Item.store_id == store.id).where(m.Item.name.ilike(f"%{search}%"))
-        ).all()
-        item_ids = [item.id for item in items]
+        item_ids = sa.select(m.Item.id).where(m.Item.store_id == store.id, m.Item.name.ilike(f"%{search}%"))
 
         stmt = stmt.where(
             sa.or_(
@@ -106,18 +89,61 @@ async def get_contact_requests(
         )
     if status:
         stmt = stmt.where(m.ContactRequest.status == status.value)
+
+    return stmt
+
+
+@contact_request_router.get(
+    "/",
+    response_model=s.ContactRequestListOut,
+    responses={status.HTTP_404_NOT_FOUND: {"description": "Contact request not found"}},
+)
+def get_contact_requests(
+    store: m.Store = Depends(d.get_current_user_store),
+    db: Session = Depends(get_db),
+    search: str | None = None,
+    status: s.ContactRequestStatus | None = None,
+):
+    log(log.INFO, "Getting contact requests for store {%s}. Search: {%s}. Status: {%s}", store.uuid, search, status)
+
+    stmt = get_contact_requests_stmt(store, search, status)
     contact_requests = db.scalars(stmt).all()
     res = s.ContactRequestListOut(items=list(contact_requests))
     log(log.INFO, "Found {%s} contact requests for store {%s}", len(res.items), store.uuid)
     return res
 
 
+@contact_request_router.get(
+    "/cursor",
+    response_model=CursorPage[s.ContactRequestOut],
+    responses={status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"}},
+)
+def get_contact_requests_by_cursor(
+    store: m.Store = Depends(d.get_current_user_store),
+    db: Session = Depends(get_db),
+    params: CursorParams = Depends(),
+    search: str | None = None,
+    status: s.ContactRequestStatus | None = None,
+):
+    log(log.INFO, "Getting contact requests by cursor for store {%s}", store.uuid)
+
+    return c.paginate_by_cursor(
+        db,
+        get_contact_requests_stmt(store, search, status),
+        params,
+        created_at=m.ContactRequest.created_at,
+        id=m.ContactRequest.id,
+        transformer=lambda contact_requests: [s.ContactRequestOut.model_validate(r) for r in contact_requests],
+        descending=True,
+    )
+
+
 @contact_request_router.put(
     "/{contact_request_uuid}",
     response_model=s.ContactRequestOut,
     responses={status.HTTP_404_NOT_FOUND: {"description": "Contact request not found"}},
 )
-async def update_contact_request_status(
+def update_contact_request_status(
     contact_request_uuid: str,
     data: s.ContactRequestUpdateIn,
     store: m.Store = Depends(d.get_current_user_store),
@@ -146,7 +172,7 @@ async def update_contact_request_status(
 
 
 @contact_request_router.delete("/{contact_request_uuid}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_contact_request(
+def delete_contact_request(
     contact_request_uuid: str,
     store: m.Store = Depends(d.get_current_user_store),
     db: Session = Depends(get_db),
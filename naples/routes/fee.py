@@ -13,7 +13,7 @@ fee_router = APIRouter(prefix="/fee", tags=["Fee"])
 
 
 @fee_router.get("/{item_uuid}", response_model=s.FeeListOut)
-async def get_fees_for_item(
+def get_fees_for_item(
     item_uuid: str,
     current_store: m.Store = Depends(get_current_store),
 ):
@@ -26,9 +26,7 @@ async def get_fees_for_item(
 
 
 @fee_router.post("/", response_model=s.FeeOut, status_code=201)
-async def create_fee(
-    data: s.FeeIn, user_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
-):
+def create_fee(data: s.FeeIn, user_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)):
     log(log.INFO, "Creating fee {%s} for store {%s}", data, user_store)
 
     item = user_store.get_item_by_uuid(data.item_uuid)
@@ -51,7 +49,7 @@ async def create_fee(
 
 
 @fee_router.put("/{fee_uuid}", response_model=s.FeeOut)
-async def update_fee(
+def update_fee(
     fee_uuid: str, data: s.FeeIn, user_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
 ):
     log(log.INFO, f"Updating fee {fee_uuid} with data {data} for store {user_store}")
@@ -77,9 +75,7 @@ async def update_fee(
 
 
 @fee_router.delete("/{fee_uuid}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_fee(
-    fee_uuid: str, current_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
-):
+def delete_fee(fee_uuid: str, current_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)):
     log(log.INFO, f"Deleting fee {fee_uuid} for user {current_store}")
 
     fee = db.scalar(sa.select(m.Fee).filter(m.Fee.uuid == fee_uuid))
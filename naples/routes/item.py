@@ -1,23 +1,30 @@
-from time import sleep
-from typing import Annotated, Sequence
+import json
+from typing import Annotated
 from datetime import datetime
 
-from fastapi import Depends, APIRouter, File, Form, Query, UploadFile, status, HTTPException
-from fastapi_pagination import Page, Params, paginate
+import anyio
+from fastapi import Depends, APIRouter, File, Form, Query, Response, UploadFile, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi_pagination import Page, Params
+from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi_pagination.ext.sqlalchemy import paginate
 import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 from mypy_boto3_s3 import S3Client
 
 from naples import models as m, schemas as s
 from naples.dependency import (
     get_current_user,
-    get_current_store,
     get_current_user_store,
     get_user_subscribe,
     get_s3_connect,
+    get_store_version,
+    use_response_cache,
 )
 from naples import controllers as c
-from naples.database import get_db
+from naples.database import get_async_db, get_db
 from naples.routes.utils import (
     check_user_subscription_max_active_items,
     check_user_subscription_max_items,
@@ -43,72 +50,51 @@ item_router = APIRouter(prefix="/items", tags=["Items"])
         403: {"description": "Invalid URL"},
         400: {"description": "Store URL is not provided"},
     },
-    dependencies=[Depends(get_user_subscribe)],
+    dependencies=[Depends(get_user_subscribe), Depends(use_response_cache)],
 )
-def get_published_items(
+async def get_published_items(
     rent_length: Annotated[list[s.RentalLength], Query()] = [],
     city: str | None = None,
     adults: int = 0,
     check_in: datetime | None = None,
     check_out: datetime | None = None,
     name: str | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    sort: s.ItemSort | None = None,
+    q: str | None = None,
     params: Params = Depends(),
-    db: Session = Depends(get_db),
-    current_store: m.Store = Depends(get_current_store),
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
 ):
     """Get items by filters and pagination"""
 
     log(log.INFO, "Getting items for store [%s]", current_store.url)
 
-    stmt = sa.select(m.Item).where(
-        sa.and_(
-            m.Item.is_deleted.is_(False),
-            m.Item.store_id == current_store.id,
-            m.Item.stage == s.ItemStage.ACTIVE.value,
-        )
-    )
-
-    if adults:
-        stmt = stmt.where(m.Item.adults >= adults)
-
     if rent_length:
-        r_length = [r.value for r in rent_length]
-        log(log.INFO, "Rent length [%s]", r_length)
-        conditions = []
-        if s.RentalLength.NIGHTLY.value in r_length:
-            conditions.append(m.Item.nightly.is_(True))
-        if s.RentalLength.MONTHLY.value in r_length:
-            conditions.append(m.Item.monthly.is_(True))
-        if s.RentalLength.ANNUAL.value in r_length:
-            conditions.append(m.Item.annual.is_(True))
-
-        if conditions:
-            stmt = stmt.where(sa.or_(*conditions))
-
-    if name:
-        stmt = stmt.where(m.Item.name.ilike(f"%{name}%"))
-
-    db_items: Sequence[m.Item] = db.scalars(stmt).all()
-    items: Sequence[s.ItemOut] = [s.ItemOut.model_validate(item) for item in db_items]
-
-    if check_out and check_in:
-        # items_out = [item for item in items if is_available(item, check_in.date(), check_out.date())]
-        items_out = [
-            item
-            for item in items
-            if all(check_in >= booked.to_date or check_out <= booked.from_date for booked in item.booked_dates)
-        ]
-        return paginate(items_out, params)
+        log(log.INFO, "Rent length [%s]", [r.value for r in rent_length])
+
+    stmt = c.get_published_items_stmt(
+        store_id=current_store.id,
+        rent_length=rent_length,
+        city=city,
+        adults=adults,
+        check_in=check_in,
+        check_out=check_out,
+        name=name,
+        price_min=price_min,
+        price_max=price_max,
+        sort=sort,
+        q=q,
+    )
 
-    if city is not None:
-        items_by_city: Sequence[s.ItemOut] = [
-            s.ItemOut.model_validate(item) for item in db_items if item.location.city == city
-        ]
-        return paginate(items_by_city, params)
+    page = await db.run_sync(
+        paginate, stmt, params, transformer=lambda items: [s.ItemOut.model_validate(i) for i in items]
+    )
 
-    log(log.INFO, "Got [%s] items for store [%s]", len(items), current_store.url)
+    log(log.INFO, "Got [%s] items for store [%s]", page.total, current_store.url)
 
-    return paginate(items, params)
+    return page
 
 
 @item_router.get(
@@ -122,32 +108,231 @@ def get_published_items(
     },
     dependencies=[Depends(get_user_subscribe)],
 )
-def get_all_items(
+async def get_all_items(
     name: str | None = None,
+    q: str | None = None,
     params: Params = Depends(),
-    db: Session = Depends(get_db),
-    current_store: m.Store = Depends(get_current_store),
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
 ):
     """Get items by filters and pagination"""
 
     log(log.INFO, "Getting items for store [%s]", current_store.url)
 
-    stmt = sa.select(m.Item).where(
-        sa.and_(
-            m.Item.is_deleted.is_(False),
-            m.Item.store_id == current_store.id,
-        )
+    stmt = c.get_store_items_stmt(store_id=current_store.id, name=name, q=q)
+
+    page = await db.run_sync(
+        paginate, stmt, params, transformer=lambda items: [s.ItemOut.model_validate(i) for i in items]
+    )
+
+    log(log.INFO, "Got [%s] items for store [%s]", page.total, current_store.url)
+
+    return page
+
+
+@item_router.get(
+    "/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[s.ItemOut],
+    responses={
+        404: {"description": "Store not found"},
+        403: {"description": "Invalid URL"},
+        400: {"description": "Store URL is not provided or invalid cursor"},
+    },
+    dependencies=[Depends(get_user_subscribe)],
+)
+async def get_published_items_by_cursor(
+    rent_length: Annotated[list[s.RentalLength], Query()] = [],
+    city: str | None = None,
+    adults: int = 0,
+    check_in: datetime | None = None,
+    check_out: datetime | None = None,
+    name: str | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    q: str | None = None,
+    params: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+):
+    """Get items by filters with cursor pagination"""
+
+    log(log.INFO, "Getting items by cursor for store [%s]", current_store.url)
+
+    stmt = c.get_published_items_stmt(
+        store_id=current_store.id,
+        rent_length=rent_length,
+        city=city,
+        adults=adults,
+        check_in=check_in,
+        check_out=check_out,
+        name=name,
+        price_min=price_min,
+        price_max=price_max,
+        q=q,
+    )
+
+    return await db.run_sync(
+        c.paginate_by_cursor,
+        stmt,
+        params,
+        created_at=m.Item.created_at,
+        id=m.Item.id,
+        transformer=lambda items: [s.ItemOut.model_validate(i) for i in items],
+    )
+
+
+@item_router.get(
+    "/all/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[s.ItemOut],
+    responses={
+        404: {"description": "Store not found"},
+        403: {"description": "Invalid URL"},
+        400: {"description": "Store URL is not provided or invalid cursor"},
+    },
+    dependencies=[Depends(get_user_subscribe)],
+)
+async def get_all_items_by_cursor(
+    name: str | None = None,
+    q: str | None = None,
+    params: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+):
+    """Get all items of the store with cursor pagination"""
+
+    log(log.INFO, "Getting all items by cursor for store [%s]", current_store.url)
+
+    stmt = c.get_store_items_stmt(store_id=current_store.id, name=name, q=q)
+
+    return await db.run_sync(
+        c.paginate_by_cursor,
+        stmt,
+        params,
+        created_at=m.Item.created_at,
+        id=m.Item.id,
+        transformer=lambda items: [s.ItemOut.model_validate(i) for i in items],
     )
 
-    if name:
-        stmt = stmt.where(m.Item.name.ilike(f"%{name}%"))
 
-    db_items: Sequence[m.Item] = db.scalars(stmt.order_by(m.Item.created_at)).all()
-    items: Sequence[s.ItemOut] = [s.ItemOut.model_validate(item) for item in db_items]
+@item_router.get(
+    "/markers",
+    status_code=status.HTTP_200_OK,
+    response_model=s.ItemMarkersOut,
+    responses={
+        404: {"description": "Store not found"},
+        403: {"description": "Invalid URL"},
+        400: {"description": "Store URL is not provided"},
+    },
+)
+async def get_item_markers(
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+):
+    """Get map markers of all active items of the store"""
+
+    log(log.INFO, "Getting item markers of store [%s]", current_store.url)
+
+    rows = (await db.execute(c.get_item_markers_stmt(current_store.id).order_by(m.Item.id))).all()
 
-    log(log.INFO, "Got [%s] items for store [%s]", len(items), current_store.url)
+    log(log.INFO, "Got [%s] item markers of store [%s]", len(rows), current_store.url)
 
-    return paginate(items, params)
+    # can be thousands of rows: serialized as is, without a model per row
+    markers = [
+        {
+            "uuid": row.uuid,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "minPrice": row.min_price,
+            "imageUrl": row.image_url,
+        }
+        for row in rows
+    ]
+    return Response(content=json.dumps({"items": markers}, separators=(",", ":")), media_type="application/json")
+
+
+@item_router.get(
+    "/map",
+    status_code=status.HTTP_200_OK,
+    response_model=s.ItemMarkersOut,
+    responses={
+        404: {"description": "Store not found"},
+        403: {"description": "Invalid URL"},
+        400: {"description": "Store URL is not provided or invalid bounding box"},
+    },
+)
+async def get_items_in_bbox(
+    south: Annotated[float, Query(ge=-90, le=90)],
+    west: Annotated[float, Query(ge=-180, le=180)],
+    north: Annotated[float, Query(ge=-90, le=90)],
+    east: Annotated[float, Query(ge=-180, le=180)],
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+):
+    """Get markers of the items inside the map bounding box, west > east for a box crossing the antimeridian"""
+
+    log(log.INFO, "Getting items of store [%s] in [%s, %s, %s, %s]", current_store.url, south, west, north, east)
+
+    if south > north:
+        log(log.INFO, "South [%s] is above north [%s]", south, north)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid bounding box")
+
+    stmt = c.filter_locations_by_bbox(c.get_item_markers_stmt(current_store.id), south, west, north, east)
+    rows = (await db.execute(stmt.order_by(m.Item.id).limit(CFG.MAP_MARKERS_LIMIT))).all()
+
+    log(log.INFO, "Got [%s] items of store [%s] in bounding box", len(rows), current_store.url)
+
+    return s.ItemMarkersOut(items=[s.ItemMarkerOut.model_validate(row._asdict()) for row in rows])
+
+
+@item_router.get(
+    "/nearby",
+    status_code=status.HTTP_200_OK,
+    response_model=s.ItemMarkersOut,
+    responses={
+        404: {"description": "Store not found"},
+        403: {"description": "Invalid URL"},
+        400: {"description": "Store URL is not provided"},
+    },
+)
+async def get_items_nearby(
+    latitude: Annotated[float, Query(ge=-90, le=90)],
+    longitude: Annotated[float, Query(ge=-180, le=180)],
+    radius: Annotated[float, Query(gt=0, le=CFG.MAP_MAX_RADIUS_KM, description="km")],
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+):
+    """Get markers of the items within the radius, nearest first"""
+
+    log(
+        log.INFO,
+        "Getting items of store [%s] within [%s]km of [%s, %s]",
+        current_store.url,
+        radius,
+        latitude,
+        longitude,
+    )
+
+    # the box around the circle comes from the index, the nearest ones by an approximate distance from the query,
+    # the exact distance is checked here
+    stmt = (
+        c.filter_locations_by_bbox(
+            c.get_item_markers_stmt(current_store.id), *c.get_radius_bbox(latitude, longitude, radius)
+        )
+        .order_by(c.get_approximate_distance(latitude, longitude), m.Item.id)
+        .limit(CFG.MAP_MARKERS_LIMIT)
+    )
+    markers = []
+    for row in await db.execute(stmt):
+        distance = c.get_distance(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius:
+            markers.append(s.ItemMarkerOut(**row._asdict(), distance=distance))
+    markers.sort(key=lambda marker: marker.distance or 0.0)
+
+    log(log.INFO, "Got [%s] items of store [%s] nearby", len(markers), current_store.url)
+
+    return s.ItemMarkersOut(items=markers)
 
 
 @item_router.get(
@@ -157,56 +342,43 @@ def get_all_items(
     responses={
         404: {"description": "Item not found"},
     },
-    dependencies=[Depends(get_user_subscribe)],
+    dependencies=[Depends(get_user_subscribe), Depends(use_response_cache)],
 )
-def get_item_by_uuid(
+async def get_item_by_uuid(
     item_uuid: str,
-    db: Session = Depends(get_db),
-    current_store: m.Store = Depends(get_current_store),
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
 ):
     """Get item by UUID"""
 
-    item: m.Item | None = db.scalar(
-        sa.select(m.Item).where(m.Item.uuid == item_uuid, m.Item.store_id == current_store.id)
-    )
+    def load_item_details(db: Session) -> s.ItemDetailsOut | None:
+        item: m.Item | None = db.scalar(c.get_item_details_stmt(current_store.id, item_uuid))
+        return s.ItemDetailsOut.model_validate(item) if item and not item.is_deleted else None
 
-    if not item or item.is_deleted:
+    item = await db.run_sync(load_item_details)
+
+    if not item:
         log(log.ERROR, "Item [%s] not found for store [%s]", item_uuid, current_store.url)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
-    return s.ItemDetailsOut.model_validate(item)
+    return item
 
 
 @item_router.get(
     "/filters/data",
     status_code=status.HTTP_200_OK,
     response_model=s.ItemsFilterDataOut,
-    dependencies=[Depends(get_user_subscribe)],
+    dependencies=[Depends(get_user_subscribe), Depends(use_response_cache)],
 )
-def get_filters_data(
-    db: Session = Depends(get_db),
-    current_user_store: m.Store = Depends(get_current_store),
+async def get_filters_data(
+    db: AsyncSession = Depends(get_async_db),
+    current_store: s.StoreSnapshot = Depends(get_user_subscribe),
+    store_version: tuple[int, datetime | None] = Depends(get_store_version),
 ):
     """Get data for filter items"""
 
-    location_cities = [
-        item.location.city
-        for item in current_user_store.items
-        if item.stage == s.ItemStage.ACTIVE.value and not item.is_deleted
-    ]
-
-    unique_cities = set(location_cities)
-
-    adults = max(
-        [
-            item.adults
-            for item in current_user_store.items
-            if not item.is_deleted and item.stage == s.ItemStage.ACTIVE.value
-        ],
-        default=0,
-    )
-
-    return s.ItemsFilterDataOut(cities=list(unique_cities), adults=adults)
+    version, _ = store_version
+    return await db.run_sync(c.get_store_facets, current_store.id, version)
 
 
 @item_router.post(
@@ -440,16 +612,7 @@ def update_item(
     if item_data.images_urls is not None:
         log(log.INFO, "Images urls [%s] was updated for item [%s]", len(item_data.images_urls), item_uuid)
 
-        for url_image in item_data.images_urls:
-            # find files and update data of each file
-            key_url = url_image.replace(CFG.AWS_S3_BUCKET_URL, "")
-            file: m.File | None = db.scalar(sa.select(m.File).where(m.File.key == key_url))
-            # update date
-            if file:
-                file.updated_at = datetime.now()
-                db.commit()
-                db.refresh(file)
-                sleep(0.05)
+        c.reorder_item_images(db, item, item_data.images_urls)
 
     db.commit()
     db.refresh(item)
@@ -494,7 +657,7 @@ def delete_item(
         404: {"description": "Store not found"},
     },
 )
-def upload_item_main_media(
+async def upload_item_main_media(
     item_uuid: str,
     main_media: UploadFile,
     db: Session = Depends(get_db),
@@ -503,11 +666,11 @@ def upload_item_main_media(
 ):
     log(log.INFO, "Uploading main media for item [%s]", item_uuid)
 
-    item = current_store.get_item_by_uuid(item_uuid)
+    item = await run_in_threadpool(current_store.get_item_by_uuid, item_uuid)
 
-    if item.main_media:
-        log(log.INFO, "Deleting previous main media for item [%s]", item_uuid)
-        item.main_media.mark_as_deleted()
+    if not item:
+        log(log.ERROR, "Item [%s] not found", item_uuid)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
     extension = get_file_extension(main_media)
 
@@ -517,7 +680,7 @@ def upload_item_main_media(
         log(log.ERROR, "Unknown file extension [%s]", extension)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown file extension")
 
-    item_model = c.create_file(
+    item_model = await c.create_file_async(
         file=main_media,
         db=db,
         s3_client=s3_client,
@@ -526,13 +689,21 @@ def upload_item_main_media(
         file_type=file_type,
     )
 
-    item.main_media_id = item_model.id
-    db.commit()
-    db.refresh(item)
+    def set_main_media() -> s.ItemDetailsOut:
+        if item.main_media:
+            log(log.INFO, "Deleting previous main media for item [%s]", item_uuid)
+            item.main_media.mark_as_deleted()
+
+        item.main_media_id = item_model.id
+        db.commit()
+        db.refresh(item)
+        return s.ItemDetailsOut.model_validate(item)
+
+    item_out = await run_in_threadpool(set_main_media)
 
     log(log.INFO, "Main media for item [%s] was uploaded", item_uuid)
 
-    return s.ItemDetailsOut.model_validate(item)
+    return item_out
 
 
 @item_router.delete(
@@ -609,6 +780,88 @@ def upload_item_image(
     return s.ItemDetailsOut.model_validate(item)
 
 
+@item_router.post(
+    "/{item_uuid}/images/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=s.ItemImagesUploadOut,
+    responses={
+        404: {"description": "Item not found"},
+        409: {"description": "Images were not saved"},
+    },
+)
+async def upload_item_images(
+    images: list[UploadFile],
+    item_uuid: str,
+    db: Session = Depends(get_db),
+    current_store: m.Store = Depends(get_current_user_store),
+    s3_client: S3Client = Depends(get_s3_connect),
+):
+    """Upload many images for item at once, the result is reported per file"""
+
+    log(log.INFO, "Uploading [%d] images for item [%s]", len(images), item_uuid)
+
+    item = await run_in_threadpool(current_store.get_item_by_uuid, item_uuid)
+
+    if not item:
+        log(log.ERROR, "Item [%s] not found", item_uuid)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+
+    files: list[m.File | None] = [None] * len(images)
+    results = [s.ItemImageUploadOut(filename=image.filename or "") for image in images]
+
+    async def upload_image(index: int, image: UploadFile):
+        try:
+            extension = get_file_extension(image)
+
+            if not c.is_image_file(extension):
+                log(log.ERROR, "File [%s] is not an image", image.filename)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is not an image")
+
+            files[index] = await c.upload_file_async(
+                file=image,
+                s3_client=s3_client,
+                extension=extension,
+                store_url=current_store.url,
+                file_type=s.FileType.IMAGE,
+            )
+        except HTTPException as e:
+            results[index].error = e.detail
+
+    # the limiter of the S3 upload pool bounds how many of them run at once
+    async with anyio.create_task_group() as task_group:
+        for index, image in enumerate(images):
+            task_group.start_soon(upload_image, index, image)
+
+    uploaded_files = [file for file in files if file]
+
+    def add_images() -> list[str | None]:
+        # all files and their links to the item in one transaction
+        # the urls are read before the commit expires the files, so that they are not loaded again on the event loop
+        urls = [file.url if file else None for file in files]
+        keys = [file.key for file in uploaded_files]
+        try:
+            db.add_all(uploaded_files)
+            item._images.extend(uploaded_files)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            log(log.ERROR, "Images for item [%s] were not saved: %s", item_uuid, e)
+            # nothing refers to the uploaded objects, they are not left in the bucket
+            c.delete_uploaded_files(s3_client, keys)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Images were not saved")
+        return urls
+
+    urls = await run_in_threadpool(add_images)
+
+    for url, result in zip(urls, results):
+        if url:
+            result.url = url
+
+    log(log.INFO, "[%d] of [%d] images for item [%s] were uploaded", len(uploaded_files), len(images), item_uuid)
+
+    return s.ItemImagesUploadOut(items=results)
+
+
 @item_router.delete(
     "/{item_uuid}/image/",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -801,7 +1054,7 @@ def delete_item_amenity(
         404: {"description": "Item not found"},
     },
 )
-def upload_item_video(
+async def upload_item_video(
     item_uuid: str,
     file: UploadFile,
     db: Session = Depends(get_db),
@@ -810,7 +1063,7 @@ def upload_item_video(
 ):
     """Upload video for item by UUID"""
 
-    item = current_store.get_item_by_uuid(item_uuid)
+    item = await run_in_threadpool(current_store.get_item_by_uuid, item_uuid)
 
     if not item:
         log(log.ERROR, "Item [%s] not found", item_uuid)
@@ -824,7 +1077,7 @@ def upload_item_video(
         log(log.ERROR, "Unknown file extension [%s]", extension)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown file extension")
 
-    item_model = c.create_file(
+    item_model = await c.create_file_async(
         file=file,
         db=db,
         s3_client=s3_client,
@@ -833,14 +1086,17 @@ def upload_item_video(
         file_type=file_type,
     )
 
-    item._videos.append(item_model)
+    def add_video() -> s.ItemDetailsOut:
+        item._videos.append(item_model)
+        db.commit()
+        db.refresh(item)
+        return s.ItemDetailsOut.model_validate(item)
 
-    db.commit()
-    db.refresh(item)
+    item_out = await run_in_threadpool(add_video)
 
     log(log.INFO, "Video for item [%s] was uploaded", item_uuid)
 
-    return s.ItemDetailsOut.model_validate(item)
+    return item_out
 
 
 @item_router.delete(
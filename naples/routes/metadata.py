@@ -1,10 +1,10 @@
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Request, Response, status, HTTPException
 import sqlalchemy as sa
 
 from naples.database import get_db
 from naples import models as m, schemas as s
-from naples.dependency import get_admin
+from naples.dependency import check_conditional_request, get_admin, get_content_etag
 from naples.logger import log
 
 metadatas_router = APIRouter(prefix="/metadata", tags=["Metadata"])
@@ -16,38 +16,24 @@ metadatas_router = APIRouter(prefix="/metadata", tags=["Metadata"])
     response_model=s.MetadataOut,
 )
 def get_metadata(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """Get metadata keys"""
 
-    video_url = db.scalar(sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.VIDEO_COVER_URL.value))
-    image_url = db.scalar(sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.IMAGE_COVER_URL.value))
+    keys = [metadata_type.value for metadata_type in s.MetadataType]
+    values = {
+        key: value
+        for key, value in db.execute(sa.select(m.Metadata.key, m.Metadata.value).where(m.Metadata.key.in_(keys)))
+    }
 
-    contact_phone = db.scalar(sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_PHONE.value))
+    metadata = s.MetadataOut(**{key: values.get(key) or "" for key in keys})
 
-    contact_email = db.scalar(sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_EMAIL.value))
+    # not bound to a store, so validated by the content itself
+    check_conditional_request(request, response, get_content_etag(metadata.model_dump_json()))
 
-    contact_instagram_url = db.scalar(
-        sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_INSTAGRAM_URL.value)
-    )
-
-    contact_facebook_url = db.scalar(
-        sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_FACEBOOK_URL.value)
-    )
-
-    contact_linkedin_url = db.scalar(
-        sa.select(m.Metadata).where(m.Metadata.key == s.MetadataType.CONTACT_LINKEDIN_URL.value)
-    )
-
-    return s.MetadataOut(
-        video_cover_url=video_url.value if video_url else "",
-        image_cover_url=image_url.value if image_url else "",
-        contact_phone=contact_phone.value if contact_phone else "",
-        contact_email=contact_email.value if contact_email else "",
-        contact_instagram_url=contact_instagram_url.value if contact_instagram_url else "",
-        contact_facebook_url=contact_facebook_url.value if contact_facebook_url else "",
-        contact_linkedin_url=contact_linkedin_url.value if contact_linkedin_url else "",
-    )
+    return metadata
 
 
 @metadatas_router.patch(
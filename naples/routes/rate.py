@@ -2,7 +2,7 @@ import sqlalchemy as sa
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from naples import models as m, schemas as s
+from naples import controllers as c, models as m, schemas as s
 from naples.database import get_db
 from naples.dependency import get_current_user_store
 from naples.logger import log
@@ -11,7 +11,7 @@ rates_router = APIRouter(prefix="/rates", tags=["rates"])
 
 
 @rates_router.get("/{item_uuid}", response_model=s.RateListOut)
-async def get_rates_for_item(item_uuid: str, store: m.Store = Depends(get_current_user_store)):
+def get_rates_for_item(item_uuid: str, store: m.Store = Depends(get_current_user_store)):
     log(log.INFO, "Getting rates for item {%s} in store {%s}", item_uuid, store)
 
     item = store.get_item_by_uuid(item_uuid)
@@ -25,7 +25,7 @@ async def get_rates_for_item(item_uuid: str, store: m.Store = Depends(get_curren
 
 
 @rates_router.post("/", response_model=s.RateOut, status_code=status.HTTP_201_CREATED)
-async def create_rate(
+def create_rate(
     data: s.RateIn, current_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
 ):
     log(log.INFO, "Creating rate in store {%s}", current_store.id)
@@ -47,6 +47,8 @@ async def create_rate(
         visible=data.visible,
     )
     db.add(new_rate)
+    db.flush()
+    c.update_item_prices(db, item.id)
     db.commit()
 
     log(log.INFO, "Created rate {%s} for item {%s}", new_rate.id, item.id)
@@ -55,7 +57,7 @@ async def create_rate(
 
 
 @rates_router.put("/{rate_uuid}", response_model=s.RateOut)
-async def update_rate(
+def update_rate(
     rate_uuid: str,
     rate: s.RateIn,
     current_store: m.Store = Depends(get_current_user_store),
@@ -86,6 +88,8 @@ async def update_rate(
     rate_model.min_stay = rate.min_stay
     rate_model.visible = rate.visible
 
+    db.flush()
+    c.update_item_prices(db, rate_model.item_id)
     db.commit()
 
     log(log.INFO, "Updated rate {%s} in store {%s}", rate_uuid, current_store.uuid)
@@ -94,7 +98,7 @@ async def update_rate(
 
 
 @rates_router.delete("/{rate_uuid}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_rate(
+def delete_rate(
     rate_uuid: str, current_store: m.Store = Depends(get_current_user_store), db: Session = Depends(get_db)
 ):
     log(log.INFO, "Deleting rate uuid {%s} in store {%s}", rate_uuid, current_store.uuid)
@@ -108,6 +112,8 @@ async def delete_rate(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Rate does not belong to store")
 
     rate.is_deleted = True
+    db.flush()
+    c.update_item_prices(db, rate.item_id)
     db.commit()
 
     log(log.INFO, "Deleted rate {%s} in store {%s}", rate_uuid, current_store.uuid)
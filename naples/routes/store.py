@@ -1,14 +1,15 @@
-import os
-import csv
 import stripe
 
-from fastapi import Depends, APIRouter, UploadFile, status, HTTPException
+from fastapi import Depends, APIRouter, Request, Response, UploadFile, status, HTTPException
 from fastapi_pagination import Page, Params, paginate
+from fastapi_pagination.cursor import CursorPage, CursorParams
 
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 
 
 from mypy_boto3_s3 import S3Client
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import orm
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
@@ -17,19 +18,27 @@ from naples import controllers as c, models as m, schemas as s
 
 
 from naples.logger import log
-from naples.dependency import get_current_user, get_current_user_store, get_user_subscribe, get_admin, get_s3_connect
-from naples.database import get_db
-from naples.routes.utils import create_trial_subscription, get_stores_admin
+from naples.dependency import (
+    get_current_user,
+    get_current_user_store,
+    get_user_subscribe,
+    check_conditional_request,
+    get_admin,
+    get_s3_connect,
+    use_response_cache,
+)
+from naples.database import get_async_db, get_db
+from naples.routes.utils import (
+    create_trial_subscription,
+    generate_stores_report,
+    get_stores_admin,
+    get_stores_admin_stmt,
+    get_stores_report_stmt,
+)
 from naples.utils import get_file_extension
 from naples.config import config
 
-from services.store.add_dns_record import (
-    add_godaddy_dns_record,
-    check_main_domain,
-    check_subdomain_existence,
-    delete_godaddy_dns_record,
-    get_subdomain_from_url,
-)
+from services.store.add_dns_record import check_main_domain, get_subdomain_from_url
 
 
 store_router = APIRouter(prefix="/stores", tags=["Stores"])
@@ -46,41 +55,50 @@ CFG = config()
     },
 )
 def get_stores_urls(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
-    stores = db.scalars(sa.select(m.Store)).all()
+    # the config only changes with the store urls, the poller gets 304 until then
+    version = c.get_config_version(db, c.STORE_URLS_VERSION)
+    check_conditional_request(request, response, f'"store-urls-{version}"')
 
-    if not stores:
+    config_json = c.get_traefik_config(db, version)
+    if config_json is None:
         log(log.ERROR, "Stores not found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stores not found")
 
-    data_stores = [
-        s.TraefikStoreData(
-            uuid=store.uuid,
-            subdomain=get_subdomain_from_url(store.url) or store.uuid,
-            store_url=store.url,
-        )
-        for store in stores
-        if store.url
-    ]
-
-    traefik_http = s.TraefikHttp(
-        routers={
-            store.subdomain: s.TraefikRoute(
-                rule=f"Host(`{store.store_url}`)",
-                service=store.subdomain,
-                tls=s.TraefikTLS(certResolver=CFG.CERT_RESOLVER),
-            )
-            for store in data_stores
-        },
-        services={
-            store.subdomain: s.TraefikService(
-                loadBalancer=s.TraefikLoadBalancer(servers=[s.TraefikServer(url=f"http://{CFG.WEB_SERVICE_NAME}")])
-            )
-            for store in data_stores
-        },
+    # served as is, the injected response only carries the validators
+    headers = {"ETag": response.headers["ETag"], "Cache-Control": response.headers["Cache-Control"]}
+    return Response(config_json, media_type="application/json", headers=headers)
+
+
+# declared before "/{store_url}" so that "cursor" is not taken for a store url
+@store_router.get(
+    "/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[s.StoreAdminOut],
+    responses={status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"}},
+    dependencies=[Depends(get_admin)],
+)
+def get_stores_by_cursor(
+    db: Session = Depends(get_db),
+    params: CursorParams = Depends(),
+    search: str | None = None,
+    subscription_status: s.StoreStatus | None = None,
+):
+    """Returns the stores for the admin panel with cursor pagination"""
+
+    stmt = get_stores_admin_stmt(search, subscription_status)
+
+    return c.paginate_by_cursor(
+        db,
+        stmt,
+        params,
+        created_at=m.Store.created_at,
+        id=m.Store.id,
+        transformer=lambda stores: [s.StoreAdminOut.model_validate(store) for store in stores],
     )
-    return s.TraefikData(http=traefik_http)
 
 
 @store_router.get(
@@ -90,15 +108,27 @@ def get_stores_urls(
     responses={
         404: {"description": "Store not found"},
     },
-    dependencies=[Depends(get_user_subscribe)],
+    dependencies=[Depends(get_user_subscribe), Depends(use_response_cache)],
 )
-def get_store(
+async def get_store(
     store_url: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Returns the store"""
 
-    store: m.Store | None = db.scalar(sa.select(m.Store).where(m.Store.url == store_url))
+    def load_store(db: Session) -> s.StoreOut | None:
+        store: m.Store | None = db.scalar(
+            sa.select(m.Store)
+            .where(m.Store.url == store_url)
+            .options(
+                orm.joinedload(m.Store._main_media),
+                orm.joinedload(m.Store._about_us_main_media),
+                orm.joinedload(m.Store._logo),
+            )
+        )
+        return s.StoreOut.model_validate(store) if store else None
+
+    store = await db.run_sync(load_store)
     if not store:
         log(log.ERROR, "Store [%s] not found", store_url)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
@@ -150,37 +180,15 @@ def update_store(
                 log(log.ERROR, "Store with url [%s] already exists", url)
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Store with url already exists")
 
-            subdomain = get_subdomain_from_url(current_store.url)
-
-            godaddy_subdomain = check_subdomain_existence(subdomain)
-
-            if godaddy_subdomain and subdomain:
-                delete_godaddy_dns_record(subdomain)
-                log(log.INFO, "Old subdomain [%s] deleted", subdomain)
-
-                # add new record with new url for the store in godaddy
-                add_godaddy_dns_record(new_subdomain)
-                log(log.INFO, "New subdomain [%s] added", new_subdomain)
-
-            if not godaddy_subdomain:
-                # add new record with new url for the store in godaddy
-                add_godaddy_dns_record(new_subdomain)
-                log(log.INFO, "New subdomain [%s] added", new_subdomain)
-
-        current_store_url = current_store.url
-        if check_main_domain(current_store_url):
-            log(log.INFO, "=== current store's url [%s] is main domain", current_store_url)
-            subdomain = get_subdomain_from_url(current_store_url)
-            log(log.INFO, "=== current store's subdomain [%s]", subdomain)
-            godaddy_subdomain = check_subdomain_existence(subdomain)
-            log(log.INFO, "=== current store's subdomain [%s] exists in godaddy", subdomain)
-            if godaddy_subdomain and subdomain:
-                delete_godaddy_dns_record(subdomain)
-                log(
-                    log.INFO,
-                    "=== current store's subdomain [%s] deleted from godaddy",
-                    subdomain,
-                )
+            # routed once the dns worker adds the record of the new subdomain
+            c.queue_dns_record(db, current_store, new_subdomain)
+        else:
+            # the owner of the domain points it to us
+            current_store.dns_status = s.DNSStatus.PROVISIONED.value
+
+        old_subdomain = get_subdomain_from_url(current_store.url)
+        if old_subdomain:
+            c.queue_dns_record_deletion(db, old_subdomain)
 
         current_store.url = url
 
@@ -497,15 +505,16 @@ def get_stores(
 ):
     """Returns the stores for the admin panel"""
 
-    stores = get_stores_admin(db, search, subscription_status if subscription_status else None)
+    stores = get_stores_admin(db, search, subscription_status)
     return paginate(stores, params)
 
 
 @store_router.post(
     "/report/download",
     status_code=status.HTTP_200_OK,
-    response_class=FileResponse,
+    response_class=StreamingResponse,
     responses={
+        status.HTTP_200_OK: {"content": {"text/csv": {}}},
         status.HTTP_404_NOT_FOUND: {"description": "Stores not found"},
     },
     dependencies=[Depends(get_admin)],
@@ -517,70 +526,21 @@ def get_stores_report(
 ):
     """Create report of the stores for the admin panel"""
 
-    stores = get_stores_admin(db, search, subscription_status if subscription_status else None)
+    stmt = get_stores_admin_stmt(search, subscription_status)
 
-    if not stores:
+    if db.scalar(stmt.with_only_columns(m.Store.id).limit(1)) is None:
         log(log.ERROR, "Stores not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stores not found",
         )
 
-    with open(
-        os.path.join(CFG.REPORTS_DIR, CFG.STORES_REPORT_FILE),
-        "w",
-        newline="",
-    ) as report_file:
-        report = csv.writer(report_file)
-        data = [
-            [
-                "User Name",
-                "Email",
-                "Phone",
-                "Is Blocked",
-                "Subscription Status",
-                "Created At",
-                "Store Url",
-                "№ of properties",
-            ]
-        ]
-
-        for store in stores:
-            user_name = store.user.first_name + " " + store.user.last_name
-            email = store.user.email
-            phone = store.user.phone
-            is_blocked = str(store.user.is_blocked).lower()
-            status_subscription = store.status.value.upper()
-            created_at = store.user.created_at.strftime("%H:%M %b %d %Y")
-            store_url = store.url
-            properties = str(store.items_count)
-            data.append(
-                [
-                    user_name,
-                    email,
-                    phone,
-                    is_blocked,
-                    status_subscription,
-                    created_at,
-                    store_url,
-                    properties,
-                ]
-            )
-        log(
-            log.INFO,
-            "Create report data [%s] for admin panel ",
-            data,
-        )
-
-        report.writerows(data)
-
-        log(
-            log.INFO,
-            "Write data (count of stores in data [%d]) to csv file",
-            len(data),
-        )
-
-    return FileResponse(os.path.join(CFG.REPORTS_DIR, CFG.STORES_REPORT_FILE))
+    log(log.INFO, "Create stores report for admin panel")
+    return StreamingResponse(
+        generate_stores_report(get_stores_report_stmt(stmt)),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{CFG.STORES_REPORT_FILE}"'},
+    )
 
 
 @store_router.patch(
@@ -1,6 +1,7 @@
 import stripe
 
 from fastapi import APIRouter, Depends, HTTPException, Header, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
@@ -137,37 +138,10 @@ def create_portal_session(
     )
 
 
-@subscription_router.post(
-    "/webhook",
-    status_code=status.HTTP_200_OK,
-    responses={
-        status.HTTP_400_BAD_REQUEST: {"description": "Error verifying webhook signature"},
-    },
-)
-async def webhook_received(
-    request: Request,
-    stripe_signature: str = Header(None),
-    db: Session = Depends(get_db),
-):
-    webhook_secret = CFG.STRIPE_WEBHOOK_KEY
-
-    data = await request.body()
-
-    try:
-        event = stripe.Webhook.construct_event(
-            payload=data,
-            sig_header=stripe_signature,
-            secret=webhook_secret,
-        )
-
-        event_data = event["data"]
-
-        log(log.INFO, "Webhook received: %s", event_data)
-
-    except Exception as e:
-        log(log.ERROR, "Error verifying webhook signature: %s", e)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error verifying webhook signature")
+def handle_stripe_event(event: stripe.Event, db: Session):
+    """Stripe API calls and DB writes of the webhook, blocking, run in the threadpool"""
 
+    event_data = event["data"]
     event_type = event["type"]
 
     if event_type == "checkout.session.completed":
@@ -227,6 +201,40 @@ async def webhook_received(
         log(log.INFO, "Event not handled: %s", event_type)
 
 
+@subscription_router.post(
+    "/webhook",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Error verifying webhook signature"},
+    },
+)
+async def webhook_received(
+    request: Request,
+    stripe_signature: str = Header(None),
+    db: Session = Depends(get_db),
+):
+    webhook_secret = CFG.STRIPE_WEBHOOK_KEY
+
+    data = await request.body()
+
+    try:
+        event = stripe.Webhook.construct_event(
+            payload=data,
+            sig_header=stripe_signature,
+            secret=webhook_secret,
+        )
+
+        event_data = event["data"]
+
+        log(log.INFO, "Webhook received: %s", event_data)
+
+    except Exception as e:
+        log(log.ERROR, "Error verifying webhook signature: %s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error verifying webhook signature")
+
+    await run_in_threadpool(handle_stripe_event, event, db)
+
+
 @subscription_router.post(
     "/modify-subscription",
     status_code=status.HTTP_200_OK,
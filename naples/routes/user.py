@@ -1,9 +1,8 @@
 from typing import Sequence
 from fastapi import Depends, UploadFile, APIRouter, status
 from fastapi_pagination import Page, Params, paginate
+from fastapi_pagination.cursor import CursorPage, CursorParams
 from mypy_boto3_s3 import S3Client
-from botocore.exceptions import ClientError
-from mypy_boto3_ses import SESClient
 
 from naples.dependency.admin import get_admin
 from naples.dependency.get_user_store import get_current_user_store
@@ -17,11 +16,11 @@ import sqlalchemy as sa
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import Executable
 
-from naples.dependency import get_current_user, get_s3_connect, get_ses_client
+from naples.dependency import get_current_user, get_s3_connect
 from naples.routes.utils import get_user_data
 from naples.utils import get_file_extension
 from naples.database import get_db
-from naples.utils import createMsgEmailChangePassword, sendEmailAmazonSES
+from naples.email_templates import render_change_password
 from naples.config import config
 
 CFG = config()
@@ -197,14 +196,12 @@ def delete_user_avatar(
     response_model=s.User,
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "Old password is incorrect"},
-        status.HTTP_400_BAD_REQUEST: {"description": "Email not sent!"},
     },
 )
 def change_user_password(
     data: s.UserResetPasswordIn,
     db: Session = Depends(get_db),
     current_user: m.User = Depends(get_current_user),
-    ses: SESClient = Depends(get_ses_client),
 ):
     """Changes the user password"""
 
@@ -219,27 +216,23 @@ def change_user_password(
 
     log(log.INFO, f"User {current_user.email} changed his password, verification required")
 
-    db.commit()
-    db.refresh(current_user)
-
     token = s.Token(access_token=create_access_token(current_user.id))
 
-    msg = createMsgEmailChangePassword(token.access_token, CFG.REDIRECT_ROUTER_CHANGE_PASSWORD)
+    msg = render_change_password(token.access_token, CFG.REDIRECT_ROUTER_CHANGE_PASSWORD)
 
-    try:
-        emailContent = s.EmailAmazonSESContent(
-            recipient_email=current_user.email,
-            sender_email=CFG.MAIL_DEFAULT_SENDER,
-            message=msg,
-            charset=CFG.CHARSET,
-            mail_body_text=CFG.MAIL_BODY_TEXT,
-            mail_subject=CFG.MAIL_SUBJECT_CHANGE_PASSWORD,
-        )
-        sendEmailAmazonSES(emailContent, ses_client=ses)
+    emailContent = s.EmailAmazonSESContent(
+        recipient_email=current_user.email,
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message=msg,
+        charset=CFG.CHARSET,
+        mail_body_text=CFG.MAIL_BODY_TEXT,
+        mail_subject=CFG.MAIL_SUBJECT_CHANGE_PASSWORD,
+    )
+    # sent by the email worker, committed with the new password
+    c.queue_email(db, emailContent)
 
-    except ClientError as e:
-        log(log.ERROR, f"Email not sent! {e}")
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email not sent!")
+    db.commit()
+    db.refresh(current_user)
 
     return current_user
 
@@ -287,13 +280,11 @@ def save_user_new_password(
     response_model=s.User,
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "User not found"},
-        status.HTTP_400_BAD_REQUEST: {"description": "Email not sent!"},
     },
 )
 def forgot_password(
     data: s.UserForgotPasswordIn,
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(get_ses_client),
 ):
     """Forgot password"""
 
@@ -310,22 +301,19 @@ def forgot_password(
 
     token = s.Token(access_token=create_access_token(user.id))
 
-    msg = createMsgEmailChangePassword(token.access_token, CFG.REDIRECT_ROUTER_FORGOT_PASSWORD)
+    msg = render_change_password(token.access_token, CFG.REDIRECT_ROUTER_FORGOT_PASSWORD)
 
-    try:
-        emailContent = s.EmailAmazonSESContent(
-            recipient_email=user.email,
-            sender_email=CFG.MAIL_DEFAULT_SENDER,
-            message=msg,
-            charset=CFG.CHARSET,
-            mail_body_text="Click the link to change your password!",
-            mail_subject="Reset your password",
-        )
-        sendEmailAmazonSES(emailContent, ses_client=ses)
-
-    except ClientError as e:
-        log(log.ERROR, f"Email not sent! {e}")
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email not sent!")
+    emailContent = s.EmailAmazonSESContent(
+        recipient_email=user.email,
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message=msg,
+        charset=CFG.CHARSET,
+        mail_body_text="Click the link to change your password!",
+        mail_subject="Reset your password",
+    )
+    # sent by the email worker
+    c.queue_email(db, emailContent)
+    db.commit()
 
     log(log.INFO, f"User {user.email} forgot his password")
 
@@ -337,13 +325,11 @@ def forgot_password(
     status_code=status.HTTP_201_CREATED,
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "User not found"},
-        status.HTTP_400_BAD_REQUEST: {"description": "Email not sent!"},
     },
 )
 def forgot_password_create(
     data: s.UserCreatePasswordIn,
     db: Session = Depends(get_db),
-    ses: SESClient = Depends(get_ses_client),
 ):
     """Create new password when user forgot password"""
 
@@ -456,6 +442,48 @@ def get_user_subscription_history(
     return paginate(user_subscriptions_history, params, length_function=lambda x: len(x))
 
 
+@user_router.get(
+    "/{user_uuid}/subscriptions/cursor",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[s.SubscriptionHistoryAdmin],
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "User not found or invalid cursor"},
+    },
+    dependencies=[Depends(get_admin)],
+)
+def get_user_subscription_history_by_cursor(
+    user_uuid: str,
+    db: Session = Depends(get_db),
+    params: CursorParams = Depends(),
+):
+    """Get user subscription history with cursor pagination"""
+
+    user = db.scalar(sa.select(m.User).where(m.User.uuid == user_uuid))
+
+    if not user:
+        log(log.ERROR, "User not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User not found")
+
+    return c.paginate_by_cursor(
+        db,
+        sa.select(m.Subscription).where(m.Subscription.user_id == user.id),
+        params,
+        created_at=m.Subscription.created_at,
+        id=m.Subscription.id,
+        transformer=lambda subscriptions: [
+            s.SubscriptionHistoryAdmin(
+                type=subscription.type,
+                status=s.SubscriptionStatus(subscription.status),
+                start_date=subscription.start_date,
+                end_date=subscription.end_date,
+                amount=subscription.amount,
+            )
+            for subscription in subscriptions
+        ],
+        descending=True,
+    )
+
+
 @user_router.patch(
     "/block",
     status_code=status.HTTP_200_OK,
@@ -1,11 +1,15 @@
-from datetime import date, datetime, timedelta
-from typing import Sequence
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Iterator, Sequence
 from fastapi import HTTPException, status
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 import naples.schemas as s
 import naples.models as m
+from naples.database import db
+from naples.models.store import get_store_status
 from naples.logger import log
 from naples.config import config
 
@@ -113,73 +117,76 @@ def check_user_subscription_max_active_items(store: m.Store, item: m.Item, db: S
     return True
 
 
+def get_last_subscriptions() -> sa.Subquery:
+    """Id of the last subscription of every user, the one User.subscription returns"""
+
+    return (
+        sa.select(m.Subscription.user_id, sa.func.max(m.Subscription.id).label("id"))
+        .group_by(m.Subscription.user_id)
+        .subquery()
+    )
+
+
 # get stores for admin panel
-def get_stores_admin(
-    db: Session, search: str | None, subscription_status: s.StoreStatus | None
-) -> Sequence[s.StoreAdminOut]:
+def get_stores_admin_stmt(search: str | None, subscription_status: s.StoreStatus | None) -> sa.Select:
     stmt = sa.select(m.Store)
-    stmt_user = sa.select(m.User).where(m.User.is_deleted.is_(False))
+    users_ids = sa.select(m.User.id).where(m.User.is_deleted.is_(False))
 
     if search:
-        stmt_user = sa.select(m.User).where(
-            sa.and_(
-                m.User.is_deleted.is_(False),
-                sa.or_(
-                    m.User.email.ilike(f"%{search}%"),
-                    m.User.phone.ilike(f"%{search}%"),
-                    m.User.first_name.ilike(f"%{search}%"),
-                    m.User.last_name.ilike(f"%{search}%"),
-                ),
-            )
+        users_ids = users_ids.where(
+            sa.or_(
+                m.User.email.ilike(f"%{search}%"),
+                m.User.phone.ilike(f"%{search}%"),
+                m.User.first_name.ilike(f"%{search}%"),
+                m.User.last_name.ilike(f"%{search}%"),
+            ),
         )
 
-        users_db = db.scalars(stmt_user).all()
-
-        users_ids = [user.id for user in users_db]
-
-        stmt = sa.select(m.Store).where(
+        stmt = stmt.where(
             sa.or_(
                 m.Store.url.ilike(f"%{search}%"),
                 m.Store.user_id.in_(users_ids),
             )
         )
 
-    db_stores = db.scalars(stmt).all()
-
     today = datetime.now()
 
     if subscription_status:
-        users = db.scalars(stmt_user).all()
+        last_subscriptions = get_last_subscriptions()
+        users_ids = users_ids.join(last_subscriptions, last_subscriptions.c.user_id == m.User.id).join(
+            m.Subscription, m.Subscription.id == last_subscriptions.c.id
+        )
 
         if subscription_status.value == s.StoreStatus.ACTIVE.value:
-            users_last_active_subscription = [
-                user
-                for user in users
-                if user.subscription.status == s.SubscriptionStatus.ACTIVE.value
-                or (
-                    user.subscription.status == s.SubscriptionStatus.TRIALING.value
-                    and user.subscription.end_date > today
+            users_ids = users_ids.where(
+                sa.or_(
+                    m.Subscription.status == s.SubscriptionStatus.ACTIVE.value,
+                    sa.and_(
+                        m.Subscription.status == s.SubscriptionStatus.TRIALING.value,
+                        m.Subscription.end_date > today,
+                    ),
+                )
+            )
+        else:
+            users_ids = users_ids.where(
+                sa.or_(
+                    m.Subscription.status == s.SubscriptionStatus.CANCELED.value,
+                    sa.and_(
+                        m.Subscription.status != s.SubscriptionStatus.ACTIVE.value,
+                        m.Subscription.end_date < today,
+                    ),
                 )
-            ]
+            )
 
-            users_ids = [user.id for user in users_last_active_subscription]
+        stmt = stmt.where(m.Store.user_id.in_(users_ids))
 
-            stmt = stmt.where(m.Store.user_id.in_(users_ids))
-            db_stores = db.scalars(stmt).all()
+    return stmt
 
-        else:
-            users_last_active_subscription = [
-                user
-                for user in users
-                if user.subscription.status == s.SubscriptionStatus.CANCELED.value
-                or (
-                    user.subscription.status != s.SubscriptionStatus.ACTIVE.value and user.subscription.end_date < today
-                )
-            ]
 
-            users_ids = [user.id for user in users_last_active_subscription]
-            stmt = stmt.where(m.Store.user_id.in_(users_ids))
-            db_stores = db.scalars(stmt).all()
+def get_stores_admin(
+    db: Session, search: str | None, subscription_status: s.StoreStatus | None
+) -> Sequence[s.StoreAdminOut]:
+    db_stores = db.scalars(get_stores_admin_stmt(search, subscription_status)).all()
 
     stores: Sequence[s.StoreAdminOut] = [s.StoreAdminOut.model_validate(store) for store in db_stores]
 
@@ -188,6 +195,86 @@ def get_stores_admin(
     return stores
 
 
+STORES_REPORT_HEADER = [
+    "User Name",
+    "Email",
+    "Phone",
+    "Is Blocked",
+    "Subscription Status",
+    "Created At",
+    "Store Url",
+    "№ of properties",
+]
+
+
+def get_stores_report_stmt(stores_stmt: sa.Select) -> sa.Select:
+    """Row of the report of every store of the admin stores query, with its owner, last subscription and items count"""
+
+    last_subscriptions = get_last_subscriptions()
+    items_counts = (
+        sa.select(m.Item.store_id, sa.func.count(m.Item.id).label("count"))
+        .where(m.Item.is_deleted.is_(False))
+        .group_by(m.Item.store_id)
+        .subquery()
+    )
+    return (
+        stores_stmt.with_only_columns(
+            m.User.first_name,
+            m.User.last_name,
+            m.User.email,
+            m.User.phone,
+            m.User.is_blocked,
+            m.Subscription.status,
+            m.Subscription.end_date,
+            m.User.created_at,
+            m.Store.url,
+            sa.func.coalesce(items_counts.c.count, 0).label("items_count"),
+        )
+        .select_from(m.Store)
+        .join(m.User, m.Store.user_id == m.User.id)
+        .outerjoin(last_subscriptions, last_subscriptions.c.user_id == m.User.id)
+        .outerjoin(m.Subscription, m.Subscription.id == last_subscriptions.c.id)
+        .outerjoin(items_counts, items_counts.c.store_id == m.Store.id)
+        .order_by(m.Store.id)
+    )
+
+
+def generate_stores_report(report_stmt: sa.Select) -> Iterator[str]:
+    """CSV of the report, read from a server side cursor and sent by batches of STORES_REPORT_BATCH_SIZE rows"""
+
+    buffer = io.StringIO()
+    report = csv.writer(buffer)
+    report.writerow(STORES_REPORT_HEADER)
+
+    rows_count = 0
+    # the session of the request is closed once the route returns, the rows are read while the response is sent
+    with db.Session() as session:
+        result = session.execute(report_stmt.execution_options(yield_per=CFG.STORES_REPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            for row in rows:
+                store_status = get_store_status(row.status, row.end_date) if row.status else None
+                report.writerow(
+                    [
+                        f"{row.first_name} {row.last_name}",
+                        row.email,
+                        row.phone,
+                        str(row.is_blocked).lower(),
+                        store_status.value.upper() if store_status else "",
+                        row.created_at.strftime("%H:%M %b %d %Y"),
+                        row.url,
+                        str(row.items_count),
+                    ]
+                )
+            rows_count += len(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+    log(log.INFO, "Stores report of [%d] stores sent", rows_count)
+
+
 # create trial subscription
 def create_trial_subscription(user: m.User, db: Session, stripe_customer_id: str) -> m.Subscription:
     """Create trial subscription"""
@@ -213,16 +300,3 @@ def create_trial_subscription(user: m.User, db: Session, stripe_customer_id: str
     )
 
     return user_subscription
-
-
-# Function to check if date ranges overlap
-def is_available(item: s.ItemOut, start_date: date, end_date: date) -> bool:
-    # Check if there are any overlapping bookings
-    for booked in item.booked_dates:
-        check_in = booked.from_date.date()
-        check_out = booked.to_date.date()
-        if not (check_out <= booked.from_date or check_in >= booked.to_date):
-            # There is an overlap, so the item is not available
-            return False
-    # No overlaps, so the item is available
-    return True
@@ -29,6 +29,7 @@ from .store import (
     StoreUpdateIn,
     StoreAdminOut,
     StoresAdminOut,
+    StoreSnapshot,
 )
 from .item import (
     ItemStage,
@@ -38,10 +39,16 @@ from .item import (
     ItemVideoLinkOut,
     ItemsFilterDataIn,
     ItemsFilterDataOut,
+    FacetCount,
     ItemDataIn,
     ItemVideoLinkType,
     ItemDetailsOut,
+    ItemImageUploadOut,
+    ItemImagesUploadOut,
+    ItemMarkerOut,
+    ItemMarkersOut,
     RentalLength,
+    ItemSort,
     ExternalUrls,
     ItemUpdateIn,
 )
@@ -90,6 +97,7 @@ from .store_url import (
     TraefikData,
     TraefikStoreData,
     TraefikTLS,
+    TraefikDomain,
     DNSRecord,
 )
 
@@ -131,3 +139,5 @@ from .admin_contact_request import (
     AdminContactRequestListOut,
 )
 from .metadata import MetadataType, Metadata, MetadataIn, MetadataOut, Metadaties
+from .email import EmailStatus
+from .dns import DNSStatus, DNSJobAction, DNSJobStatus
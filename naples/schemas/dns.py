@@ -0,0 +1,30 @@
+from enum import Enum
+
+
+class DNSStatus(Enum):
+    PENDING = "pending"
+    PROVISIONED = "provisioned"
+    FAILED = "failed"
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
+
+
+class DNSJobAction(Enum):
+    ADD = "add"
+    DELETE = "delete"
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
+
+
+class DNSJobStatus(Enum):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class EmailStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
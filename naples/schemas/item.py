@@ -24,6 +24,11 @@ class RentalLength(enum.Enum):
     ANNUAL = "annual"
 
 
+class ItemSort(enum.Enum):
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+
+
 class ExternalUrls(BaseModel):
     airbnb_url: str
     vrbo_url: str
@@ -115,6 +120,8 @@ class ItemOut(BaseModel):
     state: str
 
     image_url: str = Field("", validation_alias=AliasChoices("image_url", "imageUrl"), serialization_alias="imageUrl")
+    min_price: float = Field(0, validation_alias=AliasChoices("min_price", "minPrice"), serialization_alias="minPrice")
+    max_price: float = Field(0, validation_alias=AliasChoices("max_price", "maxPrice"), serialization_alias="maxPrice")
 
     stage: ItemStage
 
@@ -174,6 +181,30 @@ class ItemDetailsOut(ItemOut):
     city: str
 
 
+class ItemImageUploadOut(BaseModel):
+    filename: str
+    url: str | None = None
+    error: str | None = None
+
+
+class ItemImagesUploadOut(BaseModel):
+    items: list[ItemImageUploadOut]
+
+
+class ItemMarkerOut(BaseModel):
+    uuid: str
+    latitude: float
+    longitude: float
+    min_price: float = Field(0, validation_alias=AliasChoices("min_price", "minPrice"), serialization_alias="minPrice")
+    image_url: str = Field("", validation_alias=AliasChoices("image_url", "imageUrl"), serialization_alias="imageUrl")
+    # km from the search point, radius search only
+    distance: float | None = None
+
+
+class ItemMarkersOut(BaseModel):
+    items: list[ItemMarkerOut]
+
+
 class Items(BaseModel):
     items: list[ItemOut]
 
@@ -190,10 +221,20 @@ class ItemsFilterDataIn(BaseModel):
     price_min: int | None = None
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
 class ItemsFilterDataOut(BaseModel):
     cities: list[str]
     # city: str
     adults: int
+    city_counts: list[FacetCount] = []
+    bedrooms: list[FacetCount] = []
+    bathrooms: list[FacetCount] = []
+    price_min: float = 0
+    price_max: float = 0
 
 
 class ItemDataIn(BaseModel):
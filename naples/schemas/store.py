@@ -121,3 +121,16 @@ class StoresAdminOut(BaseModel):
     model_config = ConfigDict(
         from_attributes=True,
     )
+
+
+class StoreSnapshot(BaseModel):
+    """What the storefront dependencies need to know about a store, cached by store url"""
+
+    id: int
+    uuid: str
+    url: str
+    is_protected: bool
+    is_blocked: bool
+    is_admin: bool
+    has_subscription: bool
+    status: StoreStatus | None = None
@@ -27,8 +27,19 @@ from pydantic import BaseModel, ConfigDict
 # }
 
 
+class TraefikDomain(BaseModel):
+    main: str
+    sans: list[str] = []
+
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+
 class TraefikTLS(BaseModel):
     certResolver: str
+    # certificate requested for these domains instead of the ones of the router rule
+    domains: list[TraefikDomain] | None = None
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -0,0 +1,96 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from fastapi import Request, Response
+from starlette.middleware.base import RequestResponseEndpoint
+
+from naples.config import config
+from naples.logger import log
+
+CFG = config()
+
+SQL_QUERY_COUNT_HEADER = "X-SQL-Query-Count"
+
+
+@dataclass
+class SQLMetrics:
+    """Statements executed while handling one request"""
+
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str = ""
+
+    def add(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    @property
+    def server_timing(self) -> str:
+        return (
+            f'sql;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f"sql-slowest;dur={self.slowest_time * 1000:.2f}"
+        )
+
+
+# set by the middleware for the current request, shared with the threadpool running sync routes and dependencies
+current_sql_metrics: ContextVar[SQLMetrics | None] = ContextVar("current_sql_metrics", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    metrics = current_sql_metrics.get()
+    if metrics:
+        metrics.add(statement, duration)
+
+
+def instrument_engine(engine: sa.Engine):
+    """Time every statement of the engine and add it to the metrics of the current request"""
+
+    sa.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    sa.event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+async def sql_metrics_middleware(request: Request, call_next: RequestResponseEndpoint) -> Response:
+    metrics = SQLMetrics()
+    token = current_sql_metrics.set(metrics)
+    try:
+        response = await call_next(request)
+    finally:
+        current_sql_metrics.reset(token)
+
+    response.headers["Server-Timing"] = metrics.server_timing
+    response.headers[SQL_QUERY_COUNT_HEADER] = str(metrics.count)
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    log(
+        log.INFO,
+        "[%s %s] SQL queries [%d], time [%.2f ms], slowest [%.2f ms]",
+        request.method,
+        route_path,
+        metrics.count,
+        metrics.total_time * 1000,
+        metrics.slowest_time * 1000,
+        extra={
+            "method": request.method,
+            "route": route_path,
+            "status_code": response.status_code,
+            "sql_queries": metrics.count,
+            "sql_time_ms": round(metrics.total_time * 1000, 2),
+            "sql_slowest_ms": round(metrics.slowest_time * 1000, 2),
+        },
+    )
+    if metrics.slowest_time * 1000 >= CFG.SQL_SLOW_QUERY_MS:
+        log(log.WARNING, "Slow SQL [%.2f ms]: %s", metrics.slowest_time * 1000, metrics.slowest_statement)
+
+    return response
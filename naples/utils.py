@@ -29,61 +29,6 @@ def get_file_extension(file: UploadFile):
     return extension
 
 
-def createMsgEmail(token: str, verify_router: str) -> str:
-    html_content = f"""
-        <html>
-            <body style='margin: 0; padding: 0; box-sizing: border-box; font-family: Arial, Helvetica, sans-serif;'>
-            <div style='width: 100%; background: #efefef; border-radius: 10px; padding: 10px;'>
-                <div style='margin: 0 auto; width: 90%; text-align: center;'>
-                <h1 style='background-color: rgba(0, 53, 102, 1); padding: 5px 10px; border-radius: 5px; color: white;'>Property Roster
-                </h1>
-                <div
-                    style='margin: 30px auto; background: white; width: 40%; border-radius: 10px; padding: 50px; text-align: center;'>
-                    <h3 style='margin-bottom: 100px; font-size: 24px;'>Click the link to verify your email!</h3>
-                    <p style='margin-bottom: 10px;'>Click the button below to verify your email address. If you did not sign up for
-                    an account, you can safely ignore this email.
-                    </p>
-                    <a style='display: block; margin: 0 auto; border: none; background-color: rgba(255, 214, 10, 1); color: white; width: 200px; line-height: 24px; padding: 10px; font-size: 24px; border-radius: 10px; cursor: pointer; text-decoration: none;'
-                    href='{CFG.REDIRECT_URL}{verify_router}?token={token}' target='_blank'>
-                    Verify Email
-                    </a>
-                </div>
-                </div>
-            </div>
-            </body>
-        </html>
-    """
-
-    return html_content
-
-
-def createMsgEmailChangePassword(token: str, verify_router: str) -> str:
-    html_content = f"""
-        <html>
-            <body style='margin: 0; padding: 0; box-sizing: border-box; font-family: Arial, Helvetica, sans-serif;'>
-            <div style='width: 100%; background: #efefef; border-radius: 10px; padding: 10px;'>
-                <div style='margin: 0 auto; width: 90%; text-align: center;'>
-                <h1 style='background-color: rgba(0, 53, 102, 1); padding: 5px 10px; border-radius: 5px; color: white;'>Property Roster
-                </h1>
-                <div
-                    style='margin: 30px auto; background: white; width: 40%; border-radius: 10px; padding: 50px; text-align: center;'>
-                    <h3 style='margin-bottom: 100px; font-size: 24px;'>Click the link to change your password!</h3>
-                    <p style='margin-bottom: 10px;'>Click the button below to change your password. If you did not request a password change, you can safely ignore this email.
-                    </p>
-                    <a style='display: block; margin: 0 auto; border: none; background-color: rgba(255, 214, 10, 1); color: white; width: 200px; line-height: 24px; padding: 10px; font-size: 24px; border-radius: 10px; cursor: pointer; text-decoration: none;'
-                    href='{CFG.REDIRECT_URL}{verify_router}?token={token}' target='_blank'>
-                    Change Password
-                    </a>
-                </div>
-                </div>
-            </div>
-            </body>
-        </html>
-    """
-
-    return html_content
-
-
 def sendEmailAmazonSES(emailContent: s.EmailAmazonSESContent, ses_client: SESClient):
     # the contents of the email.
     response = ses_client.send_email(
@@ -115,41 +60,6 @@ def sendEmailAmazonSES(emailContent: s.EmailAmazonSESContent, ses_client: SESCli
     return response
 
 
-# creating a message for a contact request
-def createMsgContactRequest(contact_request: m.ContactRequest) -> str:
-    html_content = f"""
-        <html>
-            <body style='margin: 0; padding: 0; box-sizing: border-box; font-family: Arial, Helvetica, sans-serif;'>
-            <div style='width: 100%; background: #efefef; border-radius: 10px; padding: 10px;'>
-                <div style='margin: 0 auto; width: 90%; text-align: center;'>
-                <h1 style='background-color: rgba(0, 53, 102, 1); padding: 5px 10px; border-radius: 5px; color: white;'>Property Roster
-                </h1>
-                <div
-                    style='margin: 25px auto; background: white; width: 70%; border-radius: 10px; padding: 50px;'>
-
-                    <h6 style='margin-bottom: 35px; text-align: center; font-size: 24px; '>You have a new request from: </h6>
-                    <div style='margin: 5px; text-align: left;'>
-                        <b>Name:</b> {contact_request.first_name} {contact_request.last_name}
-                    </div>
-                    <div style='margin: 5px; text-align: left;'>
-                        <b>Email:</b> {contact_request.email}
-                    </div>
-                    <div style='margin: 5px; text-align: left;'>
-                        <b>Phone:</b> {contact_request.phone}
-                    </div>
-                    <div style='margin: 5px; text-align: left;'>
-                        <b>Message:</b> {contact_request.message}
-                    </div>
-                </div>
-                </div>
-            </div>
-            </body>
-        </html>
-    """
-
-    return html_content
-
-
 def get_expire_datatime() -> datetime:
     return datetime.now(UTC) + timedelta(minutes=CFG.ACCESS_TOKEN_EXPIRE_MINUTES)
 
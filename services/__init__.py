@@ -3,9 +3,6 @@ from .create_test_data import create_user, create_store, create_item, create_mem
 from .stripe.product import create_product  # noqa: F401
 from .stripe.user import create_stripe_customer  # noqa: F401
 from .store.add_dns_record import (
-    add_godaddy_dns_record,  # noqa: F401
-    check_subdomain_existence,  # noqa: F401
     get_subdomain_from_url,  # noqa: F401
-    delete_godaddy_dns_record,  # noqa: F401
     check_main_domain,  # noqa: F401
 )
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from naples import schemas as s
+from naples.config import config
+from naples.logger import log
+
+CFG = config()
+
+
+class GoDaddyDNSClient:
+    """Records of one GoDaddy domain over a pooled session.
+
+    The records of the domain are indexed by (type, name) and downloaded again only after `cache_ttl` seconds,
+    so checking a record does not fetch the whole zone. Changes of the client update the index in place.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        domain: str,
+        api_key: str,
+        api_secret: str,
+        timeout: float = 10,
+        cache_ttl: float = 300,
+        pool_size: int = 10,
+    ):
+        self.records_url = f"{api_url}/domains/{domain}/records"
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Authorization": f"sso-key {api_key}:{api_secret}",
+                "Content-Type": "application/json",
+            }
+        )
+        # only the idempotent requests are retried, a PATCH may have been applied before the error
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "DELETE"}),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._records: dict[tuple[str, str], s.DNSRecord] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "GoDaddyDNSClient":
+        return cls(
+            CFG.GODADDY_API_URL,
+            CFG.MAIN_DOMAIN,
+            CFG.GODADDY_API_KEY,
+            CFG.GODADDY_API_SECRET,
+            timeout=CFG.GODADDY_TIMEOUT,
+            cache_ttl=CFG.GODADDY_RECORDS_CACHE_TTL,
+            pool_size=CFG.GODADDY_POOL_SIZE,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._records = {}
+            self._loaded_at = None
+
+    def _load_records(self):
+        response = self.session.get(self.records_url, timeout=self.timeout)
+        response.raise_for_status()
+        self._records = {
+            (record["type"], record["name"]): s.DNSRecord(
+                type=record["type"],
+                name=record["name"],
+                data=record["data"],
+                ttl=record["ttl"],
+            )
+            for record in response.json() or []
+        }
+        self._loaded_at = time.monotonic()
+        log(log.DEBUG, "[%d] DNS records loaded", len(self._records))
+
+    def get_records(self, refresh: bool = False) -> dict[tuple[str, str], s.DNSRecord]:
+        with self._lock:
+            if refresh or self._loaded_at is None or time.monotonic() - self._loaded_at > self.cache_ttl:
+                self._load_records()
+            return dict(self._records)
+
+    def has_record(self, name: str, record_type: str = "A", refresh: bool = False) -> bool:
+        return (record_type, name) in self.get_records(refresh)
+
+    def add_records(self, records: list[s.DNSRecord]) -> list[s.DNSRecord]:
+        """Add the missing records with one PATCH, returns the added ones"""
+
+        existing = self.get_records()
+        new_records = [record for record in records if (record.type, record.name) not in existing]
+        if not new_records:
+            return []
+
+        response = self.session.patch(
+            self.records_url, json=[record.model_dump() for record in new_records], timeout=self.timeout
+        )
+        if response.status_code == 422:
+            # the index is older than a record added by another process, check again against the zone
+            existing = self.get_records(refresh=True)
+            new_records = [record for record in new_records if (record.type, record.name) not in existing]
+            if not new_records:
+                return []
+            response = self.session.patch(
+                self.records_url, json=[record.model_dump() for record in new_records], timeout=self.timeout
+            )
+        response.raise_for_status()
+
+        with self._lock:
+            for record in new_records:
+                self._records[(record.type, record.name)] = record
+        log(log.INFO, "[%d] DNS records added", len(new_records))
+        return new_records
+
+    def delete_record(self, name: str, record_type: str = "A") -> bool:
+        """Delete the record if it exists, returns False if there was none"""
+
+        # a record missing from the index may have been added by another process since it was loaded
+        if not self.has_record(name, record_type) and not self.has_record(name, record_type, refresh=True):
+            return False
+
+        response = self.session.delete(f"{self.records_url}/{record_type}/{name}", timeout=self.timeout)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+        with self._lock:
+            self._records.pop((record_type, name), None)
+        log(log.INFO, "DNS record [%s] [%s] deleted", record_type, name)
+        return response.status_code != 404
+
+
+godaddy_client = GoDaddyDNSClient.from_config()
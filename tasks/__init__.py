@@ -4,3 +4,4 @@ from .fill_db_staging_data import fill_db_staging_data  # noqa: F401
 from .fill_db_stripe_products import fill_db_stripe_products, fill_db_stripe_test_products  # noqa: F401
 from .create_admin import create_admin  # noqa: F401
 from .create_metadata import create_metadata  # noqa: F401
+from .notify_expiring_subscriptions import notify_expiring_subscriptions  # noqa: F401
@@ -0,0 +1,20 @@
+import sys
+from invoke import task
+
+
+sys.path = ["", ".."] + sys.path[1:]
+
+from naples.config import config  # noqa: E402
+from naples.database import db  # noqa: E402
+from naples import controllers as c  # noqa: E402
+
+CFG = config()
+
+
+@task
+def notify_expiring_subscriptions(_, days: int = CFG.SUBSCRIPTION_EXPIRY_REMINDER_DAYS):
+    """Queue reminders for the subscriptions ending in `days` days, run once a day"""
+
+    with db.Session() as session:
+        c.queue_subscription_expiry_reminders(session, days)
+        session.commit()
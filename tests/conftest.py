@@ -1,8 +1,11 @@
+import contextlib
+import time
+
 import pytest
 from datetime import datetime, timedelta, UTC
 
 
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator, cast
 from pathlib import Path
 from mypy_boto3_s3 import S3Client
 from mypy_boto3_ses import SESClient
@@ -15,10 +18,14 @@ from dotenv import load_dotenv
 load_dotenv("tests/test.env")
 
 # ruff: noqa: F401 E402
+import anyio
 from sqlalchemy import orm
 import sqlalchemy as sa
+import httpx
 from fastapi.testclient import TestClient
+from starlette.routing import Match
 from naples.main import api
+from naples.sql_metrics import SQL_QUERY_COUNT_HEADER
 from naples import models as m
 from naples import schemas as s
 
@@ -29,19 +36,62 @@ CFG = config("testing")
 
 
 MODULE_PATH = Path(__file__).parent
+
+# Max number of SQL statements per route, a regression adding lazy loads (N+1) fails the test that calls it
+QUERY_BUDGETS = {
+    "GET /api/items": 8,
+    "GET /api/items/all": 8,
+    "GET /api/items/cursor": 7,
+    "GET /api/items/all/cursor": 5,
+    "GET /api/items/filters/data": 7,
+    "GET /api/items/{item_uuid}": 14,
+    "GET /api/amenities/{item_uuid}": 5,
+    "GET /api/booked_dates/{item_uuid}": 5,
+    "GET /api/contact_requests/": 5,
+    "GET /api/fee/{item_uuid}": 4,
+    "GET /api/floor_plans/{item_uuid}": 9,
+    "GET /api/members": 3,
+    "GET /api/metadata/": 7,
+    "GET /api/rates/{item_uuid}": 5,
+    "GET /api/stores/": 8,
+    "GET /api/stores/cursor": 2,
+    "GET /api/stores/urls": 2,
+    "GET /api/stores/{store_url}": 4,
+    "GET /api/users/": 6,
+    "GET /api/users/me": 3,
+}
+# Latency added to every SQL statement by the slow_db fixture, as of a remote database
+DB_LATENCY = 0.05
+# Period of the heartbeat measuring how long the event loop was blocked
+HEARTBEAT_INTERVAL = 0.005
+
 TEST_CSV_FILE = MODULE_PATH / ".." / "data" / "test_uscities.csv"
 
 
 @pytest.fixture
 def db(test_data: s.TestData) -> Generator[orm.Session, None, None]:
     from naples.database import db, get_db
+    from naples.dependency import store_snapshots
+    from naples.controllers import STORE_URLS_VERSION, store_facets, traefik_configs
+    from naples.response_cache import MemoryCacheBackend, response_cache
 
     # from services.export_usa_locations import export_usa_locations_from_csv_file
     from services.create_test_data import create_item, create_member, create_store, create_test_user
+    from services.store.godaddy import godaddy_client
+
+    store_snapshots.clear()
+    store_facets.clear()
+    traefik_configs.clear()
+    godaddy_client.clear()
+    assert isinstance(response_cache, MemoryCacheBackend)
+    response_cache.clear()
 
     with db.Session() as session:
         db.Model.metadata.drop_all(bind=session.bind)
         db.Model.metadata.create_all(bind=session.bind)
+        # seeded by the migration
+        session.add(m.ConfigVersion(name=STORE_URLS_VERSION, version=1, updated_at=datetime.now(UTC)))
+        session.commit()
 
         for test_user in test_data.test_users:
             user = create_test_user(test_user)
@@ -101,10 +151,25 @@ def full_db(db: orm.Session) -> Generator[orm.Session, None, None]:
     yield db
 
 
+def check_query_budget(response: httpx.Response):
+    scope = {"type": "http", "path": response.request.url.path, "method": response.request.method}
+    route = next((route for route in api.routes if route.matches(scope)[0] == Match.FULL), None)
+    if not route:
+        return
+
+    budget = QUERY_BUDGETS.get(f"{response.request.method} {getattr(route, 'path', '')}")
+    queries_count = int(response.headers.get(SQL_QUERY_COUNT_HEADER, 0))
+    assert (
+        budget is None or queries_count <= budget
+    ), f"{response.request.method} {response.request.url.path}: {queries_count} SQL queries, budget is {budget}"
+
+
 @pytest.fixture
 def client(db, requests_mock: Mocker) -> Generator[TestClient, None, None]:
     """Returns a non-authorized test client for the API"""
     with TestClient(api) as c:
+        c.event_hooks["response"] = [check_query_budget]
+
         stores = db.scalars(sa.select(m.Store))
 
         # Mock requests
@@ -529,6 +594,24 @@ def ses() -> Generator[SESClient, None, None]:
     yield ses
 
 
+@pytest.fixture
+def queries(db: orm.Session) -> Generator[list[str], None, None]:
+    """Collects the SQL statements executed by the engines during the test"""
+    from naples.database import async_engine, db as database
+
+    statements: list[str] = []
+
+    def collect_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [database.get_engine(), async_engine.sync_engine]
+    for engine in engines:
+        sa.event.listen(engine, "before_cursor_execute", collect_statement)
+    yield statements
+    for engine in engines:
+        sa.event.remove(engine, "before_cursor_execute", collect_statement)
+
+
 @pytest.fixture(scope="session")
 def test_data() -> Generator[s.TestData, None, None]:
     """Returns a TestData object"""
@@ -571,3 +654,55 @@ def admin_headers(
     token = create_access_token(user_id=user.id)
 
     yield dict(Authorization=f"Bearer {token}")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def slow_db(db: orm.Session) -> Generator[orm.Session, None, None]:
+    """Every SQL statement takes DB_LATENCY seconds, a route running it on the event loop stalls it"""
+    from naples.database import db as database
+
+    def wait_for_database(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(DB_LATENCY)
+
+    engine = database.get_engine()
+    sa.event.listen(engine, "before_cursor_execute", wait_for_database)
+    yield db
+    sa.event.remove(engine, "before_cursor_execute", wait_for_database)
+
+
+@pytest.fixture
+async def async_client(db: orm.Session) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """Client running the app on the event loop of the test, unlike TestClient which uses a separate thread"""
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=cast(Any, api)), base_url="http://testserver", follow_redirects=True
+    ) as c:
+        yield c
+
+
+@contextlib.asynccontextmanager
+async def watch_event_loop() -> AsyncGenerator[list[float], None]:
+    """Collects how much later than scheduled every heartbeat woke up, the event loop was blocked for that long"""
+
+    lags: list[float] = []
+
+    async def heartbeat():
+        while True:
+            start = time.perf_counter()
+            await anyio.sleep(HEARTBEAT_INTERVAL)
+            lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(heartbeat)
+        yield lags
+        task_group.cancel_scope.cancel()
+
+
+@pytest.fixture
+def event_loop_lags():
+    return watch_event_loop
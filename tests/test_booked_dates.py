@@ -94,3 +94,28 @@ def test_delete_booked_dates(client: TestClient, full_db: Session, headers: dict
 
     assert booked_dates.items[0].from_date == booked_date_two.from_date
     assert booked_dates.items[0].to_date == booked_date_two.to_date
+
+
+def test_create_overlapping_booked_dates(client: TestClient, full_db: Session, headers: dict[str, str]):
+    item = full_db.scalar(select(m.Item))
+    assert item
+
+    from_date = datetime.now() + timedelta(days=10)
+    to_date = from_date + timedelta(days=3)
+    full_db.add(m.BookedDate(from_date=from_date, to_date=to_date, item_id=item.id))
+    full_db.commit()
+
+    overlapping = s.BookedDatesBatchIn(
+        item_uuid=item.uuid, from_date=to_date - timedelta(days=1), to_date=to_date + timedelta(days=1)
+    )
+    res = client.post("/api/booked_dates", content=overlapping.model_dump_json(), headers=headers)
+    assert res.status_code == 409
+
+    # a booking may start on the day the previous one ends
+    adjacent = s.BookedDatesBatchIn(item_uuid=item.uuid, from_date=to_date, to_date=to_date + timedelta(days=2))
+    res = client.post("/api/booked_dates", content=adjacent.model_dump_json(), headers=headers)
+    assert res.status_code == 201
+
+    reversed_dates = s.BookedDatesBatchIn(item_uuid=item.uuid, from_date=to_date, to_date=from_date)
+    res = client.post("/api/booked_dates", content=reversed_dates.model_dump_json(), headers=headers)
+    assert res.status_code == 400
@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from naples import models as m
+from naples.database import async_engine, get_async_db, get_async_database_url
+
+
+def test_async_database_url():
+    assert get_async_database_url("postgresql://user:passwd@db:5432/db").drivername == "postgresql+asyncpg"
+    assert get_async_database_url("sqlite:///database.sqlite3").drivername == "sqlite+aiosqlite"
+    assert async_engine.dialect.is_async
+
+
+@pytest.mark.anyio
+async def test_async_db(full_db: Session):
+    async for db in get_async_db():
+        result = await db.execute(select(m.Item.uuid))
+        assert len(result.all()) == len(full_db.scalars(select(m.Item)).all())
+        assert await db.scalar(select(m.Store.url))
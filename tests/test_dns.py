@@ -0,0 +1,214 @@
+import json
+import re
+from datetime import datetime, UTC
+from typing import Generator
+
+import pytest
+import sqlalchemy as sa
+from fastapi.testclient import TestClient
+from requests_mock import Mocker
+from sqlalchemy.orm import Session
+
+from naples import controllers as c, models as m, schemas as s
+from naples.config import config
+from services.store.godaddy import godaddy_client
+
+
+CFG = config("testing")
+
+RECORDS_URL = f"{CFG.GODADDY_API_URL}/domains/{CFG.MAIN_DOMAIN}/records"
+
+
+class FakeGoDaddy:
+    """Records API of one domain kept in memory, counts the requests by method"""
+
+    def __init__(self, requests_mock: Mocker, names: list[str]):
+        self.records = {("A", name): self.record(name) for name in names}
+        self.calls = {"GET": 0, "PATCH": 0, "DELETE": 0}
+        # status of the answers to the changes while the registrar is down
+        self.fail_status: int | None = None
+        # names the registrar refuses, a request with any of them is rejected as a whole
+        self.rejected_names: set[str] = set()
+        requests_mock.get(RECORDS_URL, json=self.list_records)
+        requests_mock.patch(RECORDS_URL, text=self.add_records)
+        requests_mock.delete(re.compile(re.escape(RECORDS_URL) + "/"), text=self.delete_record)
+
+    @staticmethod
+    def record(name: str) -> dict:
+        return {"type": "A", "name": name, "data": CFG.GODADDY_IP_ADDRESS, "ttl": CFG.GO_DADDY_TTL}
+
+    def list_records(self, request, context):
+        self.calls["GET"] += 1
+        return list(self.records.values())
+
+    def add_records(self, request, context):
+        self.calls["PATCH"] += 1
+        if self.fail_status:
+            context.status_code = self.fail_status
+            return ""
+        records = json.loads(request.body)
+        if any(record["name"] in self.rejected_names for record in records):
+            context.status_code = 400
+            return '{"code": "INVALID_BODY"}'
+        if any((record["type"], record["name"]) in self.records for record in records):
+            context.status_code = 422
+            return '{"code": "DUPLICATE_RECORD"}'
+        for record in records:
+            self.records[(record["type"], record["name"])] = record
+        return ""
+
+    def delete_record(self, request, context):
+        self.calls["DELETE"] += 1
+        if self.fail_status:
+            context.status_code = self.fail_status
+            return ""
+        record_type, name = request.path.split("/")[-2:]
+        context.status_code = 404 if self.records.pop((record_type.upper(), name), None) is None else 204
+        return ""
+
+
+@pytest.fixture
+def godaddy(requests_mock: Mocker) -> Generator[FakeGoDaddy, None, None]:
+    godaddy_client.clear()
+    yield FakeGoDaddy(requests_mock, ["site", "site_2"])
+    godaddy_client.clear()
+
+
+def get_records(names: list[str]) -> list[s.DNSRecord]:
+    return [
+        s.DNSRecord(type=CFG.RECORD_TYPE, name=name, data=CFG.GODADDY_IP_ADDRESS, ttl=CFG.GO_DADDY_TTL)
+        for name in names
+    ]
+
+
+def test_dns_records_cache(godaddy: FakeGoDaddy):
+    # the zone is downloaded once for all the checks
+    assert godaddy_client.has_record("site")
+    assert godaddy_client.has_record("site_2")
+    assert not godaddy_client.has_record("new")
+    assert godaddy.calls["GET"] == 1
+
+    # one request for all the new records, the existing one is skipped
+    added = godaddy_client.add_records(get_records(["site", "new", "new_2"]))
+    assert [record.name for record in added] == ["new", "new_2"]
+    assert godaddy.calls["PATCH"] == 1
+    assert ("A", "new_2") in godaddy.records
+    assert godaddy_client.has_record("new_2")
+
+    godaddy_client.delete_record("new")
+    assert godaddy.calls["DELETE"] == 1
+    assert ("A", "new") not in godaddy.records
+    assert not godaddy_client.has_record("new")
+    assert godaddy.calls["GET"] == 1
+
+
+def test_dns_records_changed_by_other_process(godaddy: FakeGoDaddy):
+    assert not godaddy_client.has_record("other")
+
+    # added by another worker after the zone was loaded
+    godaddy.records[("A", "other")] = godaddy.record("other")
+    added = godaddy_client.add_records(get_records(["other", "new"]))
+    assert [record.name for record in added] == ["new"]
+    assert godaddy.calls == {"GET": 2, "PATCH": 2, "DELETE": 0}
+
+    godaddy.records[("A", "late")] = godaddy.record("late")
+    godaddy_client.delete_record("late")
+    assert ("A", "late") not in godaddy.records
+
+    # deleted by another worker: nothing to do
+    godaddy.records.pop(("A", "site"))
+    godaddy_client.delete_record("site")
+    assert not godaddy_client.has_record("site")
+
+
+def get_routed_urls(client: TestClient) -> list[str]:
+    response = client.get("/api/stores/urls")
+    assert response.status_code == 200
+    return [router["rule"] for router in response.json()["http"]["routers"].values()]
+
+
+def test_sign_up_dns_provisioning(client: TestClient, db: Session, godaddy: FakeGoDaddy):
+    godaddy.fail_status = 503
+
+    # the registrar being down does not fail the sign up
+    user = s.UserSignIn(first_name="John", last_name="Doe", email="doe@mail.com", password="password")
+    response = client.post("/api/auth/sign-up", json=user.model_dump())
+    assert response.status_code == 201
+
+    store = db.scalar(sa.select(m.Store).where(m.Store.email == user.email))
+    assert store
+    assert store.dns_status == s.DNSStatus.PENDING.value
+    assert f"Host(`{store.url}`)" not in get_routed_urls(client)
+
+    assert c.run_dns_jobs(db, godaddy_client) == 1
+    job = db.scalar(sa.select(m.DNSJob))
+    assert job
+    assert job.status == s.DNSJobStatus.PENDING.value
+    assert job.attempts == 1
+    assert job.next_attempt_at.replace(tzinfo=UTC) > datetime.now(UTC)
+    # not due yet
+    assert c.run_dns_jobs(db, godaddy_client) == 0
+
+    godaddy.fail_status = None
+    job.next_attempt_at = datetime.now(UTC)
+    db.commit()
+    assert c.run_dns_jobs(db, godaddy_client) == 1
+
+    db.refresh(store)
+    assert job.status == s.DNSJobStatus.DONE.value
+    assert store.dns_status == s.DNSStatus.PROVISIONED.value
+    assert ("A", store.user.uuid) in godaddy.records
+    assert f"Host(`{store.url}`)" in get_routed_urls(client)
+
+
+def test_update_store_url_dns(client: TestClient, headers: dict[str, str], full_db: Session, godaddy: FakeGoDaddy):
+    store = full_db.scalar(sa.select(m.Store).where(m.Store.url == f"site.{CFG.MAIN_DOMAIN}"))
+    assert store
+
+    response = client.patch("/api/stores/", headers=headers, json={"url": f"new_site.{CFG.MAIN_DOMAIN}"})
+    assert response.status_code == 200
+    full_db.refresh(store)
+    assert store.dns_status == s.DNSStatus.PENDING.value
+
+    # the old record is deleted after the new one is added
+    assert c.run_dns_jobs(full_db, godaddy_client) == 2
+    assert godaddy.calls["PATCH"] == godaddy.calls["DELETE"] == 1
+    assert ("A", "new_site") in godaddy.records
+    assert ("A", "site") not in godaddy.records
+
+    full_db.refresh(store)
+    assert store.dns_status == s.DNSStatus.PROVISIONED.value
+    assert f"Host(`new_site.{CFG.MAIN_DOMAIN}`)" in get_routed_urls(client)
+
+    # a rejected record is not retried
+    response = client.patch("/api/stores/", headers=headers, json={"url": f"bad.{CFG.MAIN_DOMAIN}"})
+    assert response.status_code == 200
+    godaddy.fail_status = 422
+    assert c.run_dns_jobs(full_db, godaddy_client) == 2
+    assert c.run_dns_jobs(full_db, godaddy_client) == 0
+    full_db.refresh(store)
+    assert store.dns_status == s.DNSStatus.FAILED.value
+
+
+def test_dns_batch_with_rejected_record(full_db: Session, godaddy: FakeGoDaddy):
+    stores = full_db.scalars(sa.select(m.Store).order_by(m.Store.id).limit(2)).all()
+    assert len(stores) == 2
+    jobs = []
+    for store, subdomain in zip(stores, ["bad", "good"]):
+        store.url = f"{subdomain}.{CFG.MAIN_DOMAIN}"
+        jobs.append(c.queue_dns_record(full_db, store, subdomain))
+    full_db.commit()
+    godaddy.rejected_names = {"bad"}
+
+    # the batch is rejected, then each record is sent on its own
+    assert c.run_dns_jobs(full_db, godaddy_client) == 2
+    assert godaddy.calls["PATCH"] == 3
+    assert ("A", "good") in godaddy.records
+    assert ("A", "bad") not in godaddy.records
+
+    bad_job, good_job = jobs
+    assert bad_job.status == s.DNSJobStatus.FAILED.value
+    assert good_job.status == s.DNSJobStatus.DONE.value
+    bad_store, good_store = stores
+    assert bad_store.dns_status == s.DNSStatus.FAILED.value
+    assert good_store.dns_status == s.DNSStatus.PROVISIONED.value
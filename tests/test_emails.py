@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from mypy_boto3_ses import SESClient
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from naples import controllers as c, models as m, schemas as s
+from naples.config import config
+from naples.email_templates import EmailTemplate, render_contact_request
+
+
+CFG = config("testing")
+
+
+class ThrottledSESClient:
+    def send_email(self, **kwargs):
+        raise ClientError({"Error": {"Code": "Throttling", "Message": "Maximum sending rate exceeded."}}, "SendEmail")
+
+
+@mock_aws
+def test_contact_request_email_outbox(
+    client: TestClient,
+    full_db: Session,
+    headers: dict[str, str],
+    ses: SESClient,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    req_payload = s.ContactRequestIn(
+        first_name="John",
+        last_name="Doe",
+        email="john_doe@buu.com",
+        phone="1234567890",
+        message="Hello, I would like to know more about this item",
+        check_in=datetime.now(),
+        check_out=datetime.now(),
+    )
+
+    # SES is not called by the request, the sender is not even verified yet
+    res = client.post(
+        f"/api/contact_requests?store_url={store.url}", content=req_payload.model_dump_json(), headers=headers
+    )
+    assert res.status_code == 201
+
+    email = full_db.scalar(select(m.Email))
+    assert email
+    assert email.status == s.EmailStatus.PENDING.value
+    assert email.recipient_email == store.email
+    assert "John Doe" in email.html
+
+    ses.verify_email_address(EmailAddress=store.email)
+    ses.verify_email_address(EmailAddress=CFG.MAIL_DEFAULT_SENDER)
+
+    limiter = c.RateLimiter(CFG.EMAIL_MAX_SEND_RATE)
+    assert c.send_queued_emails(full_db, ses, limiter) == 1
+    full_db.refresh(email)
+    assert email.status == s.EmailStatus.SENT.value
+    assert email.message_id
+    assert email.attempts == 1
+    assert email.sent_at
+    assert ses.get_send_statistics()["SendDataPoints"][0]["DeliveryAttempts"] == 1
+
+    # nothing left to send
+    assert c.send_queued_emails(full_db, ses, limiter) == 0
+
+
+@mock_aws
+def test_email_outbox_retries(full_db: Session, ses: SESClient):
+    limiter = c.RateLimiter(CFG.EMAIL_MAX_SEND_RATE)
+    email_content = s.EmailAmazonSESContent(
+        recipient_email="user@infotest.com",
+        sender_email=CFG.MAIL_DEFAULT_SENDER,
+        message="<p>Hello</p>",
+        mail_body_text="Hello",
+        mail_subject="Hello",
+    )
+    email = c.queue_email(full_db, email_content)
+    full_db.commit()
+
+    # throttled: sent again later
+    assert c.send_queued_emails(full_db, ThrottledSESClient(), limiter) == 1  # type: ignore[arg-type]
+    full_db.refresh(email)
+    assert email.status == s.EmailStatus.PENDING.value
+    assert email.attempts == 1
+    assert "Throttling" in email.last_error
+    assert email.next_attempt_at.replace(tzinfo=UTC) > datetime.now(UTC)
+    # not due yet
+    assert c.send_queued_emails(full_db, ses, limiter) == 0
+
+    # rejected, the sender is not verified: not retried
+    email.next_attempt_at = datetime.now(UTC)
+    full_db.commit()
+    assert c.send_queued_emails(full_db, ses, limiter) == 1
+    full_db.refresh(email)
+    assert email.status == s.EmailStatus.FAILED.value
+    assert email.attempts == 2
+
+
+@mock_aws
+def test_email_outbox_batch_queries(full_db: Session, ses: SESClient, queries: list[str]):
+    ses.verify_email_address(EmailAddress=CFG.MAIL_DEFAULT_SENDER)
+    for i in range(3):
+        c.queue_email(
+            full_db,
+            s.EmailAmazonSESContent(
+                recipient_email=f"user{i}@infotest.com",
+                sender_email=CFG.MAIL_DEFAULT_SENDER,
+                message="<p>Hello</p>",
+                mail_body_text="Hello",
+                mail_subject="Hello",
+            ),
+        )
+    full_db.commit()
+
+    queries.clear()
+    limiter = c.RateLimiter(CFG.EMAIL_MAX_SEND_RATE)
+    assert c.send_queued_emails(full_db, ses, limiter) == 3
+    # claimed and loaded back once, not once per email
+    assert len([q for q in queries if q.lstrip().upper().startswith("SELECT") and "FROM emails" in q]) == 2
+    assert full_db.scalar(select(sa.func.count(m.Email.id)).where(m.Email.status == s.EmailStatus.SENT.value)) == 3
+
+
+def test_worker_send_rate(monkeypatch: pytest.MonkeyPatch):
+    from naples.controllers import email
+
+    monkeypatch.setattr(email.CFG, "EMAIL_MAX_SEND_RATE", 14)
+    assert c.get_worker_send_rate() == 14
+    # the rate of the account is shared by the workers
+    monkeypatch.setattr(email.CFG, "EMAIL_WORKERS", 2)
+    assert c.get_worker_send_rate() == 7
+
+
+def test_email_template():
+    template = EmailTemplate("<a href='{{ link }}'>{{button}}</a> {{ name }}, {{ name }}", button="Open & see")
+    # the static field is already in the text
+    assert template.fields == ["link", "name", "name"]
+
+    assert template.render(link="https://x.com/?a=1&b=2", name="<b>Ann</b>") == (
+        "<a href='https://x.com/?a=1&amp;b=2'>Open &amp; see</a> &lt;b&gt;Ann&lt;/b&gt;, &lt;b&gt;Ann&lt;/b&gt;"
+    )
+    assert template.render_many([{"name": "Ann"}, {"name": "Bob"}], link="/renew") == [
+        "<a href='/renew'>Open &amp; see</a> Ann, Ann",
+        "<a href='/renew'>Open &amp; see</a> Bob, Bob",
+    ]
+
+    contact_request = m.ContactRequest(
+        first_name="John", last_name="<script>", email="john@doe.com", phone="1", message="Hi"
+    )
+    message = render_contact_request(contact_request)
+    assert "John &lt;script&gt;" in message
+    assert "<script>" not in message
+
+
+def test_subscription_expiry_reminders(full_db: Session):
+    subscriptions = full_db.scalars(select(m.Subscription)).all()
+    assert len(subscriptions) > 1
+    ending, later = subscriptions[0], subscriptions[1]
+    ending.status = s.SubscriptionStatus.TRIALING.value
+    ending.end_date = datetime.now(UTC) + timedelta(days=CFG.SUBSCRIPTION_EXPIRY_REMINDER_DAYS)
+    later.status = s.SubscriptionStatus.TRIALING.value
+    later.end_date = datetime.now(UTC) + timedelta(days=CFG.SUBSCRIPTION_EXPIRY_REMINDER_DAYS + 5)
+    full_db.commit()
+
+    assert c.queue_subscription_expiry_reminders(full_db, CFG.SUBSCRIPTION_EXPIRY_REMINDER_DAYS) == 1
+    full_db.commit()
+
+    email = full_db.scalar(select(m.Email))
+    assert email
+    assert email.recipient_email == ending.user.email
+    assert ending.user.first_name in email.html
+    assert f"{ending.end_date:%B %d, %Y}" in email.html
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, UTC
+
+import httpx
+import pytest
+from moto import mock_aws
+from mypy_boto3_ses import SESClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from naples import schemas as s, models as m
+from naples.config import config
+
+from .conftest import DB_LATENCY
+
+CFG = config("testing")
+
+# a route blocking the event loop stalls it at least for one SQL statement
+MAX_EVENT_LOOP_LAG = DB_LATENCY / 2
+
+
+@pytest.mark.anyio
+async def test_routes_do_not_block_event_loop(
+    async_client: httpx.AsyncClient,
+    slow_db: Session,
+    headers: dict[str, str],
+    ses: SESClient,
+    event_loop_lags,
+):
+    store = slow_db.scalar(select(m.Store))
+    assert store
+    item = slow_db.scalar(select(m.Item))
+    assert item
+    # read before the requests, their commits expire the objects of the shared session
+    store_url, item_uuid = store.url, item.uuid
+
+    with mock_aws():
+        ses.verify_email_address(EmailAddress=store.email)
+        ses.verify_email_address(EmailAddress=CFG.MAIL_DEFAULT_SENDER)
+
+        contact_request = s.ContactRequestIn(
+            first_name="John",
+            last_name="Doe",
+            email="john_doe@buu.com",
+            phone="1234567890",
+            message="Hello, I would like to know more about this item",
+            check_in=datetime.now(),
+            check_out=datetime.now(),
+        )
+        rate = s.RateIn(
+            item_uuid=item_uuid,
+            start_date=datetime.now(UTC),
+            end_date=datetime.now(UTC),
+            night=100.0,
+            weekend_night=200.0,
+            week=300.0,
+            month=400.0,
+            min_stay=1,
+            visible=True,
+        )
+        fee = s.FeeIn(name="Test Fee", amount=100.0, item_uuid=item_uuid, visible=True)
+        booked_dates = s.BookedDatesBatchIn(
+            item_uuid=item_uuid, from_date=datetime.now(), to_date=datetime.now() + timedelta(days=1)
+        )
+
+        # one request at a time, they share the session of the test
+        async with event_loop_lags() as lags:
+            res = await async_client.post(
+                "/api/contact_requests",
+                params={"store_url": store_url},
+                content=contact_request.model_dump_json(),
+                headers=headers,
+            )
+            assert res.status_code == 201
+
+            res = await async_client.post("/api/rates/", content=rate.model_dump_json(), headers=headers)
+            assert res.status_code == 201
+
+            res = await async_client.get(f"/api/rates/{item_uuid}", headers=headers)
+            assert res.status_code == 200
+
+            res = await async_client.post("/api/fee/", content=fee.model_dump_json(), headers=headers)
+            assert res.status_code == 201
+
+            res = await async_client.post("/api/booked_dates", content=booked_dates.model_dump_json(), headers=headers)
+            assert res.status_code == 201
+
+            res = await async_client.get("/api/items", params={"store_url": store_url})
+            assert res.status_code == 200
+
+    assert lags
+    assert max(lags) < MAX_EVENT_LOOP_LAG
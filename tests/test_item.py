@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Sequence
+import pytest
 from fastapi.testclient import TestClient
 from mypy_boto3_s3 import S3Client
 from sqlalchemy.orm import Session
@@ -78,7 +79,45 @@ def test_get_item(
 
         item = s.ItemDetailsOut.model_validate(response.json())
         assert item.uuid == store.items[0].uuid
-        assert item.images_urls
+        assert item.images_urls == sorted_urls_images
+
+
+def test_reorder_item_images_etag(
+    client: TestClient,
+    full_db: Session,
+    headers: dict[str, str],
+    s3_client: S3Client,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value))
+    assert item
+
+    with open("tests/house_example.png", "rb") as image:
+        content = image.read()
+    response = client.post(
+        f"/api/items/{item.uuid}/images/",
+        headers=headers,
+        files=[("images", (f"{name}.png", content, "image/png")) for name in ("first", "second")],
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"/api/items/{item.uuid}", params={"store_url": store.url})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    images_urls = response.json()["images_urls"]
+    assert len(images_urls) >= 2
+
+    # only the order of the images changes
+    response = client.patch(
+        f"/api/items/{item.uuid}", headers=headers, json={"images_urls": list(reversed(images_urls))}
+    )
+    assert response.status_code == 200
+
+    response = client.get(f"/api/items/{item.uuid}", params={"store_url": store.url}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["images_urls"] == list(reversed(images_urls))
 
 
 def test_create_item(
@@ -157,8 +196,43 @@ def test_get_filters_data(
 
     filters_data = s.ItemsFilterDataOut.model_validate(response.json())
 
-    assert filters_data.cities
+    assert filters_data.cities == ["test_city1", "test_city2", "test_city3"]
     assert filters_data.adults == 5
+    assert [(c.value, c.count) for c in filters_data.city_counts] == [
+        ("test_city1", 1),
+        ("test_city2", 1),
+        ("test_city3", 1),
+    ]
+    assert [(b.value, b.count) for b in filters_data.bedrooms] == [("0", 3)]
+    assert [(b.value, b.count) for b in filters_data.bathrooms] == [("0", 3)]
+    assert filters_data.price_min == filters_data.price_max == 0
+
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id, m.Item.adults == 5))
+    assert item
+    full_db.add(
+        m.Rate(
+            item_id=item.id,
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30),
+            night=100,
+            weekend_night=120,
+            week=600,
+            month=2000,
+            min_stay=1,
+        )
+    )
+    item.adults = 7
+    item.bedrooms_count = 2
+    full_db.commit()
+
+    # the store has a new content version, so new facets
+    response = client.get("/api/items/filters/data", params={"store_url": store.url})
+    assert response.status_code == 200
+    filters_data = s.ItemsFilterDataOut.model_validate(response.json())
+    assert filters_data.adults == 7
+    assert [(b.value, b.count) for b in filters_data.bedrooms] == [("0", 2), ("2", 1)]
+    assert filters_data.price_min == 100
+    assert filters_data.price_max == 2000
 
 
 def test_get_items(client: TestClient, full_db: Session, headers: dict[str, str], test_data: s.TestData):
@@ -322,6 +396,69 @@ def test_upload_item_main_image(
         assert item.image_url
 
 
+def test_upload_item_images(
+    client: TestClient,
+    full_db: Session,
+    headers: dict[str, str],
+    s3_client: S3Client,
+    queries: list[str],
+):
+    item_model = full_db.scalar(select(m.Item))
+    assert item_model
+    images_count = len(item_model.images)
+
+    with open("tests/house_example.png", "rb") as image, open("tests/test_video.mp4", "rb") as video:
+        content = image.read()
+        response = client.post(
+            f"/api/items/{item_model.uuid}/images/",
+            headers=headers,
+            files=[
+                ("images", ("first.png", content, "image/png")),
+                ("images", ("video.mp4", video, "video/mp4")),
+                ("images", ("second.png", content, "image/png")),
+            ],
+        )
+    assert response.status_code == 201
+
+    results = s.ItemImagesUploadOut.model_validate(response.json()).items
+    assert [result.filename for result in results] == ["first.png", "video.mp4", "second.png"]
+    assert results[0].url and results[2].url
+    assert results[1].error and not results[1].url
+    # the urls of the saved files are not loaded again one by one
+    assert not [statement for statement in queries if "WHERE files.id =" in statement]
+
+    full_db.refresh(item_model)
+    assert len(item_model.images) == images_count + 2
+    assert item_model.images_urls[-2:] == [results[0].url, results[2].url]
+
+
+def test_upload_item_images_not_saved(
+    client: TestClient,
+    full_db: Session,
+    headers: dict[str, str],
+    s3_client: S3Client,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    item_model = full_db.scalar(select(m.Item))
+    assert item_model
+    objects_count = s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME).get("KeyCount", 0)
+
+    def fail_commit():
+        raise sa.exc.OperationalError("INSERT INTO files", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(full_db, "commit", fail_commit)
+    with open("tests/house_example.png", "rb") as image:
+        response = client.post(
+            f"/api/items/{item_model.uuid}/images/",
+            headers=headers,
+            files=[("images", ("first.png", image.read(), "image/png"))],
+        )
+    assert response.status_code == 409
+
+    # the uploaded object is removed with the failed commit
+    assert s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME).get("KeyCount", 0) == objects_count
+
+
 def test_update_item_main_image(
     client: TestClient,
     full_db: Session,
@@ -674,6 +811,375 @@ def test_item_list_with_filter(
     assert len(nightly_items) == 2
 
 
+def test_item_list_with_combined_filters(
+    client: TestClient,
+    full_db: Session,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    items = full_db.scalars(
+        select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value)
+    ).all()
+    assert len(items) == 3
+
+    check_in = datetime.now() + timedelta(days=10)
+    check_out = check_in + timedelta(days=5)
+
+    full_db.add_all(
+        [
+            # overlaps the requested period
+            m.BookedDate(
+                from_date=check_in - timedelta(days=2), to_date=check_in + timedelta(days=1), item_id=items[0].id
+            ),
+            # overlaps but is deleted
+            m.BookedDate(from_date=check_in, to_date=check_out, item_id=items[1].id, is_deleted=True),
+            # ends right at check in
+            m.BookedDate(from_date=check_in - timedelta(days=3), to_date=check_in, item_id=items[2].id),
+        ]
+    )
+    full_db.commit()
+
+    response = client.get(
+        "/api/items",
+        params={
+            "store_url": store.url,
+            "check_in": check_in.isoformat(),
+            "check_out": check_out.isoformat(),
+            "size": 1,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert len(response.json()["items"]) == 1
+
+    city = items[1].location.city
+    response = client.get(
+        "/api/items",
+        params={
+            "store_url": store.url,
+            "check_in": check_in.isoformat(),
+            "check_out": check_out.isoformat(),
+            "city": city,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["items"][0]["uuid"] == items[1].uuid
+
+
+def test_get_items_by_price(
+    client: TestClient,
+    full_db: Session,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    items = full_db.scalars(
+        select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value).order_by(m.Item.id)
+    ).all()
+    assert len(items) == 3
+    for item, price in zip(items, [300, 100, 200]):
+        item.min_price = price
+    full_db.commit()
+
+    response = client.get("/api/items", params={"store_url": store.url, "sort": s.ItemSort.PRICE_ASC.value})
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[1].uuid, items[2].uuid, items[0].uuid]
+    assert [i["minPrice"] for i in response.json()["items"]] == [100, 200, 300]
+
+    response = client.get(
+        "/api/items",
+        params={"store_url": store.url, "price_min": 150, "price_max": 300, "sort": s.ItemSort.PRICE_DESC.value},
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[0].uuid, items[2].uuid]
+
+
+def test_search_items(
+    client: TestClient,
+    full_db: Session,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    items = full_db.scalars(
+        select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value).order_by(m.Item.id)
+    ).all()
+    assert len(items) == 3
+
+    items[0].name = "Ocean View Villa"
+    items[1].location.city = "Naplesville"
+    amenity = m.Amenity(value="Heated Pool")
+    items[2]._amenities.append(amenity)
+    full_db.commit()
+    assert "heated pool" in items[2].search_text
+
+    for q, item in [("ocean vi", items[0]), ("NAPLESV", items[1]), ("heated", items[2])]:
+        response = client.get("/api/items", params={"store_url": store.url, "q": q})
+        assert response.status_code == 200
+        assert [i["uuid"] for i in response.json()["items"]] == [item.uuid]
+
+        response = client.get("/api/items/all/cursor", params={"store_url": store.url, "q": q})
+        assert response.status_code == 200
+        assert [i["uuid"] for i in response.json()["items"]] == [item.uuid]
+
+    # deleted amenities are not searchable anymore
+    amenity.is_deleted = True
+    full_db.commit()
+    response = client.get("/api/items", params={"store_url": store.url, "q": "heated"})
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+
+def test_get_items_on_map(
+    client: TestClient,
+    full_db: Session,
+    queries: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    items = full_db.scalars(
+        select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value).order_by(m.Item.id)
+    ).all()
+    assert len(items) == 3
+    # Naples, Miami and Fiji, next to the antimeridian
+    for item, (latitude, longitude) in zip(items, [(26.142, -81.795), (25.762, -80.192), (-17.713, 179.9)]):
+        item.location.latitude = latitude
+        item.location.longitude = longitude
+    full_db.commit()
+    assert items[0].location.geohash.startswith("dhtu")
+
+    response = client.get(
+        "/api/items/map", params={"store_url": store.url, "south": 25, "west": -82, "north": 27, "east": -81}
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[0].uuid]
+
+    response = client.get(
+        "/api/items/map", params={"store_url": store.url, "south": 25, "west": -83, "north": 27, "east": -80}
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[0].uuid, items[1].uuid]
+
+    response = client.get(
+        "/api/items/map", params={"store_url": store.url, "south": -20, "west": 179, "north": -15, "east": -179}
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[2].uuid]
+
+    response = client.get(
+        "/api/items/map", params={"store_url": store.url, "south": 27, "west": -82, "north": 25, "east": -81}
+    )
+    assert response.status_code == 400
+
+    # Miami to Naples is ~170km
+    response = client.get(
+        "/api/items/nearby", params={"store_url": store.url, "latitude": 25.762, "longitude": -80.192, "radius": 200}
+    )
+    assert response.status_code == 200
+    markers = response.json()["items"]
+    assert [i["uuid"] for i in markers] == [items[1].uuid, items[0].uuid]
+    assert markers[0]["distance"] == 0
+    assert 150 < markers[1]["distance"] < 200
+
+    response = client.get(
+        "/api/items/nearby", params={"store_url": store.url, "latitude": 25.762, "longitude": -80.192, "radius": 100}
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[1].uuid]
+
+    # the nearest ones are taken by the query
+    from naples.routes import item as item_routes
+
+    monkeypatch.setattr(item_routes.CFG, "MAP_MARKERS_LIMIT", 1)
+    response = client.get(
+        "/api/items/nearby", params={"store_url": store.url, "latitude": 26.142, "longitude": -81.795, "radius": 200}
+    )
+    assert response.status_code == 200
+    assert [i["uuid"] for i in response.json()["items"]] == [items[0].uuid]
+    assert [query for query in queries if "LIMIT" in query and "locations.geohash" in query]
+
+
+def test_get_item_markers(
+    client: TestClient,
+    full_db: Session,
+    queries: list[str],
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    items = full_db.scalars(
+        select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value).order_by(m.Item.id)
+    ).all()
+    assert len(items) == 3
+    items[0].location.latitude = 26.142
+    items[0].location.longitude = -81.795
+    items[0].min_price = 100
+    full_db.commit()
+
+    client.get("/api/items/markers", params={"store_url": store.url})
+    queries.clear()
+    response = client.get("/api/items/markers", params={"store_url": store.url})
+    assert response.status_code == 200
+    # just the markers, the store comes from the cache
+    assert len(queries) == 1
+
+    markers = response.json()["items"]
+    assert [marker["uuid"] for marker in markers] == [item.uuid for item in items]
+    assert markers[0] == {
+        "uuid": items[0].uuid,
+        "latitude": 26.142,
+        "longitude": -81.795,
+        "minPrice": 100,
+        "imageUrl": items[0].image_url,
+    }
+
+
+def test_items_not_modified(
+    client: TestClient,
+    full_db: Session,
+    queries: list[str],
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value))
+    assert item
+
+    response = client.get("/api/items", params={"store_url": store.url})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"].startswith("public")
+
+    queries.clear()
+    response = client.get("/api/items", params={"store_url": store.url}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not response.content
+    # only the content version is read
+    assert len(queries) == 1
+
+    response = client.get(f"/api/items/{item.uuid}", params={"store_url": store.url}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # any change of the store items gives a new version
+    full_db.add(
+        m.Rate(
+            start_date=datetime.now(),
+            end_date=datetime.now(),
+            night=100.0,
+            weekend_night=200.0,
+            week=300.0,
+            month=400.0,
+            min_stay=1,
+            item_id=item.id,
+        )
+    )
+    full_db.commit()
+
+    response = client.get("/api/items", params={"store_url": store.url}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.headers["Last-Modified"]
+
+
+def test_bulk_update_drops_store_caches(
+    client: TestClient,
+    full_db: Session,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value))
+    assert item
+
+    response = client.get("/api/items/filters/data", params={"store_url": store.url})
+    assert response.status_code == 200
+    bedrooms = response.json()["bedrooms"]
+    etag = client.get("/api/items", params={"store_url": store.url}).headers["ETag"]
+
+    # an UPDATE statement does not go through the flush, the store is found by its WHERE clause
+    full_db.execute(sa.update(m.Item).where(m.Item.id == item.id).values(bedrooms_count=item.bedrooms_count + 10))
+    full_db.commit()
+
+    # the facets are cached by content version, the new version is computed again
+    response = client.get("/api/items/filters/data", params={"store_url": store.url})
+    assert response.status_code == 200
+    assert response.json()["bedrooms"] != bedrooms
+    response = client.get("/api/items", params={"store_url": store.url}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_items_by_cursor(
+    client: TestClient,
+    full_db: Session,
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+
+    published_uuids = full_db.scalars(
+        select(m.Item.uuid)
+        .where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value)
+        .order_by(m.Item.created_at, m.Item.id)
+    ).all()
+
+    uuids = []
+    params: dict[str, str | int] = {"store_url": store.url, "size": 1}
+    while True:
+        response = client.get("/api/items/cursor", params=params)
+        assert response.status_code == 200
+        uuids += [item["uuid"] for item in response.json()["items"]]
+        if not response.json()["next_page"]:
+            break
+        params["cursor"] = response.json()["next_page"]
+
+    assert uuids == list(published_uuids)
+
+    response = client.get("/api/items/all/cursor", params={"store_url": store.url, "size": 2})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+    assert response.json()["next_page"]
+
+    response = client.get("/api/items/cursor", params={"store_url": store.url, "cursor": "wrong"})
+    assert response.status_code == 400
+
+
+def test_items_query_count(
+    client: TestClient,
+    full_db: Session,
+    queries: list[str],
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id))
+    assert item
+
+    def count_queries(url: str, params: dict[str, str | int]) -> int:
+        # relationships must come from the database, not from the identity map of the shared test session
+        full_db.expire_all()
+        queries.clear()
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        assert response.headers["X-SQL-Query-Count"] == str(len(queries))
+        assert response.headers["Server-Timing"].startswith("sql;dur=")
+        return len(queries)
+
+    # resolve the store once, so that every request below gets it from the store cache
+    client.get("/api/items", params={"store_url": store.url})
+
+    # the number of queries does not depend on the page size
+    list_queries = count_queries("/api/items", {"store_url": store.url, "size": 1})
+    assert list_queries == count_queries("/api/items", {"store_url": store.url, "size": 3})
+    assert list_queries <= 9
+
+    all_queries = count_queries("/api/items/all", {"store_url": store.url, "size": 1})
+    assert all_queries == count_queries("/api/items/all", {"store_url": store.url, "size": 5})
+    assert all_queries <= 9
+
+    assert count_queries(f"/api/items/{item.uuid}", {"store_url": store.url}) <= 16
+
+
 def test_update_item(
     client: TestClient,
     full_db: Session,
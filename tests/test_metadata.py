@@ -45,3 +45,10 @@ def test_save_get_metadata(
     )
 
     assert response.status_code == 200
+
+    response = client.get("/api/metadata")
+    assert response.status_code == 200
+    assert response.json()["image_cover_url"] == "image cover url"
+
+    response = client.get("/api/metadata", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
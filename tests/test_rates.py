@@ -140,3 +140,45 @@ def test_delete_rate(client: TestClient, full_db: Session, headers: dict[str, st
     rates_res = client.get(f"/api/rates/{item.uuid}", headers=headers)
     rates = s.RateListOut.model_validate(rates_res.json())
     assert not rates.items
+
+
+def test_rates_update_item_prices(client: TestClient, full_db: Session, headers: dict[str, str]):
+    item = full_db.scalar(select(m.Item))
+    assert item
+
+    def create_rate(night: float, month: float) -> s.RateOut:
+        req_payload = s.RateIn(
+            item_uuid=item.uuid,
+            start_date=datetime.now(UTC),
+            end_date=datetime.now(UTC),
+            night=night,
+            weekend_night=night,
+            week=night * 7,
+            month=month,
+            min_stay=1,
+            visible=True,
+        )
+        res = client.post("/api/rates/", content=req_payload.model_dump_json(), headers=headers)
+        assert res.status_code == 201
+        return s.RateOut.model_validate(res.json())
+
+    cheap_rate = create_rate(100.0, 2000.0)
+    create_rate(150.0, 3000.0)
+
+    full_db.refresh(item)
+    assert item.min_price == 100.0
+    assert item.max_price == 3000.0
+
+    req_payload = s.RateIn.model_validate({**cheap_rate.model_dump(), "item_uuid": item.uuid, "night": 120.0})
+    res = client.put(f"/api/rates/{cheap_rate.uuid}", content=req_payload.model_dump_json(), headers=headers)
+    assert res.status_code == 200
+
+    full_db.refresh(item)
+    assert item.min_price == 120.0
+
+    res = client.delete(f"/api/rates/{cheap_rate.uuid}", headers=headers)
+    assert res.status_code == 204
+
+    full_db.refresh(item)
+    assert item.min_price == 150.0
+    assert item.max_price == 3000.0
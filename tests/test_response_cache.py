@@ -0,0 +1,68 @@
+import fakeredis
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from naples import models as m, schemas as s
+from naples.response_cache import RedisCacheBackend
+
+
+def test_redis_cache_backend():
+    cache = RedisCacheBackend("redis://localhost:6379/0", client=fakeredis.FakeRedis())
+
+    assert cache.get("a") is None
+    cache.set("a", b"first\r\nsecond", 60, tags=["store:1"])
+    cache.set("b", b"other", 60, tags=["store:2"])
+    assert cache.get("a") == b"first\r\nsecond"
+
+    assert cache.add("lock:a", 5)
+    assert not cache.add("lock:a", 5)
+    cache.delete("lock:a")
+    assert cache.add("lock:a", 5)
+
+    cache.invalidate_tags(["store:1"])
+    assert cache.get("a") is None
+    assert cache.get("b") == b"other"
+
+
+def test_redis_cache_backend_unavailable():
+    # nothing listens there: a miss, not an error
+    cache = RedisCacheBackend("redis://127.0.0.1:1/0")
+    assert cache.get("a") is None
+    # the lock is taken at once, the request renders instead of waiting for it
+    assert cache.add("lock:a", 5)
+
+
+def test_storefront_response_cache(
+    client: TestClient,
+    full_db: Session,
+    queries: list[str],
+):
+    store = full_db.scalar(select(m.Store))
+    assert store
+    item = full_db.scalar(select(m.Item).where(m.Item.store_id == store.id, m.Item.stage == s.ItemStage.ACTIVE.value))
+    assert item
+
+    response = client.get("/api/items", params={"store_url": store.url})
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+
+    queries.clear()
+    cached = client.get("/api/items", params={"store_url": store.url})
+    assert cached.status_code == 200
+    assert cached.headers["X-Cache"] == "HIT"
+    assert cached.json() == response.json()
+    assert cached.headers["ETag"] == response.headers["ETag"]
+    # only the content version is read
+    assert len(queries) == 1
+
+    # other query, other entry
+    response = client.get("/api/items", params={"store_url": store.url, "size": 1})
+    assert response.headers["X-Cache"] == "MISS"
+
+    item.name = "Renamed item"
+    full_db.commit()
+
+    response = client.get("/api/items", params={"store_url": store.url})
+    assert response.headers["X-Cache"] == "MISS"
+    assert "Renamed item" in [i["name"] for i in response.json()["items"]]
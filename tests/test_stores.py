@@ -1,5 +1,8 @@
+import csv
+import io
 from datetime import datetime, timedelta, UTC
 from typing import Sequence
+import pytest
 from mypy_boto3_s3 import S3Client
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
@@ -351,6 +354,90 @@ def test_get_stores_urls(
         assert stores.http.services[store.subdomain].loadBalancer.servers[0].url == f"http://{CFG.WEB_SERVICE_NAME}"
 
 
+def test_get_stores_urls_version(
+    client: TestClient,
+    headers: dict[str, str],
+    full_db: Session,
+    queries: list[str],
+):
+    response = client.get("/api/stores/urls")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # served from the cache, only the version is read
+    queries.clear()
+    response = client.get("/api/stores/urls")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+    assert len(queries) == 1
+
+    response = client.get("/api/stores/urls", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # other changes of the store keep the config
+    res = client.patch("/api/stores/", headers=headers, json={"title_value": "New title"})
+    assert res.status_code == 200
+    response = client.get("/api/stores/urls", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    res = client.patch("/api/stores/", headers=headers, json={"url": "new-store.com"})
+    assert res.status_code == 200
+    response = client.get("/api/stores/urls", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    routers = s.TraefikData.model_validate(response.json()).http.routers
+    assert "Host(`new-store.com`)" in [router.rule for router in routers.values()]
+
+
+def test_config_version_bump_error(
+    client: TestClient,
+    headers: dict[str, str],
+    full_db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    from naples.controllers import traefik
+
+    def fail_bump(session: Session, name: str):
+        raise sa.exc.OperationalError("UPDATE config_versions", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(traefik, "bump_config_version", fail_bump)
+    # the change is committed before the bump, its failure does not fail the request
+    res = client.patch("/api/stores/", headers=headers, json={"url": "new-store.com"})
+    assert res.status_code == 200
+    assert full_db.scalar(sa.select(m.Store).where(m.Store.url == "new-store.com"))
+
+
+def test_get_stores_urls_compact(client: TestClient, full_db: Session, monkeypatch: pytest.MonkeyPatch):
+    from naples.controllers import traefik
+
+    monkeypatch.setattr(traefik.CFG, "TRAEFIK_COMPACT_CONFIG", True)
+    monkeypatch.setattr(traefik.CFG, "TRAEFIK_WILDCARD_CERT", True)
+    monkeypatch.setattr(traefik.CFG, "TRAEFIK_HOSTS_PER_ROUTER", 10)
+
+    stores = full_db.scalars(sa.select(m.Store).order_by(m.Store.id)).all()
+    subdomain_urls = [store.url for store in stores[1:]]
+    stores[0].url = "custom-store.com"
+    full_db.commit()
+
+    response = client.get("/api/stores/urls")
+    assert response.status_code == 200
+    assert "null" not in response.text
+    config = s.TraefikData.model_validate(response.json())
+
+    # one service for all stores
+    assert list(config.http.services) == [CFG.TRAEFIK_SERVICE_NAME]
+    assert {router.service for router in config.http.routers.values()} == {CFG.TRAEFIK_SERVICE_NAME}
+
+    wildcard_router = config.http.routers[f"{CFG.TRAEFIK_SERVICE_NAME}-0"]
+    assert wildcard_router.rule == " || ".join(f"Host(`{url}`)" for url in subdomain_urls)
+    assert wildcard_router.tls.domains
+    assert wildcard_router.tls.domains[0].sans == [f"*.{CFG.MAIN_DOMAIN}"]
+
+    custom_router = config.http.routers[stores[0].uuid]
+    assert custom_router.rule == "Host(`custom-store.com`)"
+    assert custom_router.tls.domains is None
+
+
 def test_upload_store_about_us_media(
     client: TestClient,
     headers: dict[str, str],
@@ -415,6 +502,7 @@ def test_get_stores_for_admin(
     client: TestClient,
     full_db: Session,
     admin_headers: dict[str, str],
+    queries: list[str],
 ):
     db_stores: Sequence[m.Store] = full_db.scalars(sa.select(m.Store)).all()
     search = db_stores[0].user.email
@@ -470,6 +558,79 @@ def test_get_stores_for_admin(
     response = client.post("/api/stores/report/download", headers=admin_headers)
 
     assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][0] == "User Name"
+    report = {row[6]: row for row in rows[1:]}
+    assert len(report) == len(db_stores)
+    for store in db_stores:
+        row = report[store.url]
+        assert row[1] == store.user.email
+        assert row[4] == store.status.value.upper()
+        assert row[7] == str(store.items_count)
+
+    # the routes share the session of the test, nothing loaded by the test above is reused
+    full_db.expire_all()
+    queries.clear()
+    response = client.post(
+        "/api/stores/report/download",
+        headers=admin_headers,
+        params={"subscription_status": s.StoreStatus.INACTIVE.value},
+    )
+    assert response.status_code == 200
+    assert len(list(csv.reader(io.StringIO(response.text)))) == 2
+    # the status is filtered in SQL, the subscriptions of the users are not loaded one by one
+    assert not [query for query in queries if "= subscriptions.user_id" in query]
+
+
+def test_get_stores_by_cursor(
+    client: TestClient,
+    full_db: Session,
+    admin_headers: dict[str, str],
+):
+    response = client.get("/api/stores", headers=admin_headers)
+    assert response.status_code == 200
+    stores_count = response.json()["total"]
+
+    urls = []
+    params: dict[str, str | int] = {"size": 1}
+    while True:
+        response = client.get("/api/stores/cursor", headers=admin_headers, params=params)
+        assert response.status_code == 200
+        urls += [store["url"] for store in response.json()["items"]]
+        if not response.json()["next_page"]:
+            break
+        params["cursor"] = response.json()["next_page"]
+
+    assert len(urls) == len(set(urls)) == stores_count
+
+
+def test_store_snapshot_cache(
+    client: TestClient,
+    full_db: Session,
+    admin_headers: dict[str, str],
+):
+    from naples.dependency import store_snapshots
+
+    store = full_db.scalar(sa.select(m.Store))
+    assert store
+
+    response = client.get(f"/api/stores/{store.url}", params={"store_url": store.url})
+    assert response.status_code == 200
+    assert store_snapshots.get(store.url)
+    first_queries = int(response.headers["X-SQL-Query-Count"])
+
+    response = client.get(f"/api/stores/{store.url}", params={"store_url": store.url})
+    assert response.status_code == 200
+    assert int(response.headers["X-SQL-Query-Count"]) < first_queries
+
+    # blocking the owner drops the cached snapshot
+    response = client.patch("/api/users/block", headers=admin_headers, json={"uuid": store.user.uuid})
+    assert response.status_code == 200
+    assert not store_snapshots.get(store.url)
+
+    response = client.get(f"/api/stores/{store.url}", params={"store_url": store.url})
+    assert response.status_code == 423
 
 
 def test_protect_store(